@@ -79,6 +79,9 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Тестовая база - файл, а не память: тесты бронирования открывают
+        # соединения из нескольких потоков
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
@@ -1,3 +1,87 @@
-from django.test import TestCase
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.db import connection, connections
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from .models import Equipment, Rental, User
+
+EQUIPMENT_COUNT = 3  # Мало оборудования - много пересечений
+DAYS = 30
+THREADS = 16  # Одновременные запросы
+ROUNDS = 10  # Бронирований на запрос
+START = date(2030, 1, 1)
+
+# Пары аренд одного оборудования с пересекающимися датами
+OVERLAPS = """
+    SELECT a.id, b.id FROM rent_eq_rental a
+    JOIN rent_eq_rental b ON a.equipment_id = b.equipment_id AND a.id < b.id
+    WHERE a.start_date < b.end_date AND b.start_date < a.end_date
+"""
+
+
+class BookingConcurrencyTests(TransactionTestCase):
+    """Параллельные бронирования через API в нескольких потоках."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with connection.cursor() as cursor:  # Читатели не ждут писателя
+            cursor.execute("PRAGMA journal_mode=WAL")
+
+    def setUp(self):
+        self.user = User.objects.create(
+            username="u", telephone_number="1", email="u@example.com", password="p"
+        )
+        self.equipment = Equipment.objects.bulk_create(
+            Equipment(name=f"eq{i}", discription="d") for i in range(EQUIPMENT_COUNT)
+        )
+
+    def book(self, seed: int) -> list[int]:
+        """Бронирует случайные даты в отдельном потоке и возвращает коды ответов."""
+        rng = random.Random(seed)
+        client = APIClient()
+        codes = []
+        try:
+            for _ in range(ROUNDS):
+                start = START + timedelta(days=rng.randrange(DAYS))
+                response = client.post(
+                    "/api/rental/",
+                    {
+                        "equipment": rng.choice(self.equipment).pk,
+                        "user": self.user.pk,
+                        "start_date": start.isoformat(),
+                        "end_date": (start + timedelta(days=rng.randint(1, 3))).isoformat(),
+                    },
+                    format="json",
+                )
+                codes.append(response.status_code)
+        finally:
+            connections.close_all()  # Соединения Django принадлежат потоку
+        return codes
+
+    def test_no_double_booking(self):
+        with ThreadPoolExecutor(THREADS) as pool:
+            codes = [code for result in pool.map(self.book, range(THREADS)) for code in result]
+
+        self.assertLessEqual(set(codes), {201, 400})
+        with connection.cursor() as cursor:
+            cursor.execute(OVERLAPS)
+            self.assertEqual(cursor.fetchall(), [])
+        booked = Rental.objects.count()
+        self.assertEqual(booked, codes.count(201))
+        self.assertTrue(0 < booked < THREADS * ROUNDS)  # Бронирования шли, и часть получила отказ
+
+    def test_busy_dates_rejected(self):
+        rental = {
+            "equipment": self.equipment[0].pk,
+            "user": self.user.pk,
+            "start_date": "2030-01-01",
+            "end_date": "2030-01-05",
+        }
+        client = APIClient()
+
+        self.assertEqual(client.post("/api/rental/", rental, format="json").status_code, 201)
+        self.assertEqual(client.post("/api/rental/", rental, format="json").status_code, 400)
@@ -1,4 +1,6 @@
 # from django.shortcuts import render
+from django.db import connection, transaction
+from django.db.models import F
 from rest_framework import viewsets
 from rest_framework.response import Response
 from .models import User, Rental, Equipment
@@ -36,6 +38,14 @@ class RentalViewSet(viewsets.ModelViewSet):
         Проверяет, доступно ли оборудование на указанные даты. 
         Если оборудование занято, возвращает ошибку.
 
+        Проверка и вставка выполняются в одной транзакции под блокировкой
+        строки оборудования (SELECT ... FOR UPDATE), поэтому параллельные
+        запросы на одно оборудование не могут занять одни и те же даты.
+        В SQLite FOR UPDATE не поддерживается: там первым выражением
+        транзакции выполняется пустой UPDATE строки оборудования, который
+        сразу берет блокировку записи базы. Остальные транзакции приложения
+        остаются отложенными и не ждут друг друга на чтении.
+
         Аргументы:
             request (Request): Запрос, содержащий данные для создания аренды.
             *args: Дополнительные аргументы.
@@ -48,15 +58,22 @@ class RentalViewSet(viewsets.ModelViewSet):
         start_date = request.data.get("start_date")
         end_date = request.data.get("end_date")
 
-        # Проверяем, занято ли оборудование на указанные даты
-        if Rental.objects.filter(
-            equipment_id=equipment_id,
-            start_date__lt=end_date,
-            end_date__gt=start_date,
-        ).exists():
-            return Response({"error": "Оборудование занято на эти даты"}, status=400)
+        with transaction.atomic():
+            # Блокируем оборудование до конца транзакции
+            if connection.vendor == "sqlite":
+                Equipment.objects.filter(pk=equipment_id).update(id=F("id"))
+            else:
+                Equipment.objects.select_for_update().filter(pk=equipment_id).first()
+
+            # Проверяем, занято ли оборудование на указанные даты
+            if Rental.objects.filter(
+                equipment_id=equipment_id,
+                start_date__lt=end_date,
+                end_date__gt=start_date,
+            ).exists():
+                return Response({"error": "Оборудование занято на эти даты"}, status=400)
 
-        return super().create(request, *args, **kwargs)  # Вызываем стандартный метод создания
+            return super().create(request, *args, **kwargs)  # Вызываем стандартный метод создания
 
 
 class EquipmentViewSet(viewsets.ModelViewSet):
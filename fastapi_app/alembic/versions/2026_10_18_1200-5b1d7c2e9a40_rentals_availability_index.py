@@ -0,0 +1,34 @@
+"""Rentals availability index
+
+Revision ID: 5b1d7c2e9a40
+Revises: 000535af531e
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1d7c2e9a40"
+down_revision: Union[str, None] = "000535af531e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_rentals_equipment_id_start_date_end_date",
+        "rentals",
+        ["equipment_id", "start_date", "end_date"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_rentals_equipment_id_start_date_end_date", table_name="rentals"
+    )
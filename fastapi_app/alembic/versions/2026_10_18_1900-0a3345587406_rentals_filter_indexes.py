@@ -0,0 +1,41 @@
+"""Rentals filter indexes
+
+Revision ID: 0a3345587406
+Revises: 5b1d7c2e9a40
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0a3345587406"
+down_revision: Union[str, None] = "5b1d7c2e9a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_rentals_user_id_start_date_end_date",
+        "rentals",
+        ["user_id", "start_date", "end_date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_rentals_end_date_start_date",
+        "rentals",
+        ["end_date", "start_date"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rentals_end_date_start_date", table_name="rentals")
+    op.drop_index(
+        "ix_rentals_user_id_start_date_end_date", table_name="rentals"
+    )
@@ -0,0 +1,66 @@
+"""Equipments full-text search
+
+Revision ID: 135d8843f8cc
+Revises: 0a3345587406
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "135d8843f8cc"
+down_revision: Union[str, None] = "0a3345587406"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE equipments_fts USING fts5(
+            name, discription,
+            content='equipments', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER equipments_fts_ai AFTER INSERT ON equipments BEGIN
+            INSERT INTO equipments_fts(rowid, name, discription)
+            VALUES (new.id, new.name, new.discription);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER equipments_fts_ad AFTER DELETE ON equipments BEGIN
+            INSERT INTO equipments_fts(equipments_fts, rowid, name, discription)
+            VALUES ('delete', old.id, old.name, old.discription);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER equipments_fts_au AFTER UPDATE ON equipments BEGIN
+            INSERT INTO equipments_fts(equipments_fts, rowid, name, discription)
+            VALUES ('delete', old.id, old.name, old.discription);
+            INSERT INTO equipments_fts(rowid, name, discription)
+            VALUES (new.id, new.name, new.discription);
+        END
+        """
+    )
+    # Индексируем уже существующее оборудование
+    op.execute("INSERT INTO equipments_fts(equipments_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER equipments_fts_au")
+    op.execute("DROP TRIGGER equipments_fts_ad")
+    op.execute("DROP TRIGGER equipments_fts_ai")
+    op.execute("DROP TABLE equipments_fts")
@@ -0,0 +1,38 @@
+"""Changes feed
+
+Revision ID: 7c2f4b91d0e3
+Revises: 135d8843f8cc
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2f4b91d0e3"
+down_revision: Union[str, None] = "135d8843f8cc"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "changes",
+        sa.Column("entity", sa.String(length=20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("op", sa.String(length=6), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_changes")),
+        sqlite_autoincrement=True,
+    )
+    op.create_index(op.f("ix_changes_id"), "changes", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_changes_id"), table_name="changes")
+    op.drop_table("changes")
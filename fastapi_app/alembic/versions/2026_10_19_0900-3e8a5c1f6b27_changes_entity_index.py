@@ -0,0 +1,26 @@
+"""Changes entity index
+
+Revision ID: 3e8a5c1f6b27
+Revises: 7c2f4b91d0e3
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3e8a5c1f6b27"
+down_revision: Union[str, None] = "7c2f4b91d0e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_changes_entity", "changes", ["entity"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_changes_entity", table_name="changes")
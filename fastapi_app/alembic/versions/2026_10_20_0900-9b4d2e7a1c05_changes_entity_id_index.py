@@ -0,0 +1,28 @@
+"""Changes entity_id index
+
+Revision ID: 9b4d2e7a1c05
+Revises: 3e8a5c1f6b27
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b4d2e7a1c05"
+down_revision: Union[str, None] = "3e8a5c1f6b27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_changes_entity_id", "changes", ["entity", "entity_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_changes_entity_id", table_name="changes")
@@ -0,0 +1,84 @@
+"""Changes backfill
+
+Revision ID: 4f6a8d2b7e19
+Revises: 9b4d2e7a1c05
+Create Date: 2026-10-21 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4f6a8d2b7e19"
+down_revision: Union[str, None] = "9b4d2e7a1c05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHUNK_SIZE = 1000
+
+changes = sa.table(
+    "changes",
+    sa.column("entity", sa.String),
+    sa.column("entity_id", sa.Integer),
+    sa.column("op", sa.String),
+    sa.column("data", sa.JSON),
+)
+users = sa.table(
+    "users",
+    sa.column("id", sa.Integer),
+    sa.column("username", sa.String),
+    sa.column("email", sa.String),
+    sa.column("telephone_number", sa.String),
+)  # Без пароля, как в журнале
+equipments = sa.table(
+    "equipments",
+    sa.column("id", sa.Integer),
+    sa.column("name", sa.String),
+    sa.column("discription", sa.String),
+)
+rentals = sa.table(
+    "rentals",
+    sa.column("id", sa.Integer),
+    sa.column("equipment_id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("start_date", sa.Date),
+    sa.column("end_date", sa.Date),
+)
+
+
+def payload(row: dict) -> dict:
+    """Строка таблицы в виде data журнала (даты аренд - как datetime в Rental_id)."""
+    return {
+        key: f"{value.isoformat()}T00:00:00" if key.endswith("_date") else value
+        for key, value in row.items()
+    }
+
+
+def upgrade() -> None:
+    # Строки, записанные до журнала, получают записи create, чтобы клиент,
+    # читающий /api/changes с since=0, получил полный снимок таблиц
+    bind = op.get_bind()
+    for table in (users, equipments, rentals):
+        logged = sa.exists().where(
+            changes.c.entity == table.name, changes.c.entity_id == table.c.id
+        )
+        stmt = sa.select(table).where(~logged).order_by(table.c.id)
+        rows = bind.execute(stmt).mappings().all()
+        for start in range(0, len(rows), CHUNK_SIZE):
+            op.bulk_insert(
+                changes,
+                [
+                    {"entity": table.name, "entity_id": row["id"], "op": "create", "data": payload(row)}
+                    for row in rows[start : start + CHUNK_SIZE]
+                ],
+            )
+
+
+def downgrade() -> None:
+    # Записи create неотличимы от записанных приложением, и клиенты уже
+    # могли их прочитать: журнал не изменяется
+    pass
@@ -2,9 +2,15 @@ from fastapi import APIRouter
 from .user import router as user_router
 from .equipment import router as equipment_router
 from .rentals import router as rentals_router
+from .cache import router as cache_router
+from .reports import router as reports_router
+from .changes import router as changes_router
 
 router = APIRouter(prefix="/api")
 
 router.include_router(user_router)
 router.include_router(equipment_router)
 router.include_router(rentals_router)
+router.include_router(cache_router)
+router.include_router(reports_router)
+router.include_router(changes_router)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from core.cache import entity_cache
+
+router = APIRouter(prefix="/cache", tags=["CACHE"])
+
+
+@router.get("/stats", response_model=dict[str, dict[str, int]])
+async def get_cache_stats():
+    """
+    Получает счетчики попаданий и промахов кэша сущностей.
+
+    Возвращает:
+        dict: {namespace: {"hits": ..., "misses": ...}}.
+    """
+    return entity_cache.stats()
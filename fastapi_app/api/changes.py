@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated
+from core import settings
+from core.db_help import db_helper
+from schemas.change import Change
+from .fast_json import fast_json
+from .crud.change_cruds import get_changes
+
+# Создаем маршрутизатор журнала изменений
+router = APIRouter(prefix="/changes", tags=["CHANGES"])
+read_conn = Annotated[AsyncSession, Depends(db_helper.get_read_session)]  # Сессия движка чтения
+
+
+@router.get("", response_model=list[Change])
+async def changes_since(
+    session: read_conn,
+    response: Response,
+    since: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=settings.page_size_max)] = settings.page_size_default,
+):
+    """
+    Отдает изменения пользователей, оборудования и аренд после номера since.
+
+    Клиент запоминает seq последнего полученного изменения и передает его
+    как since в следующем запросе, получая только новые изменения.
+    Удаления приходят метками с op="delete" без data. Строки, записанные
+    до появления журнала, получили в нем записи create при миграции
+    4f6a8d2b7e19, поэтому чтение с since=0 дает полный снимок. Если страница
+    заполнена целиком, в заголовке X-Next-Cursor передается since для
+    следующей страницы.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        response (Response): Ответ, в заголовок X-Next-Cursor которого пишется курсор.
+        since (int): Номер последнего уже полученного изменения (0 - с начала).
+        limit (int): Количество изменений на странице.
+
+    Возвращает:
+        list[Change]: Изменения в порядке их записи.
+    """
+    changes = await get_changes(session=session, since=since, limit=limit)
+    if changes and len(changes) >= limit:
+        response.headers["X-Next-Cursor"] = str(changes[-1].seq)  # Курсор следующей страницы
+    return fast_json(list[Change], changes, response)
@@ -0,0 +1,47 @@
+import hashlib
+from typing import Annotated
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.db_help import db_helper
+from .crud.change_cruds import get_table_versions
+
+
+def etag(*tables: str):
+    """
+    Создает зависимость, реализующую условный GET по заголовку If-None-Match.
+
+    ETag строится из версий перечисленных таблиц (номеров их последних
+    изменений в журнале changes) и пути с параметрами запроса. Версии
+    хранятся в базе, поэтому ETag одинаков во всех процессах и меняется
+    при записи из любого из них. Если клиент прислал совпадающий ETag,
+    запрос завершается ответом 304 до выполнения эндпоинта: выполняется
+    только запрос версий, без запроса сущностей и сериализации. Иначе
+    ETag добавляется в заголовки ответа.
+
+    Аргументы:
+        *tables (str): Таблицы, от которых зависит ответ.
+
+    Возвращает:
+        Callable: Зависимость FastAPI.
+    """
+
+    async def check(
+        request: Request,
+        response: Response,
+        session: Annotated[AsyncSession, Depends(db_helper.get_read_session)],
+    ) -> None:
+        versions = await get_table_versions(session, tables)  # Та же сессия, что у эндпоинта
+        key = "|".join(
+            [request.url.path, request.url.query]
+            + [f"{table}={version}" for table, version in zip(tables, versions)]
+        )
+        tag = f'"{hashlib.blake2s(key.encode(), digest_size=8).hexdigest()}"'
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            candidates = {item.strip().removeprefix("W/") for item in if_none_match.split(",")}
+            if tag in candidates or "*" in candidates:
+                raise HTTPException(status_code=304, headers={"ETag": tag})  # Не изменилось
+        response.headers["ETag"] = tag
+
+    return check
@@ -0,0 +1,638 @@
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, exists, func, or_
+from core import settings
+from core.broker import Broker
+from core.occupancy import OccupancyBitmap
+from models import Change, Equipment, Rental
+from schemas.rental import Rental_id
+
+logger = logging.getLogger(__name__)
+
+
+def as_date(value: date | datetime) -> date:
+    """
+    Приводит значение к date (колонки аренды хранят только дату).
+
+    Аргументы:
+        value (date | datetime): Дата или дата со временем.
+
+    Возвращает:
+        date: Дата без времени.
+    """
+    return value.date() if isinstance(value, datetime) else value
+
+
+class AvailabilityCache:
+    """
+    Кэш занятости оборудования в памяти процесса.
+
+    Для каждого оборудования хранится отсортированный по дате начала список
+    интервалов (start_date, end_date, rental_id) и максимальная длина аренды.
+    Поиск пересечения - бинарный поиск по началу интервала: пересекаться
+    с [start, end) могут только аренды, начавшиеся в окне
+    (start - max_len, end).
+
+    Атрибуты:
+        ready (bool): Кэш прогрет и может использоваться.
+        last_seq (int): Номер изменения журнала, до которого кэш сверен с базой.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.last_seq = 0
+        self._intervals: dict[int, list[tuple[date, date, int]]] = {}
+        self._max_len: dict[int, timedelta] = {}
+        self._by_rental: dict[int, tuple[int, date, date]] = {}
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        self.ready = False
+        self.last_seq = 0
+        self._intervals.clear()
+        self._max_len.clear()
+        self._by_rental.clear()
+
+    def add(self, rental_id: int, equipment_id: int, start_date, end_date) -> None:
+        """
+        Добавляет аренду в кэш (повторное добавление заменяет запись).
+
+        Аргументы:
+            rental_id (int): Идентификатор аренды.
+            equipment_id (int): Идентификатор оборудования.
+            start_date (date | datetime): Дата начала аренды.
+            end_date (date | datetime): Дата окончания аренды.
+        """
+        self.remove(rental_id)
+        start, end = as_date(start_date), as_date(end_date)
+        insort(self._intervals.setdefault(equipment_id, []), (start, end, rental_id))
+        self._max_len[equipment_id] = max(
+            self._max_len.get(equipment_id, timedelta(0)), end - start
+        )
+        self._by_rental[rental_id] = (equipment_id, start, end)
+
+    def remove(self, rental_id: int) -> None:
+        """
+        Удаляет аренду из кэша, если она там есть.
+
+        Аргументы:
+            rental_id (int): Идентификатор аренды.
+        """
+        entry = self._by_rental.pop(rental_id, None)
+        if entry is None:
+            return
+        equipment_id, start, end = entry
+        intervals = self._intervals[equipment_id]
+        intervals.pop(bisect_left(intervals, (start, end, rental_id)))
+
+    def overlaps(self, equipment_id: int, start_date, end_date) -> bool:
+        """
+        Проверяет пересечение интервала с арендами оборудования.
+
+        Аргументы:
+            equipment_id (int): Идентификатор оборудования.
+            start_date (date | datetime): Дата начала проверяемого интервала.
+            end_date (date | datetime): Дата окончания проверяемого интервала.
+
+        Возвращает:
+            bool: True, если интервал пересекается хотя бы с одной арендой.
+        """
+        intervals = self._intervals.get(equipment_id)
+        if not intervals:
+            return False
+        start, end = as_date(start_date), as_date(end_date)
+        lo = bisect_left(intervals, (start - self._max_len[equipment_id],))
+        hi = bisect_left(intervals, (end,))  # Аренды, начавшиеся до end
+        return any(item[1] > start for item in intervals[lo:hi])
+
+    def snapshot(self) -> dict[int, tuple[int, date, date]]:
+        """
+        Возвращает копию содержимого кэша.
+
+        Возвращает:
+            dict[int, tuple]: rental_id -> (equipment_id, start_date, end_date).
+        """
+        return dict(self._by_rental)
+
+
+availability_cache = AvailabilityCache()
+availability_cache_lock = asyncio.Lock()  # Изменения из журнала применяются по порядку
+availability_events = Broker(settings.availability_events_queue)  # Подписки по id оборудования
+occupancy = OccupancyBitmap(settings.occupancy_horizon_days)  # Битовые карты занятости по дням
+occupancy_lock = asyncio.Lock()  # Изменения карт, которым нужно чтение из базы, идут по одному
+
+
+def publish_availability(op: str, rental, equipment_id: int | None = None) -> None:
+    """
+    Рассылает подписчикам оборудования событие об изменении аренды.
+
+    JSON события собирается один раз и передается всем подписчикам как
+    готовая строка. Вызывается после commit, чтобы клиент, получивший
+    событие, уже видел изменение в базе.
+
+    Аргументы:
+        op (str): Операция: create, update или delete.
+        rental: Аренда (ORM-объект или словарь колонок).
+        equipment_id (int | None): Кому отправить событие, если не
+            оборудованию самой аренды (например, прежнему при переносе).
+    """
+    if not availability_events.active:  # Никто не подписан - не сериализуем
+        return
+    data = Rental_id.model_validate(rental, from_attributes=True)
+    if equipment_id is None:
+        equipment_id = data.equipment_id
+    availability_events.publish(
+        equipment_id, f'{{"op":"{op}","rental":{data.model_dump_json()}}}'
+    )
+
+
+async def _load_rentals(session: AsyncSession):
+    """
+    Потоково читает интервалы всех аренд из базы данных.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+
+    Возвращает:
+        AsyncIterator[Row]: Строки (id, equipment_id, start_date, end_date).
+    """
+    stmt = select(
+        Rental.id, Rental.equipment_id, Rental.start_date, Rental.end_date
+    ).execution_options(yield_per=settings.export_chunk_size)
+    result = await session.stream(stmt)
+    async for row in result:
+        yield row
+
+
+async def _load_occupancy(
+    session: AsyncSession, start: date, end: date, equipment_ids: set[int] | None = None
+) -> None:
+    """
+    Отмечает в картах занятости аренды, пересекающие дни [start, end).
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        start (date): Первый день.
+        end (date): День после последнего.
+        equipment_ids (set[int] | None): Только аренды этого оборудования.
+    """
+    stmt = (
+        select(Rental.equipment_id, Rental.start_date, Rental.end_date)
+        .where(Rental.start_date < end, Rental.end_date > start)
+        .execution_options(yield_per=settings.export_chunk_size)
+    )
+    if equipment_ids is not None:
+        stmt = stmt.where(Rental.equipment_id.in_(equipment_ids))
+    result = await session.stream(stmt)
+    async for chunk in result.partitions(settings.export_chunk_size):
+        occupancy.mark_many(chunk)
+
+
+async def _replay_changes(session: AsyncSession, since: int) -> None:
+    """
+    Перестраивает карты оборудования, аренды которого менялись после since.
+
+    Затрагиваются все оборудование, на котором когда-либо стояли
+    изменившиеся аренды (по журналу изменений): так учитываются и
+    удаления, и переносы аренд на другое оборудование. Аренды читаются
+    до изменения карт, и карты перестраиваются без переключения задач:
+    параллельный запрос не увидит оборудование очищенным.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        since (int): Номер изменения, до которого карты сверены с базой.
+    """
+    changed = select(Change.entity_id).where(Change.id > since, Change.entity == "rentals")
+    stmt = select(Change.data).where(
+        Change.entity == "rentals", Change.entity_id.in_(changed), Change.op != "delete"
+    )  # Все состояния изменившихся аренд (по индексу ix_changes_entity_id)
+    equipment_ids = {data["equipment_id"] for data in await session.scalars(stmt)}
+    if not equipment_ids:
+        return
+    stmt = select(Rental.equipment_id, Rental.start_date, Rental.end_date).where(
+        Rental.equipment_id.in_(equipment_ids),
+        Rental.start_date < date.fromordinal(occupancy.high),
+        Rental.end_date > date.fromordinal(occupancy.low),
+    )
+    rentals = (await session.execute(stmt)).all()
+    for equipment_id in equipment_ids:
+        occupancy.clear_equipment(equipment_id)
+    occupancy.mark_many(rentals)
+
+
+async def sync_occupancy(session: AsyncSession) -> None:
+    """
+    Догоняет карты занятости по журналу изменений.
+
+    Процесс сам отмечает в картах свои записи, но аренды, записанные
+    другими процессами (воркерами сервера, import_cli.py), видит только
+    через журнал. Перед чтением карт номер последнего изменения сверяется
+    с last_seq; если журнал ушел вперед, оборудование изменившихся аренд
+    перечитывается из базы, а новый last_seq сохраняется в заголовке файла.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+    """
+    seq = await session.scalar(select(func.max(Change.id))) or 0  # До сверки: поздние изменения сверятся в следующий раз
+    if seq <= occupancy.last_seq:
+        return
+    async with occupancy_lock:
+        if seq <= occupancy.last_seq:  # Пока ждали, сверил другой запрос
+            return
+        await _replay_changes(session, occupancy.last_seq)
+        occupancy.last_seq = seq
+        occupancy.write_header()
+
+
+def _occupancy_low() -> date:
+    """Возвращает первый день горизонта карт для текущей даты."""
+    return date.today() - timedelta(days=settings.occupancy_past_days)
+
+
+async def warm_occupancy(session: AsyncSession) -> None:
+    """
+    Открывает карты занятости из файла и сверяет их с базой.
+
+    Если файл подходит, горизонт сдвигается до текущей даты, а из базы
+    перечитывается только оборудование с арендами, изменившимися после
+    last_seq файла (по журналу изменений). Иначе, а также если изменений
+    больше settings.occupancy_replay_max, карты строятся заново из rentals.
+    Если файл захвачен другим процессом, карты в этом процессе не
+    используются (occupancy.ready остается False).
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+    """
+    low = _occupancy_low()
+    try:
+        loaded = occupancy.open(settings.occupancy_path or None)
+    except BlockingIOError:  # Файлом владеет другой воркер; своя копия в памяти устаревала бы
+        logger.warning(
+            "Occupancy file %s is locked by another process, occupancy bitmaps are disabled",
+            settings.occupancy_path,
+        )
+        return
+    last_seq = await session.scalar(select(func.max(Change.id))) or 0  # До сверки: поздние изменения сверятся в следующий раз
+    if (
+        loaded
+        and occupancy.low <= low.toordinal()
+        and 0 <= last_seq - occupancy.last_seq <= settings.occupancy_replay_max
+    ):
+        await _roll_occupancy(session, low)
+        await _replay_changes(session, occupancy.last_seq)
+    else:
+        occupancy.reset(low)
+        await _load_occupancy(session, low, date.fromordinal(occupancy.high))
+    occupancy.last_seq = last_seq
+    occupancy.write_header()
+    occupancy.flush()
+    occupancy.ready = True
+
+
+async def _roll_occupancy(session: AsyncSession, low: date) -> None:
+    """Сдвигает горизонт карт до low и загружает новые дни из базы."""
+    days = occupancy.roll(low)
+    if days is not None:
+        await _load_occupancy(session, *days)
+        occupancy.finish_roll()
+
+
+async def roll_occupancy(session: AsyncSession) -> None:
+    """
+    Сдвигает горизонт карт занятости вслед за текущей датой.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+    """
+    if occupancy.ready:
+        async with occupancy_lock:
+            await _roll_occupancy(session, _occupancy_low())
+        occupancy.flush()
+
+
+def occupancy_add(equipment_id: int, start_date, end_date) -> None:
+    """
+    Отмечает дни новой аренды в картах занятости.
+
+    Аргументы:
+        equipment_id (int): Идентификатор оборудования.
+        start_date (date | datetime): Дата начала аренды.
+        end_date (date | datetime): Дата окончания аренды.
+    """
+    if occupancy.ready:
+        occupancy.mark(equipment_id, as_date(start_date), as_date(end_date), True)
+
+
+async def occupancy_release(
+    session: AsyncSession, equipment_id: int, start_date, end_date
+) -> None:
+    """
+    Освобождает в картах дни удаленной или перенесенной аренды.
+
+    Дни, которые занимают и другие аренды того же оборудования (например,
+    после обновления без проверки пересечений), отмечаются снова. Аренды
+    читаются до изменения карт, поэтому дни не бывают видны свободными.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        equipment_id (int): Идентификатор оборудования.
+        start_date (date | datetime): Дата начала аренды.
+        end_date (date | datetime): Дата окончания аренды.
+    """
+    if not occupancy.ready:
+        return
+    start, end = as_date(start_date), as_date(end_date)
+    stmt = select(Rental.equipment_id, Rental.start_date, Rental.end_date).where(
+        Rental.equipment_id == equipment_id, Rental.start_date < end, Rental.end_date > start
+    )  # Другие аренды в освобождаемых днях
+    async with occupancy_lock:
+        rentals = (await session.execute(stmt)).all()
+        occupancy.mark(equipment_id, start, end, False)
+        occupancy.mark_many(rentals)
+
+
+async def warm_availability_cache(session: AsyncSession) -> None:
+    """
+    Заполняет кэш занятости данными из таблицы rentals.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+    """
+    availability_cache.clear()
+    last_seq = await session.scalar(select(func.max(Change.id))) or 0  # До загрузки: поздние изменения догонит sync
+    async for row in _load_rentals(session):
+        availability_cache.add(row.id, row.equipment_id, row.start_date, row.end_date)
+    availability_cache.last_seq = last_seq
+    availability_cache.ready = True
+
+
+async def sync_availability_cache(session: AsyncSession) -> None:
+    """
+    Догоняет кэш занятости по журналу изменений.
+
+    Аренды, записанные другими процессами (воркерами сервера,
+    import_cli.py), кэш видит только через журнал. Номер последнего
+    изменения сверяется с last_seq (один запрос по первичному ключу);
+    если журнал ушел вперед, новые изменения аренд применяются к кэшу
+    по порядку: в журнале уже есть даты и оборудование аренды, поэтому
+    таблица rentals не читается.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+    """
+    seq = await session.scalar(select(func.max(Change.id))) or 0
+    if seq <= availability_cache.last_seq:
+        return
+    async with availability_cache_lock:
+        if seq <= availability_cache.last_seq:  # Пока ждали, догнал другой запрос
+            return
+        stmt = (
+            select(Change.entity_id, Change.op, Change.data)
+            .where(
+                Change.id > availability_cache.last_seq,
+                Change.id <= seq,
+                Change.entity == "rentals",
+            )
+            .order_by(Change.id)
+        )
+        for rental_id, op, data in (await session.execute(stmt)).all():
+            if op == "delete":
+                availability_cache.remove(rental_id)
+            else:
+                availability_cache.add(
+                    rental_id,
+                    data["equipment_id"],
+                    as_date(datetime.fromisoformat(data["start_date"])),
+                    as_date(datetime.fromisoformat(data["end_date"])),
+                )
+        availability_cache.last_seq = seq
+
+
+async def verify_availability_cache(session: AsyncSession) -> list[int]:
+    """
+    Сверяет кэш занятости с таблицей rentals.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+
+    Возвращает:
+        list[int]: Идентификаторы аренд, которые расходятся с базой
+        (отсутствуют в кэше, лишние в кэше или с другими датами).
+    """
+    cached = availability_cache.snapshot()
+    mismatched = []
+    async for row in _load_rentals(session):
+        entry = (row.equipment_id, as_date(row.start_date), as_date(row.end_date))
+        if cached.pop(row.id, None) != entry:
+            mismatched.append(row.id)
+    mismatched.extend(cached)  # Аренды, которых уже нет в базе
+    return sorted(mismatched)
+
+
+async def has_overlap(
+    session: AsyncSession, equipment_id: int, start_date: date, end_date: date
+) -> bool:
+    """
+    Проверяет, пересекается ли интервал с существующими арендами оборудования.
+
+    Запрос строится как EXISTS и обслуживается составным индексом
+    (equipment_id, start_date, end_date): SQLite останавливается на первой
+    найденной строке и не читает остальные пересечения.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        equipment_id (int): Идентификатор оборудования.
+        start_date (date): Дата начала проверяемого интервала.
+        end_date (date): Дата окончания проверяемого интервала.
+
+    Возвращает:
+        bool: True, если оборудование занято хотя бы в часть интервала.
+    """
+    stmt = select(
+        exists().where(
+            Rental.equipment_id == equipment_id,
+            Rental.start_date < as_date(end_date),
+            Rental.end_date > as_date(start_date),
+        )
+    )  # Формируем EXISTS-запрос на пересечение
+    return bool(await session.scalar(stmt))  # Выполняем запрос
+
+
+async def get_free_intervals(
+    session: AsyncSession, equipment_id: int, date_from: date, date_to: date
+) -> list[tuple[date, date]]:
+    """
+    Вычисляет свободные интервалы оборудования в окне [date_from, date_to).
+
+    Из базы читаются только аренды, пересекающие окно (запрос покрывается
+    составным индексом), промежутки между ними считаются на сервере. Если
+    окно внутри горизонта карт занятости, интервалы собираются по их
+    битам; из базы читается только номер последнего изменения журнала
+    (sync_occupancy).
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        equipment_id (int): Идентификатор оборудования.
+        date_from (date): Начало окна.
+        date_to (date): Конец окна (не включается).
+
+    Возвращает:
+        list[tuple[date, date]]: Свободные интервалы [start, end) по возрастанию.
+    """
+    if occupancy.ready:
+        await sync_occupancy(session)  # Аренды других процессов
+    if occupancy.ready and occupancy.covers(date_from, date_to):
+        days = occupancy.busy_days(equipment_id, date_from, date_to)
+        busy, start = [], None
+        for offset, taken in enumerate(days):  # Склеиваем занятые дни в интервалы
+            if taken and start is None:
+                start = offset
+            elif not taken and start is not None:
+                busy.append((date_from + timedelta(start), date_from + timedelta(offset)))
+                start = None
+        if start is not None:
+            busy.append((date_from + timedelta(start), date_to))
+    else:
+        stmt = (
+            select(Rental.start_date, Rental.end_date)
+            .where(
+                Rental.equipment_id == equipment_id,
+                Rental.start_date < date_to,
+                Rental.end_date > date_from,
+            )
+            .order_by(Rental.start_date)
+        )  # Формируем запрос аренд внутри окна
+        busy = await session.execute(stmt)  # Выполняем запрос
+
+    free = []
+    cursor = date_from  # Граница уже просмотренной части окна
+    for start, end in busy:
+        if start > cursor:
+            free.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < date_to:
+        free.append((cursor, date_to))
+    return free
+
+
+async def get_available_equipment(
+    session: AsyncSession,
+    date_from: date,
+    date_to: date,
+    limit: int,
+    after_id: int | None = None,
+) -> list[Equipment]:
+    """
+    Получает страницу оборудования, свободного весь интервал [date_from, date_to).
+
+    Выполняется одним запросом: анти-соединение equipments с rentals через
+    NOT EXISTS, подзапрос обслуживается составным индексом аренд. Если
+    интервал внутри горизонта карт занятости, свободные id берутся из OR
+    строк карт за дни интервала (сверенных с журналом изменений), а из
+    базы читаются только строки оборудования по первичному ключу.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        date_from (date): Начало интервала.
+        date_to (date): Конец интервала (не включается).
+        limit (int): Максимальное количество записей на странице.
+        after_id (int | None): Вернуть записи с id строго больше указанного.
+
+    Возвращает:
+        list[Equipment]: Список свободного оборудования.
+    """
+    if occupancy.ready:
+        await sync_occupancy(session)  # Аренды других процессов
+    if occupancy.ready and occupancy.covers(date_from, date_to):
+        return await _available_from_occupancy(session, date_from, date_to, limit, after_id or 0)
+    busy = exists().where(
+        Rental.equipment_id == Equipment.id,
+        Rental.start_date < date_to,
+        Rental.end_date > date_from,
+    )  # Пересекающиеся аренды
+    stmt = select(Equipment).where(~busy).order_by(Equipment.id).limit(limit)
+    if after_id is not None:
+        stmt = stmt.where(Equipment.id > after_id)  # Продолжаем после курсора
+    equipment_list = await session.scalars(stmt)  # Выполняем запрос
+    return equipment_list.all()
+
+
+async def _available_from_occupancy(
+    session: AsyncSession, date_from: date, date_to: date, limit: int, after_id: int
+) -> list[Equipment]:
+    """
+    Страница свободного оборудования по картам занятости.
+
+    Кандидаты - свободные по картам id не больше максимального id
+    оборудования (часть из них может быть удалена) и все id за пределами
+    карт, которые еще ни разу не бронировались. Если удаленные id съели
+    часть страницы, берется следующая порция кандидатов.
+    """
+    top = await session.scalar(select(func.max(Equipment.id))) or 0
+    busy = occupancy.busy_mask(date_from, date_to)
+    found: list[Equipment] = []
+    while len(found) < limit:
+        want = limit - len(found)
+        candidates = occupancy.free_ids(busy, after_id, want, top)
+        stmt = select(Equipment).where(Equipment.id > after_id).order_by(Equipment.id).limit(want)
+        if len(candidates) < want and top >= occupancy.capacity:  # Дальше id без битов в картах
+            stmt = stmt.where(
+                or_(Equipment.id.in_(candidates), Equipment.id >= occupancy.capacity)
+            )
+        else:
+            stmt = stmt.where(Equipment.id.in_(candidates))
+        page = (await session.scalars(stmt)).all()
+        found.extend(page)
+        if len(candidates) < want:
+            break  # Больше кандидатов нет
+        after_id = candidates[-1]
+    return found
+
+
+async def is_booked(
+    session: AsyncSession, equipment_id: int, start_date: date, end_date: date
+) -> bool:
+    """
+    Проверяет занятость оборудования перед бронированием.
+
+    При включенном кэше занятости (или картах занятости, если интервал
+    внутри их горизонта) ответ дают они, сверенные с журналом изменений:
+    вместо запроса пересечений выполняется только чтение номера последнего
+    изменения. Ответ "свободно" не окончателен и не должен быть: вставка
+    аренды повторяет проверку в базе под блокировкой записи. Без кэша и
+    карт ответ дает запрос has_overlap.
+
+    В режиме settings.availability_cache_check ответ кэша (или карт)
+    сравнивается с базой, расхождения пишутся в лог, а возвращается ответ базы.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        equipment_id (int): Идентификатор оборудования.
+        start_date (date): Дата начала проверяемого интервала.
+        end_date (date): Дата окончания проверяемого интервала.
+
+    Возвращает:
+        bool: True, если оборудование занято хотя бы в часть интервала.
+    """
+    start, end = as_date(start_date), as_date(end_date)
+    if settings.availability_cache and availability_cache.ready:
+        await sync_availability_cache(session)  # Аренды других процессов
+        cached = availability_cache.overlaps(equipment_id, start, end)
+    elif occupancy.ready and occupancy.covers(start, end):
+        await sync_occupancy(session)
+        cached = not occupancy.is_free(equipment_id, start, end)
+    else:
+        return await has_overlap(session, equipment_id, start, end)
+    if not settings.availability_cache_check:
+        return cached
+
+    booked = await has_overlap(session, equipment_id, start, end)
+    if cached != booked:
+        logger.warning(
+            "Availability cache mismatch: equipment_id=%s [%s, %s) cache=%s db=%s",
+            equipment_id, start_date, end_date, cached, booked,
+        )
+    return booked
@@ -0,0 +1,135 @@
+from typing import Any, Iterable
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, insert
+from core import Base
+from models import Change, Equipment, Rental, User
+from schemas.equipment import Equipment_id
+from schemas.rental import Rental_id
+from schemas.user import User_public
+
+# Схема, в которой запись попадает в журнал (пользователь - без пароля)
+_payload_schemas: dict[type[Base], type[BaseModel]] = {
+    User: User_public,
+    Equipment: Equipment_id,
+    Rental: Rental_id,
+}
+# Core-вставка, минуя ORM bulk insert; номера записей возвращаются тем же запросом
+_insert_change = insert(Change.__table__).returning(Change.__table__.c.id)
+
+
+async def record_changes(
+    session: AsyncSession, model: type[Base], op: str, rows: Iterable[Any]
+) -> int | None:
+    """
+    Добавляет в журнал изменений записи о созданных или обновленных строках.
+
+    Вызывается до commit в той же транзакции, что и сама запись, поэтому
+    журнал не расходится с таблицами: откат убирает и изменение, и его
+    запись в журнале.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        model (type[Base]): Модель измененных строк.
+        op (str): Операция: create или update.
+        rows (Iterable[Any]): ORM-объекты, строки результата или словари колонок.
+
+    Возвращает:
+        int | None: Номер последней добавленной записи или None, если строк нет.
+    """
+    schema = _payload_schemas[model]
+    entries = [
+        {"entity": model.__tablename__, "entity_id": data["id"], "op": op, "data": data}
+        for data in (
+            schema.model_validate(row, from_attributes=True).model_dump(mode="json")
+            for row in rows
+        )
+    ]
+    return await _insert_entries(session, entries)
+
+
+async def record_deletes(
+    session: AsyncSession, model: type[Base], ids: Iterable[int]
+) -> int | None:
+    """
+    Добавляет в журнал изменений метки удаления (tombstone) строк.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        model (type[Base]): Модель удаленных строк.
+        ids (Iterable[int]): Идентификаторы удаленных строк.
+
+    Возвращает:
+        int | None: Номер последней добавленной записи или None, если строк нет.
+    """
+    entries = [
+        {"entity": model.__tablename__, "entity_id": entity_id, "op": "delete", "data": None}
+        for entity_id in ids
+    ]
+    return await _insert_entries(session, entries)
+
+
+async def _insert_entries(session: AsyncSession, entries: list[dict]) -> int | None:
+    """Вставляет записи журнала и возвращает номер последней из них."""
+    if not entries:
+        return None
+    result = await session.execute(_insert_change, entries)  # Пачкой, с RETURNING
+    return max(result.scalars())
+
+
+def table_version(table: str):
+    """
+    Выражение версии таблицы для подзапроса: номер ее последнего изменения.
+
+    Аргументы:
+        table (str): Имя таблицы.
+
+    Возвращает:
+        ScalarSelect: max(id) изменений таблицы по индексу ix_changes_entity.
+    """
+    return select(func.max(Change.id)).where(Change.entity == table).scalar_subquery()
+
+
+async def get_table_versions(session: AsyncSession, tables: Iterable[str]) -> list[int]:
+    """
+    Получает версии таблиц - номера их последних изменений в журнале.
+
+    Версия общая для всех процессов, работающих с базой (воркеров сервера,
+    import_cli.py), и меняется в той же транзакции, что и сама таблица.
+    Все таблицы читаются одним запросом, каждая - по индексу ix_changes_entity.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        tables (Iterable[str]): Имена таблиц.
+
+    Возвращает:
+        list[int]: Версии в порядке tables (0 - таблица еще не менялась).
+    """
+    stmt = select(*(table_version(table) for table in tables))
+    row = (await session.execute(stmt)).one()
+    return [version or 0 for version in row]
+
+
+async def get_changes(session: AsyncSession, since: int, limit: int):
+    """
+    Получает изменения с номером больше since в порядке их записи.
+
+    Запрос идет по первичному ключу журнала, поэтому его стоимость зависит
+    от размера страницы, а не от размера таблиц.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        since (int): Номер последнего уже полученного изменения.
+        limit (int): Максимальное количество изменений на странице.
+
+    Возвращает:
+        Sequence[Row]: Строки (seq, entity, entity_id, op, data).
+    """
+    stmt = (
+        select(Change.id.label("seq"), Change.entity, Change.entity_id, Change.op, Change.data)
+        .where(Change.id > since)
+        .order_by(Change.id)
+        .limit(limit)
+    )
+    result = await session.execute(stmt)  # Выполняем запрос
+    return result.all()
@@ -1,16 +1,37 @@
+import re
+from functools import partial
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, insert, column, func, literal_column, table
 
+from core import settings
+from core.batching import group_commit
+from core.cache import as_dict, entity_cache
 from models import Equipment
+from .change_cruds import record_changes, record_deletes, table_version
 from schemas.equipment import EquipmentBase, EquipmentCreate, Equipment_id
 
 
+async def _insert_equipment(session: AsyncSession, new_equipment: EquipmentCreate) -> Equipment:
+    """Вставляет оборудование без commit."""
+    stmt = (
+        insert(Equipment)
+        .values(**new_equipment.model_dump())
+        .returning(Equipment)  # Получаем созданную строку тем же запросом
+    )
+    equipment = await session.scalar(stmt)  # Выполняем вставку
+    await record_changes(session, Equipment, "create", [equipment])  # Пишем в журнал изменений
+    return equipment
+
+
 async def create_equipment(
     new_equipment: EquipmentCreate, session: AsyncSession
 ) -> Equipment:
     """
     Создает новое оборудование в базе данных.
 
+    При settings.group_commit вставка выполняется задачей группового
+    commit вместе с другими созданиями, session не используется.
+
     Аргументы:
         new_equipment (EquipmentCreate): Данные для создания нового оборудования.
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
@@ -18,28 +39,115 @@ async def create_equipment(
     Возвращает:
         Equipment: Созданный объект оборудования.
     """
-    equipment = Equipment(**new_equipment.model_dump())  # Создаем экземпляр Equipment
-    session.add(equipment)  # Добавляем оборудование в сессию
+    if settings.group_commit:
+        return await group_commit.submit(partial(_insert_equipment, new_equipment=new_equipment))
+    equipment = await _insert_equipment(session, new_equipment)
     await session.commit()  # Коммитим изменения в базе данных
-    await session.refresh(equipment)  # Обновляем объект оборудования
     return equipment  # Возвращаем созданное оборудование
 
 
-async def get_all_equipment(session: AsyncSession) -> list[Equipment_id]:
+async def get_all_equipment(
+    session: AsyncSession, limit: int, after_id: int | None = None
+) -> list[Equipment_id]:
     """
-    Получает список всего оборудования из базы данных.
+    Получает страницу оборудования из базы данных (keyset-пагинация по id).
 
     Аргументы:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        limit (int): Максимальное количество записей на странице.
+        after_id (int | None): Вернуть записи с id строго больше указанного.
 
     Возвращает:
         list[Equipment_id]: Список объектов оборудования.
     """
-    stmt = select(Equipment).order_by(Equipment.id)  # Формируем запрос для получения оборудования
+    stmt = select(Equipment).order_by(Equipment.id).limit(limit)  # Формируем запрос для получения оборудования
+    if after_id is not None:
+        stmt = stmt.where(Equipment.id > after_id)  # Продолжаем после курсора
     equipment_list = await session.scalars(stmt)  # Выполняем запрос
     return equipment_list.all()  # Возвращаем все найденные объекты
 
 
+equipments_fts = table("equipments_fts", column("rowid"))  # Виртуальная таблица FTS5
+
+
+def fts_query(text: str) -> str | None:
+    """
+    Превращает поисковую строку пользователя в запрос FTS5.
+
+    Каждое слово берется в кавычки (синтаксис FTS5 в тексте не
+    интерпретируется) и ищется как префикс; слова объединяются через AND.
+
+    Аргументы:
+        text (str): Строка поиска.
+
+    Возвращает:
+        str | None: Запрос для MATCH или None, если в строке нет слов.
+    """
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words) or None
+
+
+async def search_equipment(
+    session: AsyncSession, text: str, limit: int, offset: int = 0
+) -> list[Equipment]:
+    """
+    Ищет оборудование по словам в названии и описании (SQLite FTS5).
+
+    Результаты упорядочены по релевантности bm25, совпадение в названии
+    весит в 10 раз больше, чем в описании.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        text (str): Строка поиска.
+        limit (int): Максимальное количество записей на странице.
+        offset (int): Сколько лучших результатов пропустить.
+
+    Возвращает:
+        list[Equipment]: Найденное оборудование, лучшие совпадения первыми.
+    """
+    query = fts_query(text)
+    if query is None:
+        return []
+    fts = literal_column("equipments_fts")
+    score = func.bm25(fts, 10.0, 1.0).label("score")
+    ranked = (
+        select(equipments_fts.c.rowid, score)
+        .where(fts.op("MATCH")(query))
+        .order_by(score, equipments_fts.c.rowid)
+        .limit(limit)
+        .offset(offset)
+        .subquery()
+    )  # Ранжируем внутри индекса и только страницу соединяем с таблицей
+    stmt = (
+        select(Equipment)
+        .join(ranked, ranked.c.rowid == Equipment.id)
+        .order_by(ranked.c.score, Equipment.id)
+    )  # Формируем полнотекстовый запрос
+    equipment_list = await session.scalars(stmt)  # Выполняем запрос
+    return equipment_list.all()
+
+
+async def stream_equipment(session: AsyncSession, chunk_size: int):
+    """
+    Потоково читает всю таблицу оборудования серверным курсором.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        chunk_size (int): Количество строк в одной пачке.
+
+    Возвращает:
+        AsyncIterator[Sequence[Row]]: Пачки строк, упорядоченные по id.
+    """
+    stmt = (
+        select(*Equipment.__table__.c)  # Читаем колонки, минуя identity map сессии
+        .order_by(Equipment.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(stmt)  # Открываем серверный курсор
+    async for chunk in result.partitions(chunk_size):
+        yield chunk  # Отдаем очередную пачку
+
+
 async def get_equipment_by_id(session: AsyncSession, equipment_id: int) -> Equipment:
     """
     Получает оборудование по его идентификатору.
@@ -49,11 +157,20 @@ async def get_equipment_by_id(session: AsyncSession, equipment_id: int) -> Equip
         equipment_id (int): Идентификатор оборудования.
 
     Возвращает:
-        Equipment: Объект оборудования с указанным идентификатором.
+        Equipment: Объект оборудования с указанным идентификатором или None.
+        При попадании в кэш возвращается объект, не привязанный к сессии.
     """
-    stmt = select(Equipment).where(Equipment.id == equipment_id)  # Формируем запрос для получения оборудования по ID
-    equipment = await session.scalar(stmt)  # Выполняем запрос
-    return equipment  # Возвращаем найденное оборудование
+
+    async def load():
+        stmt = (
+            select(Equipment, table_version("equipments"))  # Версия таблицы - в том же снимке, что и строка
+            .where(Equipment.id == equipment_id)
+        )  # Формируем запрос для получения оборудования по ID
+        row = (await session.execute(stmt)).one_or_none()  # Выполняем запрос
+        return None if row is None else (as_dict(row[0]), row[1] or 0)
+
+    data = await entity_cache.get_or_load("equipment", equipment_id, load)  # Читаем через кэш
+    return None if data is None else Equipment(**data)  # Возвращаем найденное оборудование
 
 
 async def update_equipment(
@@ -68,19 +185,20 @@ async def update_equipment(
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
 
     Возвращает:
-        Equipment: Обновленный объект оборудования.
+        Equipment: Обновленный объект оборудования или None, если не найдено.
     """
     stmt = (
         update(Equipment)
         .where(Equipment.id == equipment_id)
         .values(**equipment_data.model_dump())  # Обновляем значения оборудования
-        .execution_options(synchronize_session="fetch")  # Синхронизируем сессию
+        .returning(Equipment)  # Получаем обновленную строку тем же запросом
     )
-    await session.execute(stmt)  # Выполняем обновление
+    updated_equipment = await session.scalar(stmt)  # Выполняем обновление
+    if updated_equipment is not None:
+        version = await record_changes(session, Equipment, "update", [updated_equipment])  # Пишем в журнал изменений
     await session.commit()  # Коммитим изменения
-
-    # Получаем обновленное оборудование
-    updated_equipment = await session.get(Equipment, equipment_id)  # Получаем обновленный объект
+    if updated_equipment is not None:
+        await entity_cache.invalidate("equipment", equipment_id, version)  # Сбрасываем кэш
     return updated_equipment  # Возвращаем обновленное оборудование
 
 
@@ -95,7 +213,13 @@ async def delete_equipment(session: AsyncSession, equipment_id: int) -> bool:
     Возвращает:
         bool: True, если оборудование было успешно удалено, иначе False.
     """
-    stmt = delete(Equipment).where(Equipment.id == equipment_id)  # Формируем запрос на удаление
-    result = await session.execute(stmt)  # Выполняем удаление
+    stmt = (
+        delete(Equipment).where(Equipment.id == equipment_id).returning(Equipment.id)
+    )  # Формируем запрос на удаление
+    deleted_id = await session.scalar(stmt)  # Выполняем удаление
+    if deleted_id is not None:
+        version = await record_deletes(session, Equipment, [deleted_id])  # Метка удаления в журнале
     await session.commit()  # Коммитим изменения
-    return result.rowcount > 0  # Возвращаем True, если удалено хотя бы одно оборудование
+    if deleted_id is not None:
+        await entity_cache.invalidate("equipment", equipment_id, version)  # Сбрасываем кэш
+    return deleted_id is not None  # Возвращаем True, если оборудование было удалено
@@ -0,0 +1,149 @@
+import time
+from typing import AsyncIterator
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, or_
+from sqlalchemy.exc import IntegrityError
+from core import Base
+from schemas.importing import ImportReport, ImportRowError
+from .change_cruds import record_changes
+
+
+def _unique_columns(model: type[Base]) -> list[str]:
+    """Возвращает имена уникальных колонок модели (кроме первичного ключа)."""
+    return [c.name for c in model.__table__.columns if c.unique and not c.primary_key]
+
+
+async def _existing_values(
+    session: AsyncSession, model: type[Base], rows: list[dict], columns: list[str]
+) -> dict[str, set]:
+    """
+    Находит значения уникальных колонок пачки, которые уже есть в таблице.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        model (type[Base]): Модель, в которую идет импорт.
+        rows (list[dict]): Проверяемые строки пачки.
+        columns (list[str]): Уникальные колонки модели.
+
+    Возвращает:
+        dict[str, set]: Занятые значения по каждой колонке.
+    """
+    taken = {name: set() for name in columns}
+    if not columns or not rows:
+        return taken
+    table = model.__table__
+    stmt = select(*(table.c[name] for name in columns)).where(
+        or_(*(table.c[name].in_({row[name] for row in rows}) for name in columns))
+    )  # Одним запросом ищем совпадения по всем уникальным колонкам
+    for found in await session.execute(stmt):
+        for name in columns:
+            taken[name].add(getattr(found, name))
+    return taken
+
+
+async def _insert_chunk(
+    session: AsyncSession,
+    model: type[Base],
+    chunk: list[tuple[int, dict]],
+    report: ImportReport,
+) -> None:
+    """
+    Вставляет пачку провалидированных строк в одной транзакции.
+
+    Строки, нарушающие уникальность (совпадение с таблицей или с другой
+    строкой пачки), отбрасываются заранее и попадают в отчет. Если вставка
+    все же упала на ограничении (параллельная запись), пачка повторяется
+    построчно через SAVEPOINT, чтобы отчет указывал конкретные строки.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        model (type[Base]): Модель, в которую идет импорт.
+        chunk (list[tuple[int, dict]]): Пары (номер строки, значения).
+        report (ImportReport): Отчет, который дополняется результатами.
+    """
+    columns = _unique_columns(model)
+    taken = await _existing_values(session, model, [row for _, row in chunk], columns)
+    accepted = []
+    for line_no, row in chunk:
+        duplicate = next((name for name in columns if row[name] in taken[name]), None)
+        if duplicate is not None:
+            report.errors.append(
+                ImportRowError(row=line_no, detail=f"Значение {duplicate} уже существует")
+            )
+            continue
+        for name in columns:
+            taken[name].add(row[name])
+        accepted.append((line_no, row))
+
+    if not accepted:
+        return
+    stmt = insert(model).returning(*model.__table__.c, sort_by_parameter_order=True)
+    try:
+        inserted = await session.execute(stmt, [row for _, row in accepted])  # executemany
+        await record_changes(session, model, "create", inserted.all())  # Пишем в журнал изменений
+        await session.commit()
+        report.inserted += len(accepted)
+    except IntegrityError:
+        await session.rollback()
+        for line_no, row in accepted:  # Повторяем построчно, чтобы найти виновные строки
+            try:
+                async with session.begin_nested():
+                    inserted = await session.execute(stmt, [row])
+                    await record_changes(session, model, "create", inserted.all())
+                report.inserted += 1
+            except IntegrityError as exc:
+                report.errors.append(ImportRowError(row=line_no, detail=str(exc.orig)))
+        await session.commit()
+
+
+async def import_rows(
+    session: AsyncSession,
+    model: type[Base],
+    schema: type[BaseModel],
+    records: AsyncIterator[dict | None],
+    chunk_size: int,
+) -> ImportReport:
+    """
+    Импортирует поток записей в таблицу пачками по chunk_size.
+
+    Каждая запись валидируется схемой, ошибки валидации и уникальности
+    записываются в отчет с номером строки и не прерывают импорт. Каждая
+    пачка вставляется одной транзакцией.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        model (type[Base]): Модель, в которую идет импорт.
+        schema (type[BaseModel]): Схема создания записи (например, UserCreate).
+        records (AsyncIterator[dict | None]): Разобранные записи входного файла.
+        chunk_size (int): Количество строк в одной транзакции.
+
+    Возвращает:
+        ImportReport: Итоги импорта и скорость в строках в секунду.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    chunk = []
+    async for record in records:
+        report.total += 1
+        if record is None:
+            report.errors.append(ImportRowError(row=report.total, detail="Не удалось разобрать строку"))
+            continue
+        try:
+            chunk.append((report.total, schema.model_validate(record).model_dump()))
+        except ValidationError as exc:
+            detail = "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in exc.errors()
+            )
+            report.errors.append(ImportRowError(row=report.total, detail=detail))
+        if len(chunk) >= chunk_size:
+            await _insert_chunk(session, model, chunk, report)
+            chunk = []
+    if chunk:
+        await _insert_chunk(session, model, chunk, report)
+
+    report.failed = report.total - report.inserted
+    report.errors.sort(key=lambda error: error.row)
+    report.seconds = round(time.perf_counter() - started, 3)
+    report.rows_per_sec = round(report.total / report.seconds, 1) if report.seconds else 0.0
+    return report
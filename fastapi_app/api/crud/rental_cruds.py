@@ -1,26 +1,185 @@
-from fastapi.responses import Response
+from datetime import date
+from collections.abc import Collection
+from functools import partial
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
-from models import Rental
-from schemas.rental import RentalBase, RentalCreate, Rental_id
-from .equipment_cruds import get_equipment_by_id
+from sqlalchemy import select, delete, update, insert, exists, or_, values, column, bindparam, Integer, Date
+from sqlalchemy.orm import aliased, noload, selectinload
+from core import settings
+from core.batching import group_commit
+from core.locks import KeyedLock
+from core.metrics import booking_conflicts
+from models import Equipment, Rental
+from schemas.rental import RentalBase, RentalCreate, Rental_id, RentalBulkResult
+from .availability_cruds import (
+    AvailabilityCache,
+    as_date,
+    availability_cache,
+    availability_events,
+    is_booked,
+    occupancy,
+    occupancy_add,
+    occupancy_release,
+    publish_availability,
+)
+from .change_cruds import record_changes, record_deletes
 
+booking_locks = KeyedLock()  # Очередь бронирований по id оборудования
 
-async def get_all_rental(session: AsyncSession):
+# INSERT ... SELECT ... WHERE NOT EXISTS: аренда вставляется, только если
+# оборудование есть и свободно на момент выполнения самого запроса
+_insert_if_free = (
+    insert(Rental)
+    .from_select(
+        ["equipment_id", "user_id", "start_date", "end_date"],
+        select(
+            bindparam("equipment_id", type_=Integer),
+            bindparam("user_id", type_=Integer),
+            bindparam("start_date", type_=Date),
+            bindparam("end_date", type_=Date),
+        ).where(
+            exists().where(Equipment.id == bindparam("equipment_id")),
+            ~exists().where(
+                Rental.equipment_id == bindparam("equipment_id"),
+                Rental.start_date < bindparam("end_date"),
+                Rental.end_date > bindparam("start_date"),
+            ),
+        ),
+    )
+    .returning(*Rental.__table__.c)
+    .execution_options(dml_strategy="raw")  # Параметры - значения bindparam, а не строки ORM
+)
+
+
+async def lock_equipment(session: AsyncSession, equipment_ids: list[int]) -> None:
     """
-    Получает список всех аренды из базы данных.
+    Блокирует строки оборудования до конца транзакции (SELECT ... FOR UPDATE).
+
+    Сериализует бронирования одного оборудования между процессами на
+    серверных СУБД. В SQLite FOR UPDATE не поддерживается: там запись
+    и так идет под единственной блокировкой базы, а гонку закрывает
+    условная вставка, поэтому запрос не выполняется.
 
     Аргументы:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        equipment_ids (list[int]): Идентификаторы оборудования.
+    """
+    if session.get_bind().dialect.name == "sqlite":
+        return
+    stmt = (
+        select(Equipment.id)
+        .where(Equipment.id.in_(equipment_ids))
+        .order_by(Equipment.id)  # Единый порядок блокировок против взаимоблокировок
+        .with_for_update()
+    )
+    await session.execute(stmt)
+
+
+def expand_options(expand: Collection[str]) -> list:
+    """
+    Опции загрузки связей аренды для параметра expand.
+
+    Запрошенные связи подгружаются selectinload: один дополнительный
+    запрос SELECT ... WHERE id IN (...) на связь для всей страницы.
+    Остальные помечаются noload и остаются None без обращения к базе.
+
+    Аргументы:
+        expand (Collection[str]): Имена раскрываемых связей (equipment, user).
 
     Возвращает:
-        list: Список всех объектов аренды.
+        list: Опции для Select.options().
+    """
+    return [
+        selectinload(relation) if relation.key in expand else noload(relation)
+        for relation in (Rental.equipment, Rental.user)
+    ]
+
+
+async def get_all_rental(
+    session: AsyncSession,
+    limit: int,
+    after_id: int | None = None,
+    expand: Collection[str] = (),
+    user_id: int | None = None,
+    equipment_id: int | None = None,
+    active_on: date | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+):
     """
-    stmt = select(Rental).order_by(Rental.id)  # Формируем запрос для получения всех аренды
+    Получает страницу аренд из базы данных (keyset-пагинация по id).
+
+    Фильтры комбинируются через AND и обслуживаются индексами: user_id -
+    (user_id, start_date, end_date), equipment_id - (equipment_id,
+    start_date, end_date), active_on и from без них - (end_date,
+    start_date). В последнем случае SQLite без статистики предпочитает
+    обход таблицы по id ради ORDER BY id LIMIT, который для актуальных дат
+    читает почти всю таблицу. Поэтому id в сортировке и курсоре заменяется
+    выражением id + 0: оно не может использовать первичный ключ, и
+    планировщик берет индекс по end_date. Фильтр только по to остается
+    обходом по id: подходящие строки идут с начала таблицы, и обход
+    останавливается на limit-й из них.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        limit (int): Максимальное количество записей на странице.
+        after_id (int | None): Вернуть записи с id строго больше указанного.
+        expand (Collection[str]): Связи, загружаемые вместе с арендами.
+        user_id (int | None): Только аренды пользователя.
+        equipment_id (int | None): Только аренды оборудования.
+        active_on (date | None): Только аренды, действующие в этот день.
+        date_from (date | None): Только аренды, заканчивающиеся после этой даты.
+        date_to (date | None): Только аренды, начинающиеся раньше этой даты.
+
+    Возвращает:
+        list: Список объектов аренды.
+    """
+    order_key = Rental.id
+    date_only = user_id is None and equipment_id is None
+    if date_only and (active_on is not None or date_from is not None):
+        order_key = Rental.id + 0  # Не даем выбрать обход по первичному ключу
+    stmt = (
+        select(Rental)
+        .options(*expand_options(expand))
+        .order_by(order_key)
+        .limit(limit)
+    )  # Формируем запрос для получения аренд
+    if after_id is not None:
+        stmt = stmt.where(order_key > after_id)  # Продолжаем после курсора
+    if user_id is not None:
+        stmt = stmt.where(Rental.user_id == user_id)
+    if equipment_id is not None:
+        stmt = stmt.where(Rental.equipment_id == equipment_id)
+    if active_on is not None:
+        stmt = stmt.where(Rental.start_date <= active_on, Rental.end_date > active_on)
+    if date_from is not None:
+        stmt = stmt.where(Rental.end_date > date_from)  # Пересечение с окном [from, to)
+    if date_to is not None:
+        stmt = stmt.where(Rental.start_date < date_to)
     rental_list = await session.scalars(stmt)  # Выполняем запрос
     return rental_list.all()  # Возвращаем все найденные объекты
 
 
+async def stream_rental(session: AsyncSession, chunk_size: int):
+    """
+    Потоково читает всю таблицу аренд серверным курсором.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        chunk_size (int): Количество строк в одной пачке.
+
+    Возвращает:
+        AsyncIterator[Sequence[Row]]: Пачки строк, упорядоченные по id.
+    """
+    stmt = (
+        select(*Rental.__table__.c)  # Читаем колонки, минуя identity map сессии
+        .order_by(Rental.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(stmt)  # Открываем серверный курсор
+    async for chunk in result.partitions(chunk_size):
+        yield chunk  # Отдаем очередную пачку
+
+
 async def get_rental_by_equipment(session: AsyncSession, equipment_id: int):
     """
     Получает список аренды по идентификатору оборудования.
@@ -37,26 +196,91 @@ async def get_rental_by_equipment(session: AsyncSession, equipment_id: int):
     return rental_list.all()  # Возвращаем все найденные объекты
 
 
-async def get_rental_by_id(session: AsyncSession, rental_id: int):
+async def get_rental_by_id(
+    session: AsyncSession, rental_id: int, expand: Collection[str] = ()
+):
     """
     Получает аренду по ее идентификатору.
 
     Аргументы:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
         rental_id (int): Идентификатор аренды.
+        expand (Collection[str]): Связи, загружаемые вместе с арендой.
 
     Возвращает:
         Rental: Объект аренды с указанным идентификатором или None, если не найдено.
     """
-    stmt = select(Rental).filter(Rental.id == rental_id)  # Формируем запрос для получения аренды по ID
+    stmt = (
+        select(Rental)
+        .options(*expand_options(expand))
+        .filter(Rental.id == rental_id)
+    )  # Формируем запрос для получения аренды по ID
     rental = await session.scalar(stmt)  # Выполняем запрос
     return rental  # Возвращаем найденную аренду или None
 
 
+async def _insert_rental(session: AsyncSession, new_rental: RentalCreate) -> Rental | None:
+    """
+    Проверяет занятость и вставляет аренду без commit.
+
+    Возвращает:
+        Rental | None: Вставленная аренда или None, если даты заняты
+        или оборудования нет.
+    """
+    equipment_id = new_rental.equipment_id
+    await lock_equipment(session, [equipment_id])
+    # Проверяем, есть ли пересечения с существующими арендами
+    if await is_booked(
+        session=session,
+        equipment_id=equipment_id,
+        start_date=new_rental.start_date,
+        end_date=new_rental.end_date,
+    ):  # Если оборудование занято, возвращаем None
+        return None
+
+    # Вставка с повторной проверкой в том же запросе: он выполняется
+    # под блокировкой записи и видит аренды, записанные другими
+    # процессами после проверки выше
+    params = new_rental.model_dump()
+    row = (await session.execute(_insert_if_free, params)).one_or_none()  # Выполняем вставку
+    if row is None:  # Аренду на эти даты успели записать раньше или оборудования нет
+        return None
+    new_rent = Rental(**row._mapping)
+    await record_changes(session, Rental, "create", [new_rent])  # Пишем в журнал изменений
+    return new_rent
+
+
+def _rental_created(new_rent: Rental | None) -> None:
+    """Обновляет кэши и подписчиков после commit аренды."""
+    if new_rent is None:  # Даты заняты - аренда не создана
+        booking_conflicts.inc("single")
+        return
+    if availability_cache.ready:  # Синхронизируем кэш занятости
+        availability_cache.add(
+            new_rent.id, new_rent.equipment_id, new_rent.start_date, new_rent.end_date
+        )
+    occupancy_add(new_rent.equipment_id, new_rent.start_date, new_rent.end_date)  # Карты занятости
+    publish_availability("create", new_rent)  # Уведомляем подписчиков оборудования
+
+
 async def create_rental(session: AsyncSession, new_rental: RentalCreate):
     """
     Создает новую аренду в базе данных.
 
+    Проверка занятости и вставка выполняются под блокировкой оборудования:
+    в процессе - под asyncio-блокировкой booking_locks (параллельные
+    бронирования другого оборудования не ждут), между процессами - под
+    блокировкой строки оборудования или, в SQLite, условной вставкой
+    INSERT ... SELECT ... WHERE NOT EXISTS, которая повторяет проверку
+    под блокировкой записи.
+
+    При settings.group_commit аренда записывается задачей группового
+    commit: проверки выполняются ее сессией, которая видит и еще не
+    закоммиченные аренды своей пачки, поэтому booking_locks не берется
+    (иначе писатель, держащий блокировку записи, мог бы ждать массовое
+    бронирование, которое ждет его). Условная вставка по-прежнему
+    защищает от пересечений с арендами, записанными в обход пачки.
+
     Аргументы:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
         new_rental (RentalCreate): Данные для создания новой аренды.
@@ -64,25 +288,159 @@ async def create_rental(session: AsyncSession, new_rental: RentalCreate):
     Возвращает:
         Rental: Созданный объект аренды или None, если аренда не может быть создана.
     """
-    new_rent = Rental(**new_rental.model_dump())  # Создаем экземпляр Rental
+    if settings.group_commit:
+        return await group_commit.submit(
+            partial(_insert_rental, new_rental=new_rental), _rental_created
+        )
+    async with booking_locks.hold(new_rental.equipment_id):  # Ждем только бронирования того же оборудования
+        new_rent = await _insert_rental(session, new_rental)
+        if new_rent is None:
+            await session.rollback()
+        else:
+            await session.commit()  # Коммитим изменения
+    _rental_created(new_rent)
+    return new_rent  # Возвращаем созданную аренду
 
-    # Проверяем, есть ли пересечения с существующими арендами
-    stmt = select(Rental).filter(
-        Rental.equipment_id == new_rent.equipment_id,
-        Rental.start_date < new_rent.end_date,
-        Rental.end_date > new_rent.start_date,
+
+async def _reject_late_conflicts(
+    session: AsyncSession, results: list[RentalBulkResult], accepted: list[int]
+) -> list[int]:
+    """
+    Проверяет только что вставленные аренды пакета на пересечения с чужими.
+
+    Вызывается после вставки, когда транзакция уже держит блокировку записи
+    и видит аренды, записанные другими процессами после первой проверки.
+    Такие аренды пакета удаляются в той же транзакции и помечаются отказом.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        results (list[RentalBulkResult]): Результаты пакета с id вставленных аренд.
+        accepted (list[int]): Индексы вставленных элементов пакета.
+
+    Возвращает:
+        list[int]: Индексы аренд, оставшихся принятыми.
+    """
+    new_ids = [results[idx].id for idx in accepted]
+    other = aliased(Rental)
+    stmt = select(Rental.id).where(
+        Rental.id.in_(new_ids),
+        exists().where(
+            other.equipment_id == Rental.equipment_id,
+            other.start_date < Rental.end_date,
+            other.end_date > Rental.start_date,
+            other.id.not_in(new_ids),
+        ),
     )
+    late = set(await session.scalars(stmt))
+    if not late:
+        return accepted
+    await session.execute(delete(Rental).where(Rental.id.in_(late)))  # Уступаем чужим арендам
+    for idx in accepted:
+        if results[idx].id in late:
+            booking_conflicts.inc("bulk")
+            results[idx] = RentalBulkResult(
+                index=idx, accepted=False, detail="Оборудование занято на эти даты"
+            )
+    return [idx for idx in accepted if results[idx].accepted]
 
-    rental_list = await session.execute(stmt)
-    existing_rentals = rental_list.scalars().all()  # Получаем все существующие аренды
 
-    if existing_rentals:  # Если есть существующие аренды, возвращаем None
-        return None
-    else:
-        session.add(new_rent)  # Добавляем новую аренду в сессию
-        await session.commit()  # Коммитим изменения
-        await session.refresh(new_rent)  # Обновляем объект аренды
-        return new_rent  # Возвращаем созданную аренду
+async def create_rentals_bulk(
+    session: AsyncSession, new_rentals: list[RentalCreate]
+) -> list[RentalBulkResult]:
+    """
+    Создает пакет аренд в одной транзакции.
+
+    Пересечения с уже существующими арендами и ссылки на несуществующее
+    оборудование ищутся одним запросом для всего пакета (CTE из VALUES,
+    соединенный с rentals и equipments через EXISTS). Пересечения
+    внутри пакета проверяются в памяти: при конфликте побеждает элемент,
+    стоящий в пакете раньше. Принятые аренды вставляются одним executemany.
+    Как и в create_rental, пакет держит блокировки всего своего оборудования,
+    а после вставки повторно проверяет пересечения с чужими арендами.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        new_rentals (list[RentalCreate]): Данные для создания аренд.
+
+    Возвращает:
+        list[RentalBulkResult]: Результат по каждому элементу в порядке пакета.
+    """
+    if not new_rentals:
+        return []
+    items = [
+        (idx, r.equipment_id, as_date(r.start_date), as_date(r.end_date))
+        for idx, r in enumerate(new_rentals)
+    ]
+    equipment_ids = sorted({r.equipment_id for r in new_rentals})
+
+    async with booking_locks.hold(*equipment_ids):  # Блокируем все оборудование пакета
+        await lock_equipment(session, equipment_ids)
+
+        # Ищем пересечения всего пакета с существующими арендами одним запросом
+        batch = (
+            values(
+                column("idx", Integer),
+                column("equipment_id", Integer),
+                column("start_date", Date),
+                column("end_date", Date),
+            )
+            .data(items)
+            .cte("batch")
+        )
+        known = exists().where(Equipment.id == batch.c.equipment_id)  # Оборудование есть
+        busy = exists().where(
+            Rental.equipment_id == batch.c.equipment_id,
+            Rental.start_date < batch.c.end_date,
+            Rental.end_date > batch.c.start_date,
+        )
+        stmt = select(batch.c.idx, known).where(or_(~known, busy))
+        rejected = dict((await session.execute(stmt)).all())  # idx -> есть ли оборудование
+
+        results = []
+        accepted = []
+        in_batch = AvailabilityCache()  # Уже принятые интервалы пакета
+        for idx, equipment_id, start, end in items:
+            if rejected.get(idx) is False:
+                detail = "Нет оборудования с таким id"
+            elif idx in rejected:
+                detail = "Оборудование занято на эти даты"
+            elif in_batch.overlaps(equipment_id, start, end):
+                detail = "Пересечение с другой арендой в пакете"
+            else:
+                detail = None
+            if detail is not None:
+                booking_conflicts.inc("bulk")
+                results.append(RentalBulkResult(index=idx, accepted=False, detail=detail))
+            else:
+                in_batch.add(idx, equipment_id, start, end)
+                results.append(RentalBulkResult(index=idx, accepted=True))
+                accepted.append(idx)
+
+        if accepted:
+            rows = [new_rentals[idx].model_dump() for idx in accepted]
+            ids = await session.scalars(
+                insert(Rental).returning(Rental.id, sort_by_parameter_order=True), rows
+            )  # Вставляем принятые аренды одним executemany
+            for idx, rental_id in zip(accepted, ids.all()):
+                results[idx].id = rental_id
+            accepted = await _reject_late_conflicts(session, results, accepted)
+            await record_changes(
+                session,
+                Rental,
+                "create",
+                [{**new_rentals[idx].model_dump(), "id": results[idx].id} for idx in accepted],
+            )  # Пишем в журнал только оставшиеся аренды
+            await session.commit()  # Коммитим весь пакет разом
+
+            if accepted and availability_cache.ready:  # Синхронизируем кэш занятости
+                for idx in accepted:
+                    _, equipment_id, start, end = items[idx]
+                    availability_cache.add(results[idx].id, equipment_id, start, end)
+            for idx in accepted:  # Карты занятости и подписчики оборудования
+                _, equipment_id, start, end = items[idx]
+                occupancy_add(equipment_id, start, end)
+                publish_availability("create", {**new_rentals[idx].model_dump(), "id": results[idx].id})
+    return results
 
 
 async def update_rental(session: AsyncSession, rental_id: int, rental_data: RentalBase):
@@ -95,20 +453,44 @@ async def update_rental(session: AsyncSession, rental_id: int, rental_data: Rent
         rental_data (RentalBase): Новые данные для обновления аренды.
 
     Возвращает:
-        Rental: Обновленный объект аренды или сообщение об ошибке.
-    """
-    updated_rental = await get_rental_by_id(session=session, rental_id=rental_id)
-    if updated_rental:
-        stmt = (
-            update(Rental)
-            .where(Rental.id == rental_id)
-            .values(**rental_data.model_dump())  # Обновляем значения аренды
+        Rental: Обновленный объект аренды или None, если аренда не найдена.
+    """
+    previous = None
+    if availability_events.active or occupancy.ready:  # Прежние даты нужны подписчикам и картам
+        previous = (
+            await session.execute(
+                select(Rental.equipment_id, Rental.start_date, Rental.end_date).where(
+                    Rental.id == rental_id
+                )
+            )
+        ).one_or_none()
+    stmt = (
+        update(Rental)
+        .where(Rental.id == rental_id)
+        .values(**rental_data.model_dump())  # Обновляем значения аренды
+        .returning(Rental)  # Получаем обновленную строку тем же запросом
+    )
+    updated_rental = await session.scalar(stmt)  # Выполняем обновление
+    if updated_rental is not None:
+        await record_changes(session, Rental, "update", [updated_rental])  # Пишем в журнал изменений
+    await session.commit()  # Коммитим изменения
+    if updated_rental is not None and availability_cache.ready:  # Синхронизируем кэш занятости
+        availability_cache.add(
+            updated_rental.id,
+            updated_rental.equipment_id,
+            updated_rental.start_date,
+            updated_rental.end_date,
+        )
+    if updated_rental is not None:
+        if previous is not None:  # Карты занятости: освобождаем прежние даты, занимаем новые
+            await occupancy_release(session, *previous)
+        occupancy_add(
+            updated_rental.equipment_id, updated_rental.start_date, updated_rental.end_date
         )
-        await session.execute(stmt)  # Выполняем обновление
-        await session.commit()  # Коммитим изменения
-        updated_rental = await session.get(Rental, rental_id)
-        return updated_rental
-    return {"message": "не удалось обновить"}
+        publish_availability("update", updated_rental)  # Уведомляем подписчиков оборудования
+        if previous is not None and previous.equipment_id != updated_rental.equipment_id:
+            publish_availability("delete", updated_rental, equipment_id=previous.equipment_id)
+    return updated_rental
 
 async def delete_rental(session: AsyncSession, rental_id: int):
     """
@@ -121,13 +503,16 @@ async def delete_rental(session: AsyncSession, rental_id: int):
     Возвращает:
         dict | None: Результат удаления, если аренда была найдена и удалена, иначе None.
     """
-    deleted_rental = await get_rental_by_id(session=session, rental_id=rental_id)
-    if deleted_rental is not None:
-        stmt = delete(Rental).where(Rental.id == rental_id)
-        result = await session.execute(stmt)
-        await session.commit()
-        return {"result": "Delete complete"}  # Возвращаем сообщение об успешном удалении
-    else:
+    stmt = delete(Rental).where(Rental.id == rental_id).returning(Rental)
+    deleted = await session.scalar(stmt)  # Выполняем удаление
+    if deleted is not None:
+        await record_deletes(session, Rental, [deleted.id])  # Метка удаления в журнале
+    await session.commit()
+    if deleted is None:
         return None  # Если аренда не найдена, возвращаем None
+    availability_cache.remove(rental_id)  # Синхронизируем кэш занятости
+    await occupancy_release(session, deleted.equipment_id, deleted.start_date, deleted.end_date)
+    publish_availability("delete", deleted)  # Уведомляем подписчиков оборудования
+    return {"result": "Delete complete"}  # Возвращаем сообщение об успешном удалении
 
        
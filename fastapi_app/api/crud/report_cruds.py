@@ -0,0 +1,137 @@
+from datetime import date, timedelta
+from typing import Literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, cast, Integer
+from models import Equipment, Rental
+
+Bucket = Literal["week", "month"]
+
+
+def bucket_bounds(date_from: date, date_to: date, bucket: Bucket) -> list[tuple[date, date]]:
+    """
+    Делит окно [date_from, date_to) на календарные недели (с понедельника)
+    или месяцы. Крайние периоды обрезаются по границам окна.
+
+    Аргументы:
+        date_from (date): Начало окна.
+        date_to (date): Конец окна, не включается.
+        bucket (Bucket): Размер периода: "week" или "month".
+
+    Возвращает:
+        list[tuple[date, date]]: Периоды [start, end) по порядку.
+    """
+    bounds = []
+    start = date_from
+    while start < date_to:
+        if bucket == "week":
+            end = start + timedelta(days=7 - start.weekday())
+        else:
+            end = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        end = min(end, date_to)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def occupancy_bitmap(
+    rows: list[tuple[int, int, int]], equipment_ids: list[int], days: int
+) -> bytearray:
+    """
+    Строит побайтовую карту занятости по дням для набора оборудования.
+
+    На каждое оборудование отводится отрезок из days байт, день аренды
+    отмечается единицей. Аренда записывается одним присваиванием среза
+    (копирование памяти на C), поэтому цикл Python идет по арендам, а не
+    по дням; пересекающиеся аренды не считают день дважды.
+
+    Аргументы:
+        rows (list[tuple[int, int, int]]): (equipment_id, начало, конец)
+            аренд в днях от начала окна, уже обрезанные до [0, days].
+        equipment_ids (list[int]): Оборудование в порядке отрезков карты.
+        days (int): Длина окна в днях.
+
+    Возвращает:
+        bytearray: Карта длиной len(equipment_ids) * days.
+    """
+    offsets = {equipment_id: i * days for i, equipment_id in enumerate(equipment_ids)}
+    bitmap = bytearray(days * len(equipment_ids))
+    ones = b"\x01" * days
+    for equipment_id, start, end in rows:
+        base = offsets[equipment_id]
+        bitmap[base + start : base + end] = ones[: end - start]
+    return bitmap
+
+
+async def get_utilization(
+    session: AsyncSession,
+    date_from: date,
+    date_to: date,
+    bucket: Bucket,
+    limit: int,
+    after_id: int | None = None,
+) -> dict:
+    """
+    Считает загрузку страницы оборудования по неделям или месяцам.
+
+    Из базы читаются только аренды, пересекающие окно, и сразу в виде
+    смещений в днях от начала окна (julianday в SQLite), без построения
+    ORM-объектов и дат в Python. Занятые дни периода считает
+    bytearray.count по карте occupancy_bitmap.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        date_from (date): Начало окна.
+        date_to (date): Конец окна, не включается.
+        bucket (Bucket): Размер периода: "week" или "month".
+        limit (int): Количество оборудования на странице.
+        after_id (int | None): Вернуть оборудование с id строго больше указанного.
+
+    Возвращает:
+        dict: Отчет в форме UtilizationReport: периоды окна и по каждому
+        оборудованию страницы списки занятых дней и загрузки по периодам.
+    """
+    bounds = bucket_bounds(date_from, date_to, bucket)
+    report = {
+        "bucket": bucket,
+        "buckets": [
+            {"start_date": start, "end_date": end, "days": (end - start).days}
+            for start, end in bounds
+        ],
+        "items": [],
+    }
+    stmt = select(Equipment.id).order_by(Equipment.id).limit(limit)
+    if after_id is not None:
+        stmt = stmt.where(Equipment.id > after_id)  # Продолжаем после курсора
+    equipment_ids = (await session.scalars(stmt)).all()
+    if not equipment_ids:
+        return report
+
+    days = (date_to - date_from).days
+    origin = func.julianday(date_from.isoformat())
+
+    def offset(column):
+        value = cast(func.julianday(column) - origin, Integer)
+        return func.min(func.max(value, 0), days)  # Обрезаем по окну
+
+    stmt = select(Rental.equipment_id, offset(Rental.start_date), offset(Rental.end_date)).where(
+        Rental.equipment_id.in_(equipment_ids),
+        Rental.start_date < date_to,
+        Rental.end_date > date_from,
+    )  # Только аренды, пересекающие окно
+    connection = await session.connection()  # Core-запрос без ORM-обработки строк
+    rows = (await connection.execute(stmt)).all()  # Row распаковывается как кортеж
+    bitmap = occupancy_bitmap(rows, equipment_ids, days)
+
+    cuts = [((start - date_from).days, (end - date_from).days) for start, end in bounds]
+    lengths = [end - start for start, end in cuts]
+    for i, equipment_id in enumerate(equipment_ids):
+        base = i * days
+        busy = [bitmap.count(1, base + start, base + end) for start, end in cuts]
+        report["items"].append(
+            {
+                "equipment_id": equipment_id,
+                "occupied_days": busy,
+                "utilization": [round(100 * b / n, 2) for b, n in zip(busy, lengths)],
+            }
+        )
+    return report
@@ -1,13 +1,33 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
+from functools import partial
+from sqlalchemy import select, delete, update, insert
+from core import settings
+from core.batching import group_commit
+from core.cache import as_dict, entity_cache
 from models import User
-from schemas.user import User_id, UserCreate, UserBase
+from .change_cruds import record_changes, record_deletes, table_version
+from schemas.user import UserCreate, UserBase
+
+
+async def _insert_user(session: AsyncSession, new_user: UserCreate) -> User:
+    """Вставляет пользователя без commit."""
+    stmt = (
+        insert(User)
+        .values(**new_user.model_dump())
+        .returning(User)  # Получаем созданную строку тем же запросом
+    )
+    user = await session.scalar(stmt)  # Выполняем вставку
+    await record_changes(session, User, "create", [user])  # Пишем в журнал изменений
+    return user
 
 
 async def create_user(new_user: UserCreate, session: AsyncSession) -> User:
     """
     Создает нового пользователя в базе данных.
 
+    При settings.group_commit вставка выполняется задачей группового
+    commit вместе с другими созданиями, session не используется.
+
     Аргументы:
         new_user (UserCreate): Данные для создания нового пользователя.
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
@@ -15,28 +35,55 @@ async def create_user(new_user: UserCreate, session: AsyncSession) -> User:
     Возвращает:
         User: Созданный объект пользователя.
     """
-    user = User(**new_user.model_dump())  # Создаем экземпляр User
-    session.add(user)  # Добавляем пользователя в сессию
+    if settings.group_commit:
+        return await group_commit.submit(partial(_insert_user, new_user=new_user))
+    user = await _insert_user(session, new_user)
     await session.commit()  # Коммитим изменения в базе данных
-    await session.refresh(user)  # Обновляем объект пользователя
     return user  # Возвращаем созданного пользователя
 
 
-async def get_users(session: AsyncSession) -> list[User_id]:
+async def get_users(
+    session: AsyncSession, limit: int, after_id: int | None = None
+) -> list[User]:
     """
-    Получает список всех пользователей из базы данных.
+    Получает страницу пользователей из базы данных (keyset-пагинация по id).
 
     Аргументы:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        limit (int): Максимальное количество записей на странице.
+        after_id (int | None): Вернуть записи с id строго больше указанного.
 
     Возвращает:
-        list[User_id]: Список всех объектов пользователей.
+        list[User]: Список объектов пользователей.
     """
-    stmt = select(User).order_by(User.id)  # Формируем запрос для получения всех пользователей
+    stmt = select(User).order_by(User.id).limit(limit)  # Формируем запрос для получения пользователей
+    if after_id is not None:
+        stmt = stmt.where(User.id > after_id)  # Продолжаем после курсора
     users = await session.scalars(stmt)  # Выполняем запрос
     return users.all()  # Возвращаем все найденные объекты
 
 
+async def stream_users(session: AsyncSession, chunk_size: int):
+    """
+    Потоково читает всю таблицу пользователей серверным курсором.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        chunk_size (int): Количество строк в одной пачке.
+
+    Возвращает:
+        AsyncIterator[Sequence[Row]]: Пачки строк, упорядоченные по id.
+    """
+    stmt = (
+        select(*User.__table__.c)  # Читаем колонки, минуя identity map сессии
+        .order_by(User.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(stmt)  # Открываем серверный курсор
+    async for chunk in result.partitions(chunk_size):
+        yield chunk  # Отдаем очередную пачку
+
+
 async def get_user_by_id(session: AsyncSession, user_id: int):
     """
     Получает пользователя по его идентификатору.
@@ -47,10 +94,21 @@ async def get_user_by_id(session: AsyncSession, user_id: int):
 
     Возвращает:
         User: Объект пользователя с указанным идентификатором или None, если не найдено.
+        Объект не привязан к сессии и не содержит пароля (password = None).
     """
-    stmt = select(User).where(User.id == user_id)  # Формируем запрос для получения пользователя по ID
-    user = await session.scalar(stmt)  # Выполняем запрос
-    return user  # Возвращаем найденного пользователя или None
+
+    async def load():
+        stmt = (
+            select(User, table_version("users"))  # Версия таблицы - в том же снимке, что и строка
+            .where(User.id == user_id)
+        )  # Формируем запрос для получения пользователя по ID
+        row = (await session.execute(stmt)).one_or_none()  # Выполняем запрос
+        if row is None:
+            return None
+        return as_dict(row[0], exclude=("password",)), row[1] or 0  # Пароль в кэш не попадает
+
+    data = await entity_cache.get_or_load("user", user_id, load)  # Читаем через кэш
+    return None if data is None else User(**data)  # Возвращаем найденного пользователя или None
 
 
 async def delete_user(session: AsyncSession, user_id: int):
@@ -62,15 +120,16 @@ async def delete_user(session: AsyncSession, user_id: int):
         user_id (int): Идентификатор пользователя для удаления.
 
     Возвращает:
-        result: Результат выполнения операции удаления или None, если пользователь не найден.
+        bool: True, если пользователь был удален, иначе False.
     """
-    user = await get_user_by_id(session=session, user_id=user_id)  # Получаем пользователя по ID
-    if user is not None:
-        stmt = delete(User).where(User.id == user_id)  # Формируем запрос на удаление
-        result = await session.execute(stmt)  # Выполняем удаление
-        await session.commit()  # Коммитим изменения
-        return result  # Возвращаем результат удаления
-    return None  # Возвращаем None, если пользователь не найден
+    stmt = delete(User).where(User.id == user_id).returning(User.id)  # Формируем запрос на удаление
+    deleted_id = await session.scalar(stmt)  # Выполняем удаление
+    if deleted_id is not None:
+        version = await record_deletes(session, User, [deleted_id])  # Метка удаления в журнале
+    await session.commit()  # Коммитим изменения
+    if deleted_id is not None:
+        await entity_cache.invalidate("user", user_id, version)  # Сбрасываем кэш
+    return deleted_id is not None
 
 
 async def user_update(session: AsyncSession, user_id: int, user_data: UserBase):
@@ -85,11 +144,16 @@ async def user_update(session: AsyncSession, user_id: int, user_data: UserBase):
     Возвращает:
         User: Обновленный объект пользователя или None, если пользователь не найден.
     """
-    updated_user = await get_user_by_id(session=session, user_id=user_id)  # Получаем пользователя по ID
-    if updated_user:
-        stmt = update(User).where(User.id == user_id).values(**user_data.model_dump())  # Формируем запрос на обновление
-        await session.execute(stmt)  # Выполняем обновление
-        await session.commit()  # Коммитим изменения
-        update_user = await session.get(User, user_id)  # Получаем обновленный объект
-        return update_user  # Возвращаем обновленного пользователя
-    return None  # Возвращаем None, если пользователь не найден
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(**user_data.model_dump())
+        .returning(User)  # Получаем обновленную строку тем же запросом
+    )  # Формируем запрос на обновление
+    updated_user = await session.scalar(stmt)  # Выполняем обновление
+    if updated_user is not None:
+        version = await record_changes(session, User, "update", [updated_user])  # Пишем в журнал изменений
+    await session.commit()  # Коммитим изменения
+    if updated_user is not None:
+        await entity_cache.invalidate("user", user_id, version)  # Сбрасываем кэш
+    return updated_user  # None, если пользователь не найден
@@ -1,34 +1,177 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
+from core import settings
 from core.db_help import db_helper
+from models import Equipment
+from schemas.availability import Interval
+from schemas.importing import ImportReport
 from schemas.equipment import EquipmentBase, EquipmentCreate, Equipment_id
+from .export import ndjson_response
+from .fast_json import fast_json
+from .importing import detect_format, iter_lines, iter_records
+from .crud.import_cruds import import_rows
+from .conditional import etag
+from .pagination import page, set_next_cursor
 from .crud.equipment_cruds import (
     create_equipment,
     delete_equipment,
     get_all_equipment,
+    stream_equipment,
     get_equipment_by_id,
+    search_equipment,
     update_equipment,
 )
+from .crud.availability_cruds import get_available_equipment, get_free_intervals
 
 # Создаем маршрутизатор для управления оборудованием
 router = APIRouter(prefix="/equipment", tags=["EQUIPMENTS"])
-conn = Annotated[AsyncSession, Depends(db_helper.get_session)]  # Зависимость для получения сессии базы данных
+conn = Annotated[AsyncSession, Depends(db_helper.get_write_session)]  # Сессия движка записи
+read_conn = Annotated[AsyncSession, Depends(db_helper.get_read_session)]  # Сессия движка чтения
 
 
-@router.get("", response_model=list[Equipment_id])
-async def get_equipments(session: conn):
+@router.get(
+    "",
+    response_model=list[Equipment_id],
+    dependencies=[Depends(etag("equipments"))],
+)
+async def get_equipments(session: read_conn, params: page, response: Response):
     """
-    Получает список всего оборудования.
+    Получает страницу списка оборудования.
 
     Аргументы:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        params (PageParams): Параметры пагинации (limit, after_id).
+        response (Response): Ответ, в заголовок X-Next-Cursor которого пишется курсор.
 
     Возвращает:
         list[Equipment_id]: Список объектов оборудования.
     """
-    equipments = await get_all_equipment(session=session)  # Получаем все оборудование
-    return equipments  # Возвращаем список оборудования
+    equipments = await get_all_equipment(
+        session=session, limit=params.limit, after_id=params.after_id
+    )  # Получаем страницу оборудования
+    set_next_cursor(response, equipments, params.limit)  # Курсор следующей страницы
+    return fast_json(list[Equipment_id], equipments, response)  # Возвращаем список оборудования
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_equipment():
+    """
+    Выгружает всю таблицу оборудования потоком в формате NDJSON.
+
+    Возвращает:
+        StreamingResponse: Поток строк Equipment_id в JSON, по одной на строку.
+    """
+    return ndjson_response(stream_rows=stream_equipment, schema=Equipment_id)
+
+
+@router.get(
+    "/available",
+    response_model=list[Equipment_id],
+    dependencies=[Depends(etag("equipments", "rentals"))],
+)
+async def get_available_equipments(
+    session: read_conn,
+    params: page,
+    response: Response,
+    date_from: Annotated[date, Query(alias="from")],
+    date_to: Annotated[date, Query(alias="to")],
+):
+    """
+    Получает страницу оборудования, свободного в заданном окне дат.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        params (PageParams): Параметры пагинации (limit, after_id).
+        response (Response): Ответ, в заголовок X-Next-Cursor которого пишется курсор.
+        date_from (date): Начало окна (параметр from).
+        date_to (date): Конец окна, не включается (параметр to).
+
+    Возвращает:
+        list[Equipment_id]: Список свободного оборудования.
+
+    Исключения:
+        HTTPException: Если from не раньше to, возвращает 400.
+    """
+    if date_from >= date_to:
+        raise HTTPException(status_code=400, detail="Параметр from должен быть раньше to")
+    equipments = await get_available_equipment(
+        session=session,
+        date_from=date_from,
+        date_to=date_to,
+        limit=params.limit,
+        after_id=params.after_id,
+    )  # Получаем страницу свободного оборудования
+    set_next_cursor(response, equipments, params.limit)  # Курсор следующей страницы
+    return fast_json(list[Equipment_id], equipments, response)
+
+
+@router.get(
+    "/search",
+    response_model=list[Equipment_id],
+    dependencies=[Depends(etag("equipments"))],
+)
+async def search_equipments(
+    session: read_conn,
+    response: Response,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=settings.page_size_max)] = settings.page_size_default,
+    offset: Annotated[int, Query(ge=0)] = 0,
+):
+    """
+    Ищет оборудование по словам в названии и описании.
+
+    Каждое слово запроса ищется как префикс, все слова должны совпасть.
+    Результаты упорядочены по релевантности, поэтому страницы задаются
+    смещением: если страница заполнена, смещение следующей пишется
+    в заголовок X-Next-Offset.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        response (Response): Ответ, в заголовок X-Next-Offset которого пишется смещение.
+        q (str): Строка поиска.
+        limit (int): Количество записей на странице.
+        offset (int): Сколько лучших результатов пропустить.
+
+    Возвращает:
+        list[Equipment_id]: Найденное оборудование, лучшие совпадения первыми.
+    """
+    equipments = await search_equipment(
+        session=session, text=q, limit=limit, offset=offset
+    )  # Выполняем полнотекстовый поиск
+    if len(equipments) >= limit:
+        response.headers["X-Next-Offset"] = str(offset + limit)  # Смещение следующей страницы
+    return fast_json(list[Equipment_id], equipments, response)
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_equipment(request: Request, session: conn):
+    """
+    Массово импортирует оборудования из тела запроса в формате CSV или NDJSON.
+
+    Тело читается потоком, формат определяется по Content-Type
+    (text/csv или application/x-ndjson). Записи вставляются пачками
+    по settings.import_chunk_size, каждая пачка - одна транзакция.
+
+    Аргументы:
+        request (Request): Запрос, тело которого содержит импортируемые строки.
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+
+    Возвращает:
+        ImportReport: Итоги импорта, ошибки по строкам и скорость в строках/сек.
+    """
+    records = iter_records(
+        iter_lines(request.stream()), detect_format(request.headers.get("content-type"))
+    )  # Разбираем тело запроса по мере поступления
+    return await import_rows(
+        session=session,
+        model=Equipment,
+        schema=EquipmentCreate,
+        records=records,
+        chunk_size=settings.import_chunk_size,
+    )
 
 
 @router.post("", response_model=Equipment_id)
@@ -47,8 +190,12 @@ async def equipment_create(new_equipment: EquipmentCreate, session: conn):
     return equipment  # Возвращаем созданное оборудование
 
 
-@router.get("/{equipment_id}", response_model=EquipmentBase)
-async def get_equipment_by_id_endpoint(equipment_id: int, session: conn):
+@router.get(
+    "/{equipment_id}",
+    response_model=EquipmentBase,
+    dependencies=[Depends(etag("equipments"))],
+)
+async def get_equipment_by_id_endpoint(equipment_id: int, session: read_conn):
     """
     Получает оборудование по его идентификатору.
 
@@ -68,6 +215,43 @@ async def get_equipment_by_id_endpoint(equipment_id: int, session: conn):
     return equipment  # Возвращаем найденное оборудование
 
 
+@router.get(
+    "/{equipment_id}/availability",
+    response_model=list[Interval],
+    dependencies=[Depends(etag("equipments", "rentals"))],
+)
+async def get_equipment_availability(
+    equipment_id: int,
+    session: read_conn,
+    date_from: Annotated[date, Query(alias="from")],
+    date_to: Annotated[date, Query(alias="to")],
+):
+    """
+    Получает свободные интервалы оборудования в заданном окне дат.
+
+    Аргументы:
+        equipment_id (int): Идентификатор оборудования.
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        date_from (date): Начало окна (параметр from).
+        date_to (date): Конец окна, не включается (параметр to).
+
+    Возвращает:
+        list[Interval]: Свободные интервалы внутри окна.
+
+    Исключения:
+        HTTPException: 400, если from не раньше to; 404, если оборудование не найдено.
+    """
+    if date_from >= date_to:
+        raise HTTPException(status_code=400, detail="Параметр from должен быть раньше to")
+    equipment = await get_equipment_by_id(session=session, equipment_id=equipment_id)  # Проверяем, что оборудование есть
+    if equipment is None:
+        raise HTTPException(status_code=404, detail="Equipment not found")
+    free = await get_free_intervals(
+        session=session, equipment_id=equipment_id, date_from=date_from, date_to=date_to
+    )  # Вычисляем свободные интервалы
+    return [Interval(start_date=start, end_date=end) for start, end in free]
+
+
 @router.put("/{equipment_id}", response_model=EquipmentBase)
 async def update_equipment_endpoint(
     equipment_id: int, equipment_data: EquipmentBase, session: conn
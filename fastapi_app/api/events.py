@@ -0,0 +1,52 @@
+import asyncio
+from collections.abc import Hashable
+from fastapi.responses import StreamingResponse
+from core import settings
+from core.broker import Broker
+from core.metrics import availability_dropped
+
+
+def sse_response(broker: Broker, keys: list[Hashable]) -> StreamingResponse:
+    """
+    Формирует поток Server-Sent Events с событиями брокера по ключам.
+
+    Подписка создается внутри генератора и снимается, когда клиент
+    отключается, поэтому живет ровно столько, сколько открыто соединение.
+    Первым приходит комментарий ": subscribed" - после него клиент может
+    прочитать текущее состояние, не пропустив изменений. Накопившиеся
+    события отправляются одним куском, в тишине раз в
+    settings.availability_events_keepalive секунд идет ": ping". Если
+    клиент не успевает читать и его очередь переполнилась, приходит
+    {"op":"dropped"} и поток закрывается - клиенту нужно переподключиться.
+
+    Аргументы:
+        broker (Broker): Брокер, на события которого оформляется подписка.
+        keys (list[Hashable]): Ключи подписки.
+
+    Возвращает:
+        StreamingResponse: Ответ с media_type text/event-stream.
+    """
+
+    async def generate():
+        with broker.subscription(*keys) as subscription:
+            yield ": subscribed\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), settings.availability_events_keepalive
+                    )
+                except asyncio.TimeoutError:  # До Python 3.11 - не встроенный TimeoutError
+                    yield ": ping\n\n"  # Не даем прокси закрыть соединение
+                    continue
+                events = [event, *subscription.get_nowait()]  # Забираем все накопившееся
+                if None in events:  # Клиент отключен брокером
+                    availability_dropped.inc()
+                    yield 'data: {"op":"dropped"}\n\n'
+                    return
+                yield "".join(f"data: {data}\n\n" for data in events)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
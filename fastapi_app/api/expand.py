@@ -0,0 +1,33 @@
+from typing import Annotated
+from fastapi import HTTPException, Query
+
+
+def expand_fields(*allowed: str):
+    """
+    Создает зависимость, разбирающую параметр expand=a,b.
+
+    Аргументы:
+        *allowed (str): Связи, которые можно раскрыть.
+
+    Возвращает:
+        Callable: Зависимость FastAPI, возвращающая frozenset запрошенных связей.
+    """
+
+    def parse(
+        expand: Annotated[
+            str | None,
+            Query(description=f"Связанные объекты через запятую: {', '.join(allowed)}"),
+        ] = None,
+    ) -> frozenset[str]:
+        if not expand:
+            return frozenset()
+        fields = frozenset(name.strip() for name in expand.split(",") if name.strip())
+        unknown = fields.difference(allowed)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Нельзя раскрыть: {', '.join(sorted(unknown))}. Доступно: {', '.join(allowed)}",
+            )
+        return fields
+
+    return parse
@@ -0,0 +1,37 @@
+from typing import AsyncIterator, Callable, Sequence
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from core import settings
+from core.db_help import db_helper
+
+
+def ndjson_response(
+    stream_rows: Callable[[AsyncSession, int], AsyncIterator[Sequence]],
+    schema: type[BaseModel],
+) -> StreamingResponse:
+    """
+    Формирует потоковый ответ в формате NDJSON (одна JSON-запись на строку).
+
+    Сессия движка чтения открывается внутри генератора, поэтому живет
+    ровно столько, сколько идет передача. Строки читаются серверным курсором пачками
+    по settings.export_chunk_size и не попадают в identity map сессии,
+    так что потребление памяти не зависит от размера таблицы.
+
+    Аргументы:
+        stream_rows (Callable): CRUD-функция, отдающая пачки строк.
+        schema (type[BaseModel]): Схема, через которую сериализуется каждая строка.
+
+    Возвращает:
+        StreamingResponse: Ответ с media_type application/x-ndjson.
+    """
+
+    async def generate():
+        async with db_helper.read_session_factory()() as session:
+            async for chunk in stream_rows(session, settings.export_chunk_size):
+                yield "".join(
+                    schema.model_validate(row).model_dump_json() + "\n"
+                    for row in chunk
+                )  # Отдаем пачку одним куском
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
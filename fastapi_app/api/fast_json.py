@@ -0,0 +1,48 @@
+from functools import lru_cache
+from typing import Any, Sequence
+from fastapi import Response
+from pydantic import TypeAdapter
+from core import settings
+
+
+@lru_cache
+def _adapter(schema: Any) -> TypeAdapter:
+    """Возвращает закэшированный TypeAdapter для типа ответа."""
+    return TypeAdapter(schema)
+
+
+def fast_json(
+    schema: Any, rows: Sequence[Any], response: Response, exclude_none: bool = False
+) -> Response | Sequence[Any]:
+    """
+    Сериализует ответ в JSON за один проход pydantic-core.
+
+    Обычный путь FastAPI валидирует каждую ORM-строку по response_model,
+    затем прогоняет результат через jsonable_encoder и json.dumps. Здесь
+    строки читаются атрибутами (from_attributes) и сразу выдаются байтами
+    через TypeAdapter той же схемы, поэтому тело ответа и OpenAPI-схема
+    не меняются. Заголовки, выставленные зависимостями в response
+    (ETag, X-Next-Cursor), переносятся в готовый ответ.
+
+    Аргументы:
+        schema (Any): Тип ответа, совпадающий с response_model маршрута.
+        rows (Sequence): ORM-объекты или строки результата.
+        response (Response): Ответ, в который зависимости записали заголовки.
+        exclude_none (bool): Опускать поля со значением None
+            (как response_model_exclude_none маршрута).
+
+    Возвращает:
+        Response | Sequence: Готовый ответ или rows без изменений,
+        если settings.fast_json выключен.
+    """
+    if not settings.fast_json:
+        return rows
+    adapter = _adapter(schema)
+    body = adapter.dump_json(
+        adapter.validate_python(rows, from_attributes=True), exclude_none=exclude_none
+    )
+    fast = Response(content=body, media_type="application/json")
+    for name, value in response.headers.items():
+        if name not in ("content-length", "content-type"):
+            fast.headers.append(name, value)
+    return fast
@@ -0,0 +1,30 @@
+from datetime import date
+from typing import Annotated
+from fastapi import Depends, HTTPException, Query
+
+
+class PeriodParams:
+    """
+    Фильтры аренд по датам.
+
+    Атрибуты:
+        active_on (date | None): Аренды, действующие в этот день
+            (start_date <= active_on < end_date).
+        date_from (date | None): Аренды, заканчивающиеся после этой даты (параметр from).
+        date_to (date | None): Аренды, начинающиеся раньше этой даты (параметр to).
+    """
+
+    def __init__(
+        self,
+        active_on: Annotated[date | None, Query()] = None,
+        date_from: Annotated[date | None, Query(alias="from")] = None,
+        date_to: Annotated[date | None, Query(alias="to")] = None,
+    ):
+        if date_from is not None and date_to is not None and date_from >= date_to:
+            raise HTTPException(status_code=400, detail="Параметр from должен быть раньше to")
+        self.active_on = active_on
+        self.date_from = date_from
+        self.date_to = date_to
+
+
+period = Annotated[PeriodParams, Depends()]  # Зависимость для получения фильтров по датам
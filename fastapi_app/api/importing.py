@@ -0,0 +1,71 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Разбивает поток байтов на строки текста по мере поступления данных.
+
+    Аргументы:
+        chunks (AsyncIterator[bytes]): Куски входного потока (например, тела запроса).
+
+    Возвращает:
+        AsyncIterator[str]: Непустые строки без перевода строки.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        tail += decoder.decode(chunk)
+        *lines, tail = tail.split("\n")
+        for line in lines:
+            if line.strip():
+                yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail.strip():
+        yield tail.rstrip("\r")
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[dict | None]:
+    """
+    Разбирает строки CSV (первая строка - заголовок) или NDJSON в словари.
+
+    CSV разбирается построчно, поэтому значения с переводом строки внутри
+    кавычек не поддерживаются. Строка, которую не удалось разобрать,
+    отдается как None, чтобы импорт мог сообщить об ошибке по ее номеру.
+
+    Аргументы:
+        lines (AsyncIterator[str]): Строки входного файла.
+        fmt (str): Формат: "csv" или "ndjson".
+
+    Возвращает:
+        AsyncIterator[dict | None]: Записи в порядке следования строк.
+    """
+    header = None
+    async for line in lines:
+        if fmt == "csv":
+            fields = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in fields]
+                continue
+            yield dict(zip(header, fields)) if len(fields) == len(header) else None
+        else:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield record if isinstance(record, dict) else None
+
+
+def detect_format(content_type: str | None) -> str:
+    """
+    Определяет формат импорта по заголовку Content-Type.
+
+    Аргументы:
+        content_type (str | None): Значение заголовка Content-Type.
+
+    Возвращает:
+        str: "csv" для text/csv, иначе "ndjson".
+    """
+    return "csv" if content_type and "csv" in content_type else "ndjson"
@@ -0,0 +1,40 @@
+from typing import Annotated, Sequence
+from fastapi import Depends, Query, Response
+from core import settings
+
+
+class PageParams:
+    """
+    Параметры курсорной (keyset) пагинации по полю id.
+
+    Атрибуты:
+        limit (int): Количество записей на странице.
+        after_id (int | None): id последней записи предыдущей страницы.
+    """
+
+    def __init__(
+        self,
+        limit: Annotated[int, Query(ge=1, le=settings.page_size_max)] = settings.page_size_default,
+        after_id: Annotated[int | None, Query(ge=0)] = None,
+    ):
+        self.limit = limit
+        self.after_id = after_id
+
+
+page = Annotated[PageParams, Depends()]  # Зависимость для получения параметров пагинации
+
+
+def set_next_cursor(response: Response, items: Sequence, limit: int) -> None:
+    """
+    Записывает курсор следующей страницы в заголовок X-Next-Cursor.
+
+    Заголовок выставляется только если страница заполнена полностью,
+    то есть за ней могут быть еще записи.
+
+    Аргументы:
+        response (Response): Ответ, в который добавляется заголовок.
+        items (Sequence): Записи текущей страницы.
+        limit (int): Запрошенный размер страницы.
+    """
+    if items and len(items) >= limit:
+        response.headers["X-Next-Cursor"] = str(items[-1].id)
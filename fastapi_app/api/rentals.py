@@ -1,20 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
+from core import settings
 from core.db_help import db_helper
-from schemas.rental import Rental_id, RentalBase, RentalCreate
+from schemas.rental import Rental_id, RentalBase, RentalCreate, RentalBulkResult, RentalExpanded
+from .events import sse_response
+from .export import ndjson_response
+from .expand import expand_fields
+from .fast_json import fast_json
+from .filters import period
+from .conditional import etag
+from .pagination import page, set_next_cursor
 from .crud.rental_cruds import (
     create_rental,
+    create_rentals_bulk,
     get_all_rental,
+    stream_rental,
     get_rental_by_equipment,
     get_rental_by_id,
     delete_rental,
     update_rental,
 )
+from .crud.availability_cruds import availability_events
 
 # Создаем маршрутизатор для управления арендой
 router = APIRouter(prefix="/rental", tags=["RENTAL"])
-conn = Annotated[AsyncSession, Depends(db_helper.get_session)]  # Зависимость для получения сессии базы данных
+conn = Annotated[AsyncSession, Depends(db_helper.get_write_session)]  # Сессия движка записи
+read_conn = Annotated[AsyncSession, Depends(db_helper.get_read_session)]  # Сессия движка чтения
+expand = Annotated[frozenset[str], Depends(expand_fields("equipment", "user"))]  # Раскрываемые связи
 
 
 @router.post("", response_model=Rental_id)
@@ -41,37 +55,139 @@ async def rental_create(session: conn, new_rent: RentalCreate):
     return rental  # Возвращаем созданную аренду
 
 
-@router.get("", response_model=list[Rental_id])
-async def get_rentals(session: conn):
+@router.post("/bulk", response_model=list[RentalBulkResult])
+async def rental_create_bulk(session: conn, new_rents: list[RentalCreate]):
     """
-    Получает список всех аренд.
+    Создает пакет аренд за одну транзакцию.
 
     Аргументы:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        new_rents (list[RentalCreate]): Данные для создания аренд.
 
     Возвращает:
-        list[Rental_id]: Список объектов аренды.
+        list[RentalBulkResult]: Принята ли каждая аренда, ее id или причина отказа.
+
+    Исключения:
+        HTTPException: Если пакет больше settings.bulk_max_items, возвращает 413.
+    """
+    if len(new_rents) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"В пакете не больше {settings.bulk_max_items} аренд",
+        )  # Ограничиваем размер пакета
+    return await create_rentals_bulk(session=session, new_rentals=new_rents)
+
+
+@router.get(
+    "",
+    response_model=list[RentalExpanded],
+    response_model_exclude_none=True,
+    dependencies=[Depends(etag("rentals", "equipments", "users"))],
+)
+async def get_rentals(
+    session: read_conn,
+    params: page,
+    dates: period,
+    fields: expand,
+    response: Response,
+    user_id: Annotated[int | None, Query()] = None,
+    equipment_id: Annotated[int | None, Query()] = None,
+):
+    """
+    Получает страницу списка аренд с необязательными фильтрами.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        params (PageParams): Параметры пагинации (limit, after_id).
+        dates (PeriodParams): Фильтры по датам (active_on, from, to).
+        fields (frozenset[str]): Связи из ?expand=equipment,user, которые
+            возвращаются вложенными объектами.
+        response (Response): Ответ, в заголовок X-Next-Cursor которого пишется курсор.
+        user_id (int | None): Только аренды пользователя.
+        equipment_id (int | None): Только аренды оборудования.
+
+    Возвращает:
+        list[RentalExpanded]: Список объектов аренды.
+    """
+    rentals = await get_all_rental(
+        session=session,
+        limit=params.limit,
+        after_id=params.after_id,
+        expand=fields,
+        user_id=user_id,
+        equipment_id=equipment_id,
+        active_on=dates.active_on,
+        date_from=dates.date_from,
+        date_to=dates.date_to,
+    )  # Получаем страницу аренд
+    set_next_cursor(response, rentals, params.limit)  # Курсор следующей страницы
+    return fast_json(
+        list[RentalExpanded], rentals, response, exclude_none=True
+    )  # Возвращаем список аренд
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_rental():
+    """
+    Выгружает всю таблицу аренд потоком в формате NDJSON.
+
+    Возвращает:
+        StreamingResponse: Поток строк Rental_id в JSON, по одной на строку.
     """
-    rentals = await get_all_rental(session=session)  # Получаем все аренды
-    return rentals  # Возвращаем список аренд
+    return ndjson_response(stream_rows=stream_rental, schema=Rental_id)
 
 
-@router.get("/{rent_id}", response_model=Rental_id)
-async def get_rent_id(session: conn, rent_id: int):
+@router.get("/availability/events", response_class=StreamingResponse)
+async def availability_events_stream(
+    equipment_id: Annotated[
+        list[int], Query(min_length=1, max_length=settings.availability_events_max_equipment)
+    ],
+):
+    """
+    Подписывает клиента на изменения аренд выбранного оборудования (SSE).
+
+    Вместо опроса /rental/eq/{equipment_id} клиент держит открытым этот
+    поток и получает событие на каждое создание, изменение и удаление
+    аренды своего оборудования: data: {"op": ..., "rental": {...}}. При
+    переносе аренды на другое оборудование прежнее получает op="delete".
+    События рассылаются в пределах процесса: при нескольких процессах
+    сервера клиент видит изменения, сделанные через тот же процесс
+    (межпроцессная синхронизация - журнал /api/changes).
+
+    Аргументы:
+        equipment_id (list[int]): Оборудование подписки (?equipment_id=1&equipment_id=2).
+
+    Возвращает:
+        StreamingResponse: Поток text/event-stream.
+    """
+    return sse_response(availability_events, equipment_id)
+
+
+@router.get(
+    "/{rent_id}",
+    response_model=RentalExpanded,
+    response_model_exclude_none=True,
+    dependencies=[Depends(etag("rentals", "equipments", "users"))],
+)
+async def get_rent_id(session: read_conn, rent_id: int, fields: expand):
     """
     Получает аренду по ее идентификатору.
 
     Аргументы:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
         rent_id (int): Идентификатор аренды.
+        fields (frozenset[str]): Связи из ?expand=equipment,user, которые
+            возвращаются вложенными объектами.
 
     Возвращает:
-        Rental_id: Объект аренды с указанным идентификатором.
+        RentalExpanded: Объект аренды с указанным идентификатором.
 
     Исключения:
         HTTPException: Если аренда не найдена, возвращает 404.
     """
-    rental = await get_rental_by_id(session=session, rental_id=rent_id)  # Получаем аренду по ID
+    rental = await get_rental_by_id(
+        session=session, rental_id=rent_id, expand=fields
+    )  # Получаем аренду по ID
     if not rental:
         raise HTTPException(
             status_code=404, detail=f"Аренда с id={rent_id} не найдена!"
@@ -79,14 +195,19 @@ async def get_rent_id(session: conn, rent_id: int):
     return rental  # Возвращаем найденную аренду
 
 
-@router.get("/eq/{equipment_id}", response_model=list[Rental_id])
-async def get_rent_eq(session: conn, equipment_id: int):
+@router.get(
+    "/eq/{equipment_id}",
+    response_model=list[Rental_id],
+    dependencies=[Depends(etag("rentals"))],
+)
+async def get_rent_eq(session: read_conn, equipment_id: int, response: Response):
     """
     Получает список аренд по идентификатору оборудования.
 
     Аргументы:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
         equipment_id (int): Идентификатор оборудования.
+        response (Response): Ответ, заголовки которого переносятся в готовый JSON.
 
     Возвращает:
         list[Rental_id]: Список объектов аренды для указанного оборудования.
@@ -94,7 +215,7 @@ async def get_rent_eq(session: conn, equipment_id: int):
     rental_list = await get_rental_by_equipment(
         session=session, equipment_id=equipment_id
     )  # Получаем аренды по ID оборудования
-    return rental_list  # Возвращаем список аренд
+    return fast_json(list[Rental_id], rental_list, response)  # Возвращаем список аренд
 
 
 @router.delete("/{rent_id}", response_model=dict)
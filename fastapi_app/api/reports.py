@@ -0,0 +1,75 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated
+from core import settings
+from core.db_help import db_helper
+from schemas.report import UtilizationReport
+from .conditional import etag
+from .fast_json import fast_json
+from .pagination import page, set_next_cursor
+from .crud.report_cruds import Bucket, bucket_bounds, get_utilization
+
+router = APIRouter(prefix="/reports", tags=["REPORTS"])
+read_conn = Annotated[AsyncSession, Depends(db_helper.get_read_session)]  # Сессия движка чтения
+
+
+@router.get(
+    "/utilization",
+    response_model=UtilizationReport,
+    dependencies=[Depends(etag("equipments", "rentals"))],
+)
+async def get_utilization_report(
+    session: read_conn,
+    params: page,
+    response: Response,
+    date_from: Annotated[date, Query(alias="from")],
+    date_to: Annotated[date, Query(alias="to")],
+    bucket: Bucket = "week",
+):
+    """
+    Получает загрузку оборудования по неделям или месяцам в окне дат.
+
+    Страница задается по оборудованию (limit, after_id). Периоды окна
+    перечислены один раз в buckets, а у каждого оборудования occupied_days
+    и utilization - списки значений в том же порядке.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        params (PageParams): Параметры пагинации по оборудованию (limit, after_id).
+        response (Response): Ответ, в заголовок X-Next-Cursor которого пишется курсор.
+        date_from (date): Начало окна (параметр from).
+        date_to (date): Конец окна, не включается (параметр to).
+        bucket (Bucket): Размер периода: week (с понедельника) или month.
+
+    Возвращает:
+        UtilizationReport: Периоды окна, занятые дни и процент загрузки по ним.
+
+    Исключения:
+        HTTPException: Если from не раньше to или окно длиннее
+            settings.report_max_days дней либо settings.report_max_buckets
+            периодов, возвращает 400.
+    """
+    if date_from >= date_to:
+        raise HTTPException(status_code=400, detail="Параметр from должен быть раньше to")
+    # Размер карты занятости и ответа растет с длиной окна - ограничиваем ее
+    if (date_to - date_from).days > settings.report_max_days:
+        raise HTTPException(
+            status_code=400, detail=f"Окно отчета не длиннее {settings.report_max_days} дней"
+        )
+    if len(bucket_bounds(date_from, date_to, bucket)) > settings.report_max_buckets:
+        raise HTTPException(
+            status_code=400, detail=f"Не больше {settings.report_max_buckets} периодов в отчете"
+        )
+    report = await get_utilization(
+        session=session,
+        date_from=date_from,
+        date_to=date_to,
+        bucket=bucket,
+        limit=params.limit,
+        after_id=params.after_id,
+    )  # Считаем загрузку страницы оборудования
+    items = report["items"]
+    if items and len(items) >= params.limit:
+        response.headers["X-Next-Cursor"] = str(items[-1]["equipment_id"])  # Курсор следующей страницы
+    return fast_json(UtilizationReport, report, response)
@@ -1,21 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
+from core import settings
 from core.db_help import db_helper
-from schemas.user import UserCreate, UserBase, User_id
+from models import User
+from schemas.importing import ImportReport
+from schemas.rental import Rental_id
+from schemas.user import UserCreate, UserBase, User_public
+from .export import ndjson_response
+from .fast_json import fast_json
+from .importing import detect_format, iter_lines, iter_records
+from .crud.import_cruds import import_rows
+from .conditional import etag
+from .filters import period
+from .pagination import page, set_next_cursor
+from .crud.rental_cruds import get_all_rental
 from .crud.usercruds import (
     create_user,
     get_users,
+    stream_users,
     delete_user,
     get_user_by_id,
     user_update,
 )
 
 router = APIRouter(prefix="/user", tags=["USER"])
-conn = Annotated[AsyncSession, Depends(db_helper.get_session)]
+conn = Annotated[AsyncSession, Depends(db_helper.get_write_session)]
+read_conn = Annotated[AsyncSession, Depends(db_helper.get_read_session)]
 
 
-@router.post("", response_model=User_id)
+@router.post("", response_model=User_public)
 async def user_create(new_user: UserCreate, session: conn):
     """
     Создает нового пользователя.
@@ -25,29 +40,73 @@ async def user_create(new_user: UserCreate, session: conn):
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
 
     Возвращает:
-        User_id: Созданный пользователь с его идентификатором.
+        User_public: Созданный пользователь с его идентификатором, без пароля.
     """
     user = await create_user(new_user, session)
     return user
 
 
-@router.get("", response_model=list[User_id])
-async def get_all_users(session: conn):
+@router.post("/import", response_model=ImportReport)
+async def import_user(request: Request, session: conn):
     """
-    Получает список всех пользователей.
+    Массово импортирует пользователей из тела запроса в формате CSV или NDJSON.
+
+    Тело читается потоком, формат определяется по Content-Type
+    (text/csv или application/x-ndjson). Записи вставляются пачками
+    по settings.import_chunk_size, каждая пачка - одна транзакция.
+
+    Аргументы:
+        request (Request): Запрос, тело которого содержит импортируемые строки.
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+
+    Возвращает:
+        ImportReport: Итоги импорта, ошибки по строкам и скорость в строках/сек.
+    """
+    records = iter_records(
+        iter_lines(request.stream()), detect_format(request.headers.get("content-type"))
+    )  # Разбираем тело запроса по мере поступления
+    return await import_rows(
+        session=session,
+        model=User,
+        schema=UserCreate,
+        records=records,
+        chunk_size=settings.import_chunk_size,
+    )
+
+
+@router.get("", response_model=list[User_public], dependencies=[Depends(etag("users"))])
+async def get_all_users(session: read_conn, params: page, response: Response):
+    """
+    Получает страницу списка пользователей.
 
     Аргументы:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        params (PageParams): Параметры пагинации (limit, after_id).
+        response (Response): Ответ, в заголовок X-Next-Cursor которого пишется курсор.
+
+    Возвращает:
+        list[User_public]: Список пользователей без паролей.
+    """
+    users = await get_users(
+        session=session, limit=params.limit, after_id=params.after_id
+    )
+    set_next_cursor(response, users, params.limit)
+    return fast_json(list[User_public], users, response)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_user():
+    """
+    Выгружает всю таблицу пользователей потоком в формате NDJSON.
 
     Возвращает:
-        list[User_id]: Список пользователей.
+        StreamingResponse: Поток строк User_public в JSON, по одной на строку.
     """
-    users = await get_users(session=session)
-    return users
+    return ndjson_response(stream_rows=stream_users, schema=User_public)
 
 
-@router.get("/{user_id}", response_model=User_id)
-async def get_user_id(session: conn, user_id: int):
+@router.get("/{user_id}", response_model=User_public, dependencies=[Depends(etag("users"))])
+async def get_user_id(session: read_conn, user_id: int):
     """
     Получает пользователя по его идентификатору.
 
@@ -56,15 +115,57 @@ async def get_user_id(session: conn, user_id: int):
         user_id (int): Идентификатор пользователя.
 
     Возвращает:
-        User_id: Данные пользователя.
+        User_public: Данные пользователя без пароля.
 
     Исключения:
         HTTPException: Если пользователь не найден, возвращает 404.
     """
     user = await get_user_by_id(session=session, user_id=user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found!")
     return user
 
 
+@router.get(
+    "/{user_id}/rentals",
+    response_model=list[Rental_id],
+    dependencies=[Depends(etag("users", "rentals"))],
+)
+async def get_user_rentals(
+    session: read_conn, user_id: int, params: page, dates: period, response: Response
+):
+    """
+    Получает страницу аренд пользователя.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        user_id (int): Идентификатор пользователя.
+        params (PageParams): Параметры пагинации (limit, after_id).
+        dates (PeriodParams): Фильтры по датам (active_on, from, to).
+        response (Response): Ответ, в заголовок X-Next-Cursor которого пишется курсор.
+
+    Возвращает:
+        list[Rental_id]: Аренды пользователя, упорядоченные по id.
+
+    Исключения:
+        HTTPException: Если пользователь не найден, возвращает 404.
+    """
+    user = await get_user_by_id(session=session, user_id=user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found!")
+    rentals = await get_all_rental(
+        session=session,
+        limit=params.limit,
+        after_id=params.after_id,
+        user_id=user_id,
+        active_on=dates.active_on,
+        date_from=dates.date_from,
+        date_to=dates.date_to,
+    )
+    set_next_cursor(response, rentals, params.limit)  # Курсор следующей страницы
+    return fast_json(list[Rental_id], rentals, response)
+
+
 @router.delete("/{user_id}", response_model=dict)
 async def del_user(session: conn, user_id: int):
     """
@@ -86,7 +187,7 @@ async def del_user(session: conn, user_id: int):
     return {"detail": "User deleted successfully"}
 
 
-@router.put("/{user_id}", response_model=User_id)
+@router.put("/{user_id}", response_model=User_public)
 async def update_user(session: conn, user_id: int, user_data: UserBase):
     """
     Обновляет данные пользователя по его идентификатору.
@@ -97,7 +198,7 @@ async def update_user(session: conn, user_id: int, user_data: UserBase):
         user_data (UserBase): Новые данные пользователя.
 
     Возвращает:
-        User_id: Обновленные данные пользователя.
+        User_public: Обновленные данные пользователя без пароля.
 
     Исключения:
         HTTPException: Если пользователь не найден, возвращает 404.
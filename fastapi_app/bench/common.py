@@ -0,0 +1,79 @@
+"""
+Общие функции нагрузочных замеров из каталога bench.
+
+Скрипты запускаются из каталога fastapi_app:
+
+    python bench/<скрипт>.py [параметры]
+
+Каждый скрипт работает со своей временной базой SQLite и не трогает
+fa_rent_db.sqlite3. Настройки приложения читаются при импорте core,
+поэтому temp_db_url вызывается до импорта модулей приложения.
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+START = date(2030, 1, 1)
+
+
+def temp_db_url(**env: str) -> str:
+    """
+    Создает путь к временной базе и задает окружение приложения.
+
+    Аргументы:
+        **env (str): Дополнительные переменные окружения (настройки Settings).
+
+    Возвращает:
+        str: URL временной базы для aiosqlite (он же записан в DB_URL).
+    """
+    path = Path(tempfile.mkdtemp(prefix="fastapi_app_bench_")) / "bench.sqlite3"
+    url = f"sqlite+aiosqlite:///{path}"
+    os.environ.update({"DB_URL": url, "ENTITY_CACHE": "none", "METRICS": "false", **env})
+    return url
+
+
+def random_rentals(rng: random.Random, count: int, equipment: int, days: int = 3650):
+    """
+    Генерирует случайные аренды длиной 1-14 дней.
+
+    Аргументы:
+        rng (random.Random): Генератор случайных чисел.
+        count (int): Количество аренд.
+        equipment (int): Количество оборудования (id от 1).
+        days (int): Длина периода, в который попадают аренды.
+
+    Возвращает:
+        list[tuple[int, int, date, date]]: (equipment_id, user_id, начало, конец).
+    """
+    rentals = []
+    for _ in range(count):
+        start = START + timedelta(days=rng.randrange(days))
+        rentals.append(
+            (rng.randint(1, equipment), 1, start, start + timedelta(days=rng.randint(1, 14)))
+        )
+    return rentals
+
+
+def measure(fn, repeat: int) -> float:
+    """
+    Возвращает медиану времени вызова fn() в микросекундах.
+
+    Аргументы:
+        fn (Callable): Замеряемая функция без аргументов.
+        repeat (int): Количество вызовов.
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
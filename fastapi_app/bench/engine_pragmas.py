@@ -0,0 +1,78 @@
+"""
+Запись и чтение списка: SQLite без PRAGMA против настроек по умолчанию из core/config.py.
+
+Через crud-функции и DataBaseHelper, без HTTP: --writes вызовов
+create_equipment пачками по --concurrency, затем 100 пачек по
+--concurrency чтений страницы get_all_equipment (limit=100).
+"До" - движок без PRAGMA (журнал отката, synchronous=FULL), "после" -
+PRAGMA из Settings (WAL, synchronous=NORMAL, mmap, cache_size, busy_timeout).
+
+    python bench/engine_pragmas.py --writes 1000 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from common import temp_db_url
+
+temp_db_url()
+
+from api.crud.equipment_cruds import create_equipment, get_all_equipment  # noqa: E402
+from core import Base, settings  # noqa: E402
+from core.db_help import DataBaseHelper  # noqa: E402
+from schemas.equipment import EquipmentCreate  # noqa: E402
+import models  # noqa: E402,F401 - регистрирует таблицы в Base.metadata
+
+TUNED = {
+    "journal_mode": settings.sqlite_journal_mode,
+    "synchronous": settings.sqlite_synchronous,
+    "mmap_size": settings.sqlite_mmap_size,
+    "cache_size": settings.sqlite_cache_size,
+    "busy_timeout": settings.sqlite_busy_timeout,
+}
+
+
+async def run(pragmas: dict | None, writes: int, concurrency: int) -> tuple[float, float]:
+    """Возвращает (записей/с, чтений/с) на новой временной базе."""
+    path = Path(tempfile.mkdtemp(prefix="fastapi_app_bench_")) / "pragmas.sqlite3"
+    helper = DataBaseHelper(f"sqlite+aiosqlite:///{path}", sqlite_pragmas=pragmas)
+    async with helper.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def write(i: int) -> None:
+        async with helper.session_factory() as session:
+            await create_equipment(EquipmentCreate(name=f"e{i}", discription="d"), session)
+
+    async def read() -> None:
+        async with helper.session_factory() as session:
+            await get_all_equipment(session, limit=100)
+
+    started = time.perf_counter()
+    for i in range(0, writes, concurrency):
+        await asyncio.gather(*(write(i + j) for j in range(concurrency)))
+    write_rate = writes / (time.perf_counter() - started)
+    started = time.perf_counter()
+    for _ in range(100):
+        await asyncio.gather(*(read() for _ in range(concurrency)))
+    read_rate = 100 * concurrency / (time.perf_counter() - started)
+    await helper.dispose()
+    return write_rate, read_rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writes", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'':>8} {'writes/s':>10} {'reads/s':>10}")
+    for label, pragmas in [("before", None), ("after", TUNED)]:
+        write_rate, read_rate = asyncio.run(run(pragmas, args.writes, args.concurrency))
+        print(f"{label:>8} {write_rate:>10.0f} {read_rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
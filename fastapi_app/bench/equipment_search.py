@@ -0,0 +1,118 @@
+"""
+Полнотекстовый поиск оборудования (FTS5): время запросов и цена индексации.
+
+Таблицы создаются через Base.metadata.create_all (с FTS-таблицей и
+триггерами из models.py), строки вставляются через sqlite3: --items
+записей по 15 слов (название из трех слов, описание из двенадцати).
+Для каждого запроса выводятся число совпадений, время SQL (выражение
+search_equipment, выполненное через sqlite3) и время самой
+crud-функции через aiosqlite и ORM. Цена индексации - разница времени
+вставки в таблицу с триггерами FTS и в такую же таблицу без них.
+
+    python bench/equipment_search.py --items 100000
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from common import temp_db_url
+
+DB_URL = temp_db_url()
+
+from sqlalchemy import event  # noqa: E402
+
+from api.crud.equipment_cruds import search_equipment  # noqa: E402
+from core import Base, db_helper  # noqa: E402
+import models  # noqa: E402,F401 - регистрирует таблицы в Base.metadata
+
+QUERIES = ["дрель", "генератор пила", "item9999", "w123", "w4"]
+WORDS = [f"w{i}" for i in range(5000)] + [
+    "дрель", "перфоратор", "болгарка", "генератор", "лестница",
+    "бетономешалка", "компрессор", "шуруповерт", "пила", "рубанок",
+]
+INSERT = "INSERT INTO equipments (name, discription) VALUES (?, ?)"
+
+
+def generate(items: int, seed: int) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    return [
+        (f"item{i} {rng.choice(WORDS)} {rng.choice(WORDS)}", " ".join(rng.choices(WORDS, k=12)))
+        for i in range(items)
+    ]
+
+
+def timed_insert(path: Path, rows: list[tuple[str, str]]) -> float:
+    db = sqlite3.connect(path)
+    started = time.perf_counter()
+    db.executemany(INSERT, rows)
+    db.commit()
+    elapsed = time.perf_counter() - started
+    db.close()
+    return elapsed
+
+
+async def create_tables() -> None:
+    async with db_helper.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def run_search(text: str, repeat: int) -> tuple[float, str, tuple]:
+    """Возвращает (мс на вызов search_equipment, SQL, параметры)."""
+    executed = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(db_helper.engine.sync_engine, "before_cursor_execute", on_execute)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        async with db_helper.session_factory() as session:
+            await search_equipment(session=session, text=text, limit=20, offset=0)
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    event.remove(db_helper.engine.sync_engine, "before_cursor_execute", on_execute)
+    statement, parameters = executed[-1]
+    return elapsed, statement, parameters
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    path = Path(DB_URL.removeprefix("sqlite+aiosqlite:///"))
+    asyncio.run(create_tables())
+    rows = generate(args.items, args.seed)
+    indexed = timed_insert(path, rows)
+
+    plain = Path(tempfile.mkdtemp(prefix="fastapi_app_bench_")) / "plain.sqlite3"
+    with sqlite3.connect(path) as source, sqlite3.connect(plain) as target:
+        ddl = source.execute("SELECT sql FROM sqlite_master WHERE name = 'equipments'").fetchone()[0]
+        target.execute(ddl)
+    unindexed = timed_insert(plain, rows)
+    print(f"items={args.items}, FTS indexing: {(indexed - unindexed) / args.items * 1e6:.0f} us/row")
+
+    db = sqlite3.connect(path)
+    print(f"{'query':>16} {'hits':>7} {'sql, ms':>8} {'crud, ms':>9}")
+    for text in QUERIES:
+        crud_ms, statement, parameters = asyncio.run(run_search(text, args.repeat))
+        match = next(value for value in parameters if isinstance(value, str))  # Выражение MATCH
+        hits = db.execute(
+            "SELECT count(*) FROM equipments_fts WHERE equipments_fts MATCH ?", (match,)
+        ).fetchone()[0]
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            db.execute(statement, parameters).fetchall()
+        sql_ms = (time.perf_counter() - started) / args.repeat * 1000
+        print(f"{text:>16} {hits:>7} {sql_ms:>8.2f} {crud_ms:>9.2f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
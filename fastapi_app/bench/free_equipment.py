@@ -0,0 +1,87 @@
+"""
+Поиск свободного оборудования: проверка EXISTS по каждому оборудованию против анти-соединения.
+
+Замер на уровне SQL (sqlite3), без приложения и без HTTP: таблицы
+equipments и rentals с составным индексом аренд, окно в 7 дней.
+"До" - то, что делал клиент без /api/equipment/available: по одной
+проверке занятости на каждое оборудование. "После" - один запрос
+NOT EXISTS, возвращающий все свободное оборудование.
+
+    python bench/free_equipment.py --equipment 10000 --rentals 200000
+"""
+
+import argparse
+import random
+import sqlite3
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from common import START, measure, random_rentals
+
+PROBE = (
+    "SELECT EXISTS (SELECT 1 FROM rentals "
+    "WHERE equipment_id = ? AND start_date < ? AND end_date > ?)"
+)
+ANTI_JOIN = (
+    "SELECT equipments.* FROM equipments WHERE NOT EXISTS (SELECT 1 FROM rentals "
+    "WHERE rentals.equipment_id = equipments.id AND start_date < ? AND end_date > ?) "
+    "ORDER BY equipments.id"
+)
+
+
+def build(equipment: int, rentals: int, seed: int) -> sqlite3.Connection:
+    path = Path(tempfile.mkdtemp(prefix="fastapi_app_bench_")) / "free.sqlite3"
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE equipments (id INTEGER PRIMARY KEY, name TEXT, discription TEXT)")
+    db.execute(
+        "CREATE TABLE rentals (id INTEGER PRIMARY KEY, equipment_id INTEGER, "
+        "user_id INTEGER, start_date DATE, end_date DATE)"
+    )
+    db.execute(
+        "CREATE INDEX ix_rentals_equipment_id_start_date_end_date "
+        "ON rentals (equipment_id, start_date, end_date)"
+    )
+    db.executemany(
+        "INSERT INTO equipments (name, discription) VALUES (?, ?)",
+        [(f"eq{i}", "d") for i in range(equipment)],
+    )
+    rows = random_rentals(random.Random(seed), rentals, equipment)
+    db.executemany(
+        "INSERT INTO rentals (equipment_id, user_id, start_date, end_date) VALUES (?, ?, ?, ?)",
+        [(e, u, s.isoformat(), f.isoformat()) for e, u, s, f in rows],
+    )
+    db.commit()
+    return db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--equipment", type=int, default=10000)
+    parser.add_argument("--rentals", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    db = build(args.equipment, args.rentals, args.seed)
+    start = START + timedelta(days=random.Random(args.seed).randrange(3650))
+    end = (start + timedelta(days=7)).isoformat()
+    ids = [row[0] for row in db.execute("SELECT id FROM equipments")]
+
+    def probes():
+        return [eid for eid in ids if not db.execute(PROBE, (eid, end, start.isoformat())).fetchone()[0]]
+
+    def anti_join():
+        return db.execute(ANTI_JOIN, (end, start.isoformat())).fetchall()
+
+    assert len(probes()) == len(anti_join())
+    before = measure(probes, args.repeat) / 1000
+    after = measure(anti_join, args.repeat) / 1000
+    print(f"equipment={args.equipment} rentals={args.rentals} free={len(anti_join())}")
+    print(f"per-item EXISTS: {before:.1f} ms")
+    print(f"anti-join:       {after:.1f} ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Создание записей: отдельные транзакции против группового commit (GROUP_COMMIT).
+
+Через crud-функции: --creates вызовов create_user, create_equipment и
+create_rental из --tasks одновременных задач, у каждого вызова своя
+сессия, как у запроса. С --http те же записи создаются запросами POST
+через httpx.ASGITransport (без сетевого сервера). Каждая конфигурация
+(synchronous x group_commit) запускается в отдельном процессе со своей
+временной базой: PRAGMA и настройки читаются при импорте core.
+
+    python bench/group_commit.py --tasks 16 64 --synchronous NORMAL FULL
+    python bench/group_commit.py --http --tasks 32 64 --synchronous NORMAL
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+EQUIPMENT = 200  # Оборудование для аренд; аренды одного оборудования не пересекаются
+
+
+def body(kind: str, i: int) -> dict:
+    """Данные i-й создаваемой записи."""
+    if kind == "user":
+        return {"username": f"u{i}", "email": f"e{i}", "password": "p", "telephone_number": "1"}
+    if kind == "equipment":
+        return {"name": f"x{i}", "discription": "d"}
+    start = date(2030, 1, 1) + timedelta(days=2 * (i // EQUIPMENT))
+    return {
+        "equipment_id": i % EQUIPMENT + 1,
+        "user_id": 1,
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=1)).isoformat(),
+    }
+
+
+async def run(creates: int, tasks: int, http: bool) -> dict[str, tuple[float, int]]:
+    """
+    Возвращает по видам сущностей (записей в секунду, число ошибок).
+
+    Ошибкой считается исключение или ответ не 200: без группового commit
+    при большой конкуренции запросы ждут блокировку записи SQLite дольше
+    busy_timeout и получают "database is locked".
+    """
+    import httpx
+
+    from api.crud.equipment_cruds import create_equipment
+    from api.crud.rental_cruds import create_rental
+    from api.crud.usercruds import create_user
+    from core import Base, db_helper
+    from core.batching import group_commit
+    from main import app
+    from schemas.equipment import EquipmentCreate
+    from schemas.rental import RentalCreate
+    from schemas.user import UserCreate
+    import models  # noqa: F401 - регистрирует таблицы в Base.metadata
+
+    creators = {
+        "user": lambda session, data: create_user(UserCreate(**data), session),
+        "equipment": lambda session, data: create_equipment(EquipmentCreate(**data), session),
+        "rental": lambda session, data: create_rental(session, RentalCreate(**data)),
+    }
+    async with db_helper.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with db_helper.session_factory() as session:
+        await create_user(UserCreate(**body("user", -1)), session)
+        for i in range(EQUIPMENT):
+            await create_equipment(EquipmentCreate(**body("equipment", -1 - i)), session)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)  # Ошибка - ответ 500
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+    rates = {}
+    for kind, create in creators.items():
+        numbers = iter(range(creates))
+        failed = 0
+
+        async def worker():
+            nonlocal failed
+            for i in numbers:
+                if http:
+                    response = await client.post(f"/api/{kind}", json=body(kind, i))
+                    failed += response.status_code != 200
+                    continue
+                async with db_helper.session_factory() as session:  # Как сессия запроса
+                    try:
+                        failed += await create(session, body(kind, i)) is None
+                    except Exception:
+                        failed += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(tasks)))
+        rates[kind] = ((creates - failed) / (time.perf_counter() - started), failed)
+    await client.aclose()
+    await group_commit.stop()
+    await db_helper.dispose()
+    return rates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--creates", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--synchronous", nargs="+", default=["NORMAL", "FULL"])
+    parser.add_argument("--http", action="store_true", help="POST через httpx.ASGITransport вместо crud-функций")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:  # Одна конфигурация, окружение задал родительский процесс
+        rates = asyncio.run(run(args.creates, args.tasks[0], args.http))
+        print("".join(f" {rate:>9.0f} {failed:>6}" for rate, failed in rates.values()))
+        return
+
+    from common import temp_db_url
+
+    header = "".join(f" {name + '/s':>9} {'errors':>6}" for name in ("user", "equip", "rental"))
+    print(f"{'synchronous':>11} {'tasks':>5} {'group':>5}{header}")
+    for synchronous in args.synchronous:
+        for tasks in args.tasks:
+            for grouped in ("false", "true"):
+                temp_db_url(SQLITE_SYNCHRONOUS=synchronous, GROUP_COMMIT=grouped)
+                output = subprocess.run(
+                    [
+                        sys.executable, __file__, "--child", "--creates", str(args.creates),
+                        "--tasks", str(tasks), *(["--http"] if args.http else []),
+                    ],
+                    env=dict(os.environ),
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout.rstrip("\n")
+                print(f"{synchronous:>11} {tasks:>5} {grouped:>5}{output}")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        from common import APP_DIR  # noqa: F401 - путь к модулям приложения
+    main()
@@ -0,0 +1,62 @@
+"""
+Сериализация списка аренд: путь FastAPI по умолчанию против fast_json.
+
+Замер без базы и HTTP: --rows ORM-объектов Rental в памяти.
+"До" - то, что FastAPI делает с response_model: валидация каждой
+строки схемой, jsonable_encoder и JSONResponse. "После" - api.fast_json
+(TypeAdapter со схемой маршрута, один проход pydantic-core).
+
+    python bench/list_serialization.py --rows 10000
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from common import measure, temp_db_url
+
+temp_db_url()
+
+from fastapi import Response  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from api.fast_json import fast_json  # noqa: E402
+from models import Rental  # noqa: E402
+from schemas.rental import Rental_id  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    start = datetime(2030, 1, 1)
+    rows = [
+        Rental(
+            id=i,
+            equipment_id=i % 100 + 1,
+            user_id=1,
+            start_date=start + timedelta(days=i % 365),
+            end_date=start + timedelta(days=i % 365 + 3),
+        )
+        for i in range(1, args.rows + 1)
+    ]
+
+    def default():
+        models = [Rental_id.model_validate(row) for row in rows]
+        return JSONResponse(jsonable_encoder(models)).body
+
+    def fast():
+        return fast_json(list[Rental_id], rows, Response()).body
+
+    assert default().replace(b" ", b"") == fast()
+    before = measure(default, args.repeat) / args.rows
+    after = measure(fast, args.repeat) / args.rows
+    print(f"rows={args.rows}")
+    print(f"model_validate + jsonable_encoder + JSONResponse: {before:.1f} us/row")
+    print(f"fast_json:                                       {after:.1f} us/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Проверка пересечения аренд: выборка строк без индекса против EXISTS по индексу.
+
+Замер на уровне SQL (sqlite3), без приложения: таблица rentals со
+случайными арендами, затем 200 случайных проверок для каждого варианта.
+
+    python bench/overlap_probe.py --rentals 10000 1000000
+"""
+
+import argparse
+import random
+import sqlite3
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from common import START, measure, random_rentals
+
+BEFORE = "SELECT * FROM rentals WHERE equipment_id = ? AND start_date < ? AND end_date > ?"
+AFTER = (
+    "SELECT EXISTS (SELECT 1 FROM rentals "
+    "WHERE equipment_id = ? AND start_date < ? AND end_date > ?)"
+)
+INDEX = (
+    "CREATE INDEX ix_rentals_equipment_id_start_date_end_date "
+    "ON rentals (equipment_id, start_date, end_date)"
+)
+
+
+def build(rentals: int, equipment: int, seed: int) -> sqlite3.Connection:
+    path = Path(tempfile.mkdtemp(prefix="fastapi_app_bench_")) / "probe.sqlite3"
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE rentals (id INTEGER PRIMARY KEY, equipment_id INTEGER, "
+        "user_id INTEGER, start_date DATE, end_date DATE)"
+    )
+    rows = random_rentals(random.Random(seed), rentals, equipment)
+    db.executemany(
+        "INSERT INTO rentals (equipment_id, user_id, start_date, end_date) VALUES (?, ?, ?, ?)",
+        [(e, u, s.isoformat(), f.isoformat()) for e, u, s, f in rows],
+    )
+    db.commit()
+    return db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rentals", type=int, nargs="+", default=[10000, 1000000])
+    parser.add_argument("--equipment", type=int, default=1000)
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    probes = []
+    for _ in range(args.probes):
+        start = START + timedelta(days=rng.randrange(3650))
+        probes.append((rng.randint(1, args.equipment), (start + timedelta(days=7)).isoformat(), start.isoformat()))
+
+    print(f"{'rentals':>10} {'before, us':>12} {'after, us':>12}")
+    for count in args.rentals:
+        db = build(count, args.equipment, args.seed)
+        it = iter(probes * 2)
+        before = measure(lambda: db.execute(BEFORE, next(it)).fetchall(), args.probes)
+        db.execute(INDEX)
+        it = iter(probes * 2)
+        after = measure(lambda: db.execute(AFTER, next(it)).fetchone(), args.probes)
+        print(f"{count:>10} {before:>12.1f} {after:>12.1f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Чтение под нагрузкой записи: общий движок против отдельных движков чтения на WAL-файле.
+
+Через crud-функции и DataBaseHelper, без HTTP: --writers задач
+непрерывно вызывают create_equipment, --readers задач читают страницу
+get_all_equipment (limit=50) через read_session_factory. Считаются
+чтения в секунду за --seconds секунд. readers=0 - все сессии идут через
+движок записи (pool_size=5, без overflow), как до разделения.
+
+    python bench/read_engines.py --sqlite-readers 0 1 2
+"""
+
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+
+from common import temp_db_url
+
+temp_db_url()
+
+from api.crud.equipment_cruds import create_equipment, get_all_equipment  # noqa: E402
+from core import Base  # noqa: E402
+from core.db_help import DataBaseHelper  # noqa: E402
+from schemas.equipment import EquipmentCreate  # noqa: E402
+import models  # noqa: E402,F401 - регистрирует таблицы в Base.metadata
+
+PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 5000}
+
+
+async def run(sqlite_readers: int, writers: int, readers: int, seconds: float) -> float:
+    """Возвращает чтений в секунду на новой временной базе."""
+    path = Path(tempfile.mkdtemp(prefix="fastapi_app_bench_")) / "readers.sqlite3"
+    helper = DataBaseHelper(
+        f"sqlite+aiosqlite:///{path}",
+        sqlite_pragmas=PRAGMAS,
+        sqlite_readers=sqlite_readers,
+        pool_size=5,
+        max_overflow=0,
+    )
+    async with helper.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    stop = asyncio.Event()
+    reads = 0
+
+    async def write(k: int) -> None:
+        i = 0
+        while not stop.is_set():
+            async with helper.session_factory() as session:
+                await create_equipment(EquipmentCreate(name=f"e{k}-{i}", discription="d"), session)
+            i += 1
+
+    async def read() -> None:
+        nonlocal reads
+        while not stop.is_set():
+            async with helper.read_session_factory()() as session:
+                await get_all_equipment(session, limit=50)
+            reads += 1
+
+    tasks = [asyncio.create_task(write(k)) for k in range(writers)]
+    tasks += [asyncio.create_task(read()) for _ in range(readers)]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    await helper.dispose()
+    return reads / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sqlite-readers", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=4.0)
+    args = parser.parse_args()
+
+    print(f"{'readers':>8} {'reads/s':>10}")
+    for count in args.sqlite_readers:
+        rate = asyncio.run(run(count, args.writers, args.readers, args.seconds))
+        print(f"{count:>8} {rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
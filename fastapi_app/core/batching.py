@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from . import settings
+from .db_help import db_helper
+
+logger = logging.getLogger(__name__)
+
+Stage = Callable[[AsyncSession], Awaitable[Any]]  # Запись без commit
+AfterCommit = Callable[[Any], None]  # Действия после успешного commit
+
+
+class GroupCommitter:
+    """
+    Групповой commit: записи из разных запросов в одной транзакции.
+
+    Запросы кладут в очередь свою запись (stage) и ждут future. Единственная
+    задача-писатель забирает из очереди пачку до max_batch записей,
+    выполняет их и делает один commit на пачку. Пока пишется одна пачка,
+    в очереди копится следующая; max_wait > 0 дополнительно ждет
+    пополнения пачки ценой задержки каждого запроса.
+
+    Если запись падает (например, на уникальности имени), транзакция
+    откатывается и пачка выполняется заново, каждая запись в своем
+    SAVEPOINT: ошибка возвращается только ее запросу. Поэтому запись
+    (stage) должна только работать с базой и быть готова к повтору.
+    Ошибка commit возвращается всем запросам пачки.
+
+    Атрибуты:
+        max_batch (int): Максимальное количество записей в транзакции.
+        max_wait (float): Сколько ждать пополнения пачки, секунды.
+    """
+
+    def __init__(
+        self, session_factory: async_sessionmaker[AsyncSession], max_batch: int, max_wait: float
+    ):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._session_factory = session_factory
+        self._queue: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+        self._batch: list[tuple] = []  # Пачка, которую собирает или пишет писатель
+
+    async def submit(self, stage: Stage, after_commit: AfterCommit | None = None) -> Any:
+        """
+        Ставит запись в очередь и ждет commit ее пачки.
+
+        Аргументы:
+            stage (Stage): Корутина-функция, выполняющая запись в переданной
+                сессии без commit и возвращающая результат запроса.
+            after_commit (AfterCommit | None): Вызывается с результатом
+                после commit (кэши, события).
+
+        Возвращает:
+            Any: Результат stage.
+
+        Исключения:
+            Exception: Ошибка stage или commit пачки.
+        """
+        if self._writer is None or self._writer.done():  # Запускаем писателя в текущем цикле
+            self._queue = asyncio.Queue()
+            self._writer = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((stage, after_commit, future))
+        return await future
+
+    async def stop(self) -> None:
+        """Останавливает писателя; записи текущей пачки и очереди получают отмену."""
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        for _, _, future in self._batch:  # Писатель остановлен посреди пачки
+            future.cancel()
+        self._batch = []
+        while self._queue is not None and not self._queue.empty():
+            self._queue.get_nowait()[2].cancel()
+
+    async def _next_batch(self) -> list[tuple]:
+        """Ждет первую запись и добирает пачку до max_batch или max_wait."""
+        loop = asyncio.get_running_loop()
+        batch = self._batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:  # До Python 3.11 - не встроенный TimeoutError
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            self._batch = []
+            try:
+                await self._apply(await self._next_batch())
+            except Exception as exc:  # Сбор или commit пачки не прошел - пачка не записана
+                for _, _, future in self._batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    async def _apply(self, batch: list[tuple]) -> None:
+        """Выполняет пачку записей в одной транзакции."""
+        live = [item for item in batch if not item[2].cancelled()]  # Ушедшие клиенты не пишутся
+        async with self._session_factory() as session:
+            try:
+                outcomes = [(True, await stage(session)) for stage, _, _ in live]
+            except Exception as exc:  # Редкий случай: повторяем пачку, изолируя записи
+                await session.rollback()
+                if len(live) == 1:
+                    outcomes = [(False, exc)]
+                else:
+                    outcomes = await self._apply_isolated(session, live)
+            await session.commit()
+
+        for (_, after_commit, future), (ok, value) in zip(live, outcomes):
+            if ok and after_commit is not None:
+                try:
+                    after_commit(value)  # Запись уже в базе, даже если клиент ушел
+                except Exception:
+                    logger.exception("Group commit after-commit hook failed")
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    @staticmethod
+    async def _apply_isolated(session: AsyncSession, live: list[tuple]) -> list[tuple]:
+        """Выполняет записи пачки, каждую в своем SAVEPOINT."""
+        outcomes = []
+        for stage, _, _ in live:
+            try:
+                async with session.begin_nested():
+                    result = await stage(session)
+                outcomes.append((True, result))
+            except Exception as exc:
+                outcomes.append((False, exc))
+        return outcomes
+
+
+group_commit = GroupCommitter(
+    db_helper.session_factory,
+    max_batch=settings.group_commit_max_batch,
+    max_wait=settings.group_commit_max_wait,
+)
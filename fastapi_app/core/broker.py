@@ -0,0 +1,121 @@
+import asyncio
+from collections.abc import Hashable
+from contextlib import contextmanager
+from typing import Any
+
+
+class Subscription:
+    """
+    Подписка на события по набору ключей с ограниченной очередью.
+
+    Атрибуты:
+        keys (frozenset): Ключи, события которых получает подписчик.
+        dropped (bool): Подписчик отключен, потому что не успевал читать.
+    """
+
+    def __init__(self, keys: frozenset, queue_size: int):
+        self.keys = keys
+        self.dropped = False
+        self._queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+    async def get(self) -> Any | None:
+        """
+        Ждет следующее событие.
+
+        Возвращает:
+            Any | None: Событие или None, если подписчик отключен.
+        """
+        return await self._queue.get()
+
+    def get_nowait(self) -> list[Any]:
+        """Забирает все уже накопившиеся события без ожидания."""
+        events = []
+        while not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
+
+class Broker:
+    """
+    Рассылка событий подписчикам по ключам в пределах процесса.
+
+    publish не ждет подписчиков: событие кладется в очередь каждого без
+    блокировки. Если очередь подписчика заполнена, он отключается (в
+    очередь кладется None), а остальные продолжают получать события,
+    поэтому медленный клиент не задерживает ни запись, ни других клиентов.
+
+    Атрибуты:
+        queue_size (int): Размер очереди одного подписчика.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[Hashable, set[Subscription]] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def active(self) -> bool:
+        """Есть ли хотя бы один подписчик."""
+        return self._count > 0
+
+    def subscribe(self, *keys: Hashable) -> Subscription:
+        """
+        Регистрирует подписчика на события указанных ключей.
+
+        Аргументы:
+            *keys (Hashable): Ключи подписки (повторы игнорируются).
+
+        Возвращает:
+            Subscription: Подписка, из которой читаются события.
+        """
+        subscription = Subscription(frozenset(keys), self.queue_size)
+        for key in subscription.keys:
+            self._subscribers.setdefault(key, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Снимает подписку; повторный вызов ничего не делает."""
+        removed = False
+        for key in subscription.keys:
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None and subscription in subscribers:
+                subscribers.discard(subscription)
+                removed = True
+                if not subscribers:
+                    del self._subscribers[key]
+        if removed:
+            self._count -= 1
+
+    @contextmanager
+    def subscription(self, *keys: Hashable):
+        """Подписка на время блока with."""
+        subscription = self.subscribe(*keys)
+        try:
+            yield subscription
+        finally:
+            self.unsubscribe(subscription)
+
+    def publish(self, key: Hashable, event: Any) -> None:
+        """
+        Отправляет событие всем подписчикам ключа.
+
+        Аргументы:
+            key (Hashable): Ключ события.
+            event (Any): Событие; один и тот же объект получают все подписчики.
+        """
+        for subscription in list(self._subscribers.get(key, ())):
+            try:
+                subscription._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        """Отключает подписчика, не успевающего читать события."""
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        subscription.get_nowait()  # Освобождаем очередь под метку отключения
+        subscription._queue.put_nowait(None)
@@ -0,0 +1,239 @@
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Collection, Protocol
+from .config import settings
+
+
+def as_dict(obj: Any, exclude: Collection[str] = ()) -> dict:
+    """
+    Возвращает значения колонок ORM-объекта в виде словаря.
+
+    Аргументы:
+        obj: Объект модели.
+        exclude (Collection[str]): Колонки, которые не попадают в словарь.
+
+    Возвращает:
+        dict: {имя колонки: значение}.
+    """
+    return {
+        column.key: getattr(obj, column.key)
+        for column in obj.__table__.columns
+        if column.key not in exclude
+    }
+
+
+class CacheBackend(Protocol):
+    """Хранилище кэша: значения - словари колонок, ключи - строки."""
+
+    async def get(self, key: str) -> dict | None: ...
+
+    async def set(self, key: str, value: dict) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class LRUCache:
+    """
+    LRU-кэш в памяти процесса с ограничением размера и временем жизни записей.
+
+    Атрибуты:
+        max_size (int): Максимальное количество записей.
+        ttl (float): Время жизни записи в секундах.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    async def get(self, key: str) -> dict | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]  # Запись устарела
+            return None
+        self._data.move_to_end(key)  # Отмечаем как недавно использованную
+        return value
+
+    async def set(self, key: str, value: dict) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)  # Вытесняем самую старую запись
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class LocalSharedClient:
+    """
+    Локальная замена клиента общего хранилища (API как у redis.asyncio.Redis).
+
+    Используется в разработке и тестах вместо внешнего сервиса.
+    """
+
+    def __init__(self):
+        self._data: dict[str, tuple[float | None, str]] = {}
+
+    async def get(self, name: str) -> str | None:
+        item = self._data.get(name)
+        if item is None:
+            return None
+        expires, value = item
+        if expires is not None and expires < time.monotonic():
+            del self._data[name]
+            return None
+        return value
+
+    async def set(self, name: str, value: str, ex: float | None = None) -> None:
+        self._data[name] = (time.monotonic() + ex if ex else None, value)
+
+    async def delete(self, name: str) -> None:
+        self._data.pop(name, None)
+
+
+class SharedCache:
+    """
+    Кэш в общем хранилище, доступном нескольким процессам.
+
+    Значения хранятся в JSON. Клиент должен поддерживать асинхронные
+    get/set(ex=)/delete, например redis.asyncio.Redis или LocalSharedClient.
+
+    Атрибуты:
+        client: Клиент хранилища.
+        ttl (float): Время жизни записи в секундах.
+        prefix (str): Префикс ключей приложения.
+    """
+
+    def __init__(self, client: Any, ttl: float, prefix: str = "rent:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> dict | None:
+        raw = await self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: dict) -> None:
+        await self.client.set(
+            self.prefix + key, json.dumps(value, default=str), ex=math.ceil(self.ttl)
+        )  # Redis принимает срок жизни только целым числом секунд
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+
+class EntityCache:
+    """
+    Кэш чтения сущностей по id со счетчиками попаданий и промахов.
+
+    Запись кэша помечена версией таблицы (номером последнего изменения в
+    журнале), прочитанной в одном снимке со строкой. Сброс оставляет на
+    месте записи метку с номером изменения, которое ее сбросило; значение,
+    загруженное до этого изменения, метку не заменяет. Так чтение, начатое
+    до записи и закончившееся после ее сброса, не кладет в кэш старую строку.
+
+    Атрибуты:
+        backend (CacheBackend | None): Хранилище; None отключает кэш.
+        hits (dict[str, int]): Попадания по пространствам имен.
+        misses (dict[str, int]): Промахи по пространствам имен.
+    """
+
+    def __init__(self, backend: CacheBackend | None):
+        self.backend = backend
+        self.hits: dict[str, int] = {}
+        self.misses: dict[str, int] = {}
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: int,
+        load: Callable[[], Awaitable[tuple[dict, int] | None]],
+    ) -> dict | None:
+        """
+        Возвращает значение из кэша или загружает его и кладет в кэш.
+
+        Аргументы:
+            namespace (str): Пространство имен (например, "equipment").
+            key (int): Идентификатор сущности.
+            load (Callable): Загрузка из базы при промахе: колонки сущности
+                и версия таблицы из того же запроса или None, если сущности нет.
+
+        Возвращает:
+            dict | None: Колонки сущности или None, если ее нет (None не кэшируется).
+        """
+        if self.backend is None:
+            loaded = await load()
+            return None if loaded is None else loaded[0]
+        cache_key = f"{namespace}:{key}"
+        entry = await self.backend.get(cache_key)
+        if entry is not None and "data" in entry:
+            self.hits[namespace] = self.hits.get(namespace, 0) + 1
+            return entry["data"]
+        self.misses[namespace] = self.misses.get(namespace, 0) + 1
+        loaded = await load()
+        if loaded is None:
+            return None
+        data, version = loaded
+        current = await self.backend.get(cache_key)  # Пока шла загрузка, запись могли сбросить
+        if current is None or current["version"] <= version:
+            await self.backend.set(cache_key, {"version": version, "data": data})
+        return data
+
+    async def invalidate(self, namespace: str, key: int, version: int) -> None:
+        """
+        Сбрасывает сущность в кэше, оставляя метку сброса.
+
+        Аргументы:
+            namespace (str): Пространство имен.
+            key (int): Идентификатор сущности.
+            version (int): Номер изменения в журнале, которое сбрасывает запись.
+        """
+        if self.backend is not None:
+            await self.backend.set(f"{namespace}:{key}", {"version": version})
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Возвращает счетчики попаданий и промахов.
+
+        Возвращает:
+            dict: {namespace: {"hits": ..., "misses": ...}}.
+        """
+        return {
+            namespace: {"hits": self.hits.get(namespace, 0), "misses": self.misses.get(namespace, 0)}
+            for namespace in sorted(self.hits.keys() | self.misses.keys())
+        }
+
+
+def make_backend(kind: str) -> CacheBackend | None:
+    """
+    Создает хранилище кэша по настройке settings.entity_cache.
+
+    Для "shared" с settings.entity_cache_url используется Redis (пакет
+    redis импортируется только в этом случае), без адреса - LocalSharedClient
+    в памяти процесса.
+
+    Аргументы:
+        kind (str): "none", "lru" или "shared".
+
+    Возвращает:
+        CacheBackend | None: Хранилище или None, если кэш отключен.
+    """
+    if kind == "lru":
+        return LRUCache(max_size=settings.entity_cache_size, ttl=settings.entity_cache_ttl)
+    if kind == "shared":
+        if settings.entity_cache_url:
+            from redis.asyncio import Redis
+
+            client = Redis.from_url(settings.entity_cache_url)
+        else:
+            client = LocalSharedClient()
+        return SharedCache(client, ttl=settings.entity_cache_ttl)
+    return None
+
+
+entity_cache = EntityCache(make_backend(settings.entity_cache))
@@ -4,7 +4,54 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     db_url: str = "sqlite+aiosqlite:///./fa_rent_db.sqlite3"
-    echo:bool = True
+    db_read_urls: list[str] = []  # Реплики для чтения; пусто - читать из db_url
+    sqlite_readers: int = 1  # Read-only движки к тому же файлу SQLite (WAL), если реплик нет
+    echo:bool = False
+    # Пул соединений и движок
+    pool_size: int = 5  # Постоянные соединения пула
+    max_overflow: int = 10  # Дополнительные соединения сверх pool_size
+    pool_pre_ping: bool = False  # Проверять соединение перед выдачей из пула
+    pool_recycle: int = -1  # Пересоздавать соединения старше N секунд (-1 - никогда)
+    pool_timeout: float = 30.0  # Ожидание свободного соединения, секунды
+    query_cache_size: int = 500  # Кэш скомпилированных SQL-выражений SQLAlchemy
+    statement_cache_size: int = 128  # Кэш подготовленных выражений драйвера sqlite3
+    # PRAGMA, выполняемые на каждом новом соединении SQLite
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 268435456  # 256 МБ
+    sqlite_cache_size: int = -65536  # Отрицательное значение - в КиБ (64 МБ)
+    sqlite_busy_timeout: int = 5000  # Миллисекунды
+    page_size_default: int = 100  # Размер страницы списков по умолчанию
+    page_size_max: int = 1000  # Максимально допустимый размер страницы
+    export_chunk_size: int = 1000  # Размер пачки строк при потоковой выгрузке
+    import_chunk_size: int = 1000  # Размер пачки строк при массовом импорте
+    report_max_days: int = 731  # Максимальная длина окна отчетов, дни
+    report_max_buckets: int = 106  # Максимум периодов в отчете (недели двух лет)
+    bulk_max_items: int = 5000  # Максимальный размер пакета при массовом бронировании
+    group_commit: bool = False  # Создание пользователей, оборудования и аренд общими транзакциями
+    group_commit_max_batch: int = 64  # Максимум записей в одной транзакции
+    group_commit_max_wait: float = 0.0  # Ожидание пополнения пачки, секунды (0 - не ждать)
+    availability_cache: bool = False  # Кэш занятости в памяти процесса, сверяется с журналом изменений
+    availability_cache_check: bool = False  # Сравнивать ответы кэша с базой и логировать расхождения
+    occupancy_bitmaps: bool = False  # Битовые карты занятости по дням (core/occupancy.py)
+    occupancy_path: str = "./occupancy.bin"  # Файл карт для mmap; пусто - только в памяти
+    occupancy_horizon_days: int = 1096  # Длина горизонта карт, дни
+    occupancy_past_days: int = 31  # Сколько прошедших дней держать в горизонте
+    occupancy_roll_interval: float = 3600.0  # Проверка сдвига горизонта, секунды
+    occupancy_replay_max: int = 10000  # Больше изменений с последнего запуска - полная перестройка
+    availability_events_queue: int = 100  # Очередь событий занятости одного клиента; при переполнении клиент отключается
+    availability_events_max_equipment: int = 100  # Максимум оборудования в одной подписке
+    availability_events_keepalive: float = 15.0  # Интервал пустых сообщений в потоке, секунды
+    # Кэш чтения сущностей по id: none, lru или shared. lru живет в памяти
+    # процесса и видит только свои записи - он для запуска с одним воркером;
+    # при нескольких воркерах нужен shared с entity_cache_url
+    entity_cache: str = "none"
+    entity_cache_url: str = ""  # Адрес Redis для shared (redis://...); пусто - хранилище в памяти процесса
+    entity_cache_size: int = 10000  # Максимум записей в LRU-кэше
+    entity_cache_ttl: float = 60.0  # Время жизни записи кэша, секунды
+    sql_timing_sample_rate: float = 0.0  # Доля запросов с замером SQL (0 - выключено)
+    fast_json: bool = True  # Сериализовать списки через TypeAdapter, минуя jsonable_encoder
+    metrics: bool = True  # Эндпоинт /metrics в формате Prometheus
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
         "uq": "uq_%(table_name)s_%(column_0_N_name)s",
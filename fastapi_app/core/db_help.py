@@ -1,4 +1,7 @@
+from itertools import cycle
 from . import settings
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     create_async_engine,
@@ -8,18 +11,155 @@ from sqlalchemy.ext.asyncio import (
 
 
 class DataBaseHelper:
-    def __init__(self, url: str, echo: bool = False):
-        self.engine: AsyncEngine = create_async_engine(url=url, echo=echo)
-        self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
-            bind=self.engine,
+    """
+    Движки и фабрики сессий приложения.
+
+    Запись идет через единственный движок engine. Чтение распределяется
+    по кругу между движками read_engines: репликами из read_urls или, для
+    файловой SQLite, read-only соединениями к тому же файлу (PRAGMA
+    query_only), которые в режиме WAL не ждут блокировку записи. Если
+    движков чтения нет, чтение идет через engine.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        echo: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_pre_ping: bool = False,
+        pool_recycle: int = -1,
+        pool_timeout: float = 30.0,
+        query_cache_size: int = 500,
+        statement_cache_size: int = 128,
+        sqlite_pragmas: dict[str, str | int] | None = None,
+        read_urls: list[str] | None = None,
+        sqlite_readers: int = 0,
+    ):
+        self._engine_options = dict(
+            echo=echo,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=pool_pre_ping,
+            pool_recycle=pool_recycle,
+            pool_timeout=pool_timeout,
+            query_cache_size=query_cache_size,
+            statement_cache_size=statement_cache_size,
+        )
+        self.engine: AsyncEngine = self._create_engine(url, sqlite_pragmas)
+        self.session_factory: async_sessionmaker[AsyncSession] = self._make_factory(self.engine)
+
+        # Движки только для чтения
+        reader_pragmas = {
+            name: value for name, value in (sqlite_pragmas or {}).items() if name != "journal_mode"
+        }  # Режим журнала задает движок записи
+        if not read_urls and self._is_sqlite_file(url):
+            read_urls = [url] * sqlite_readers
+            reader_pragmas["query_only"] = "ON"
+        self.read_engines: list[AsyncEngine] = [
+            self._create_engine(read_url, reader_pragmas) for read_url in read_urls or []
+        ]
+        self._read_factories = cycle(
+            [self._make_factory(engine) for engine in self.read_engines] or [self.session_factory]
+        )
+
+    @staticmethod
+    def _is_sqlite_file(url: str) -> bool:
+        """Проверяет, что URL указывает на файловую базу SQLite."""
+        parsed = make_url(url)
+        return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+    @staticmethod
+    def _make_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(
+            bind=engine,
             expire_on_commit=False,
             autoflush=False,
             autocommit=False,
         )
 
-    async def get_session(self):
+    def _create_engine(self, url: str, sqlite_pragmas: dict[str, str | int] | None) -> AsyncEngine:
+        """
+        Создает движок с настройками пула и PRAGMA для SQLite.
+
+        Аргументы:
+            url (str): URL базы данных.
+            sqlite_pragmas (dict | None): PRAGMA для каждого нового соединения SQLite.
+
+        Возвращает:
+            AsyncEngine: Созданный движок.
+        """
+        options = dict(self._engine_options)
+        statement_cache_size = options.pop("statement_cache_size")
+        is_sqlite = make_url(url).get_backend_name() == "sqlite"
+        if is_sqlite and not self._is_sqlite_file(url):  # Для :memory: используется StaticPool без настроек пула
+            for name in ("pool_size", "max_overflow", "pool_pre_ping", "pool_recycle", "pool_timeout"):
+                options.pop(name)
+        if is_sqlite:
+            options["connect_args"] = {"cached_statements": statement_cache_size}
+
+        engine = create_async_engine(url=url, **options)
+        if is_sqlite and sqlite_pragmas:
+            self._set_sqlite_pragmas(engine, sqlite_pragmas)
+        return engine
+
+    @staticmethod
+    def _set_sqlite_pragmas(engine: AsyncEngine, pragmas: dict[str, str | int]) -> None:
+        """
+        Выполняет PRAGMA на каждом новом соединении SQLite.
+
+        Аргументы:
+            engine (AsyncEngine): Движок, для соединений которого задаются PRAGMA.
+            pragmas (dict): {имя PRAGMA: значение}.
+        """
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    def read_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """
+        Возвращает фабрику сессий следующего движка чтения (по кругу).
+
+        Возвращает:
+            async_sessionmaker[AsyncSession]: Фабрика сессий для чтения.
+        """
+        return next(self._read_factories)
+
+    async def get_write_session(self):
         async with self.session_factory() as session:
             yield session
 
+    async def get_read_session(self):
+        async with self.read_session_factory()() as session:
+            yield session
+
+    async def dispose(self) -> None:
+        """Закрывает соединения всех движков."""
+        for engine in [self.engine, *self.read_engines]:
+            await engine.dispose()
 
-db_helper = DataBaseHelper(settings.db_url, echo=True)
+
+db_helper = DataBaseHelper(
+    settings.db_url,
+    echo=settings.echo,
+    pool_size=settings.pool_size,
+    max_overflow=settings.max_overflow,
+    pool_pre_ping=settings.pool_pre_ping,
+    pool_recycle=settings.pool_recycle,
+    pool_timeout=settings.pool_timeout,
+    query_cache_size=settings.query_cache_size,
+    statement_cache_size=settings.statement_cache_size,
+    sqlite_pragmas={
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "busy_timeout": settings.sqlite_busy_timeout,
+    },
+    read_urls=settings.db_read_urls,
+    sqlite_readers=settings.sqlite_readers,
+)
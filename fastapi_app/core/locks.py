@@ -0,0 +1,65 @@
+import asyncio
+from collections.abc import Hashable
+from contextlib import asynccontextmanager
+
+
+class KeyedLock:
+    """
+    Асинхронные блокировки по ключу в пределах процесса.
+
+    Запросы с одинаковым ключом выполняются по очереди, с разными - не ждут
+    друг друга. Блокировка создается при первом захвате ключа и удаляется,
+    когда ее больше никто не держит и не ждет, поэтому словарь не растет
+    вместе с числом ключей.
+    """
+
+    def __init__(self):
+        self._locks: dict[Hashable, tuple[asyncio.Lock, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    async def _acquire(self, key: Hashable) -> None:
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            await lock.acquire()
+        except BaseException:  # Отмена во время ожидания
+            self._release_ref(key)
+            raise
+
+    def _release_ref(self, key: Hashable) -> None:
+        lock, users = self._locks[key]
+        if users == 1:
+            del self._locks[key]
+        else:
+            self._locks[key] = (lock, users - 1)
+
+    def _release(self, key: Hashable) -> None:
+        self._locks[key][0].release()
+        self._release_ref(key)
+
+    @asynccontextmanager
+    async def hold(self, *keys: Hashable):
+        """
+        Захватывает блокировки всех ключей на время блока with.
+
+        Ключи захватываются в отсортированном порядке, чтобы два запроса
+        с пересекающимися наборами ключей не ждали друг друга по кругу.
+
+        Аргументы:
+            *keys (Hashable): Ключи блокировок (повторы игнорируются).
+        """
+        ordered = sorted(set(keys))
+        held: list[Hashable] = []
+        try:
+            for key in ordered:
+                await self._acquire(key)
+                held.append(key)
+            yield
+        finally:
+            for key in reversed(held):
+                self._release(key)
+
@@ -0,0 +1,247 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable
+from .db_help import db_helper
+from .timing import route_template
+
+# Метрики изменяются только из потока событийного цикла, поэтому обычные
+# операции над int/float атомарны относительно других корутин и блокировки
+# не нужны: запись в метрику - это поиск в dict и одно сложение.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    """Формирует блок меток {name="value",...} в формате Prometheus."""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """
+    Монотонный счетчик с метками.
+
+    Атрибуты:
+        name (str): Имя метрики.
+        help (str): Описание метрики.
+        labels (tuple[str, ...]): Имена меток.
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for values, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labels, values)} {value}"
+
+
+class Gauge(Counter):
+    """
+    Значение, которое может расти и убывать, с метками.
+
+    Если задан callback, значения читаются из него в момент сбора метрик.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        callback: Callable[[], dict[tuple, float]] | None = None,
+    ):
+        super().__init__(name, help, labels)
+        self.callback = callback
+
+    def dec(self, *label_values, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def samples(self) -> Iterable[str]:
+        if self.callback is not None:
+            self._values = self.callback()
+        return super().samples()
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными границами корзин и метками.
+
+    Атрибуты:
+        name (str): Имя метрики.
+        help (str): Описание метрики.
+        labels (tuple[str, ...]): Имена меток.
+        buckets (tuple[float, ...]): Верхние границы корзин.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._values: dict[tuple, list] = {}  # метки -> [счетчики корзин, сумма, количество]
+
+    def observe(self, value: float, *label_values) -> None:
+        state = self._values.get(label_values)
+        if state is None:
+            state = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1  # Последняя корзина - +Inf
+        state[1] += value
+        state[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        for values, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                labels = _format_labels((*self.labels, "le"), (*values, bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, values)} {total}"
+            yield f"{self.name}_count{_format_labels(self.labels, values)} {count}"
+
+
+class MetricsRegistry:
+    """Набор метрик процесса и их вывод в текстовом формате Prometheus."""
+
+    def __init__(self):
+        self._metrics: list[Counter | Histogram] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Формирует текст всех метрик (text exposition format 0.0.4).
+
+        Возвращает:
+            str: Текст для ответа /metrics.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+def _pool_stats(method: str) -> Callable[[], dict[tuple, float]]:
+    """Создает callback, читающий показатель пула у всех движков приложения."""
+
+    def collect() -> dict[tuple, float]:
+        engines = [("writer", db_helper.engine)] + [
+            (f"reader{idx}", engine) for idx, engine in enumerate(db_helper.read_engines)
+        ]
+        result = {}
+        for name, engine in engines:
+            stat = getattr(engine.pool, method, None)  # У StaticPool показателей нет
+            if stat is not None:
+                result[(name,)] = stat()
+        return result
+
+    return collect
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Время обработки HTTP-запроса",
+        labels=("method", "route", "status"),
+    )
+)
+http_requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "Запросы, обрабатываемые в данный момент")
+)
+db_pool_checked_out = registry.register(
+    Gauge(
+        "db_pool_checked_out",
+        "Соединения, выданные из пула",
+        labels=("engine",),
+        callback=_pool_stats("checkedout"),
+    )
+)
+db_pool_overflow = registry.register(
+    Gauge(
+        "db_pool_overflow",
+        "Соединения сверх pool_size (отрицательное значение - свободный запас пула)",
+        labels=("engine",),
+        callback=_pool_stats("overflow"),
+    )
+)
+booking_conflicts = registry.register(
+    Counter(
+        "rental_booking_conflicts_total",
+        "Отклоненные из-за пересечения бронирования",
+        labels=("source",),
+    )
+)
+availability_dropped = registry.register(
+    Counter(
+        "availability_events_dropped_total",
+        "Подписчики событий занятости, отключенные из-за переполнения очереди",
+    )
+)
+
+
+class MetricsMiddleware:
+    """
+    Собирает длительность запросов по шаблону маршрута и число активных запросов.
+
+    Чистый ASGI-middleware: тело ответа не буферизуется, а запрос считается
+    завершенным после отправки последней части тела (http.response.body
+    без more_body), поэтому в длительность потоковых ответов входит вся
+    выгрузка. Шаблон маршрута берется из scope после маршрутизации.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        finished = None
+
+        async def send_measured(message):
+            nonlocal status, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = time.perf_counter()  # Последняя часть тела отправлена
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_measured)
+        finally:
+            http_requests_in_flight.dec()
+            http_request_duration.observe(
+                (finished or time.perf_counter()) - started,
+                scope["method"],
+                route_template(scope) or "unmatched",
+                status,
+            )
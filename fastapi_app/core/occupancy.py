@@ -0,0 +1,325 @@
+import mmap
+import os
+import struct
+from datetime import date
+
+try:
+    import fcntl
+except ImportError:  # Windows: файл не блокируется
+    fcntl = None
+
+_MAGIC = b"OCC1"
+_HEADER = struct.Struct("<4sIIIQ")  # magic, days, capacity, low, last_seq
+_HEADER_SIZE = 64
+
+
+class OccupancyBitmap:
+    """
+    Битовые карты занятости оборудования по дням на скользящем горизонте.
+
+    Для каждого дня горизонта хранится строка битов по id оборудования
+    (бит установлен - оборудование в этот день занято). Строки лежат по
+    кругу: день d занимает строку d.toordinal() % days, поэтому сдвиг
+    горизонта обнуляет выпавшие дни и не переносит данные. "Свободно ли
+    оборудование X в дни D1..D2" - проверка одного бита в каждой строке,
+    "какое оборудование свободно в D1..D2" - OR строк этих дней.
+
+    Данные лежат в mmap: файл settings.occupancy_path (заголовок и строки)
+    или анонимная память, если файл не задан. Файлом владеет один процесс.
+
+    Атрибуты:
+        days (int): Длина горизонта в днях.
+        capacity (int): Число бит в строке (id оборудования < capacity).
+        low (int): Первый день горизонта (date.toordinal()).
+        high (int): День после последнего достоверного дня горизонта.
+        last_seq (int): Номер изменения журнала, до которого файл сверен с базой.
+        ready (bool): Карты заполнены и могут использоваться.
+    """
+
+    def __init__(self, days: int):
+        self.days = days
+        self.capacity = 0
+        self.low = 0
+        self.high = 0
+        self.last_seq = 0
+        self.ready = False
+        self._mm: mmap.mmap | None = None
+        self._fd: int | None = None
+
+    @property
+    def row_bytes(self) -> int:
+        return self.capacity // 8
+
+    def _size(self, capacity: int) -> int:
+        return _HEADER_SIZE + self.days * capacity // 8
+
+    def open(self, path: str | None) -> bool:
+        """
+        Открывает файл карт, захватывая его для этого процесса.
+
+        Аргументы:
+            path (str | None): Путь к файлу; None - хранить только в памяти.
+
+        Возвращает:
+            bool: True, если из файла загружены карты с тем же горизонтом.
+
+        Исключения:
+            BlockingIOError: Файл захвачен другим процессом.
+        """
+        self.close()
+        if path:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)  # Один владелец файла
+            except OSError:
+                os.close(fd)
+                raise
+            self._fd = fd
+        if self._fd is not None:
+            size = os.fstat(self._fd).st_size
+            if size >= _HEADER_SIZE:
+                mm = mmap.mmap(self._fd, size)
+                magic, days, capacity, low, last_seq = _HEADER.unpack_from(mm)
+                if magic == _MAGIC and days == self.days and size == self._size(capacity):
+                    self._mm, self.capacity, self.last_seq = mm, capacity, last_seq
+                    self.low, self.high = low, low + days
+                    return True
+                mm.close()
+        self.reset(date.today())
+        return False
+
+    def reset(self, low: date) -> None:
+        """
+        Обнуляет карты и начинает горизонт с дня low.
+
+        Аргументы:
+            low (date): Первый день горизонта.
+        """
+        self._allocate(self.capacity or 64)
+        self.low = low.toordinal()
+        self.high = self.low + self.days
+        self.last_seq = 0
+        self.write_header()
+
+    def _allocate(self, capacity: int) -> None:
+        """Создает обнуленные карты на capacity бит в строке."""
+        if self._mm is not None:
+            self._mm.close()
+        size = self._size(capacity)
+        if self._fd is not None:
+            os.ftruncate(self._fd, 0)
+            os.ftruncate(self._fd, size)
+            self._mm = mmap.mmap(self._fd, size)
+        else:
+            self._mm = mmap.mmap(-1, size)
+        self.capacity = capacity
+
+    def _grow(self, equipment_id: int) -> None:
+        """Расширяет строки, чтобы в них поместился бит equipment_id."""
+        old_rb = self.row_bytes
+        capacity = max(self.capacity * 2, (equipment_id // 64 + 1) * 64)
+        new_rb = capacity // 8
+        size = self._size(capacity)
+        if self._fd is not None:
+            self._mm.flush()
+            self._mm.close()
+            os.ftruncate(self._fd, size)
+            self._mm = mmap.mmap(self._fd, size)
+        else:
+            grown = mmap.mmap(-1, size)
+            grown[: len(self._mm)] = self._mm[:]
+            self._mm.close()
+            self._mm = grown
+        # Раздвигаем строки с конца, чтобы не затереть еще не перенесенные
+        zeros = bytes(new_rb - old_rb)
+        for row in reversed(range(self.days)):
+            src = _HEADER_SIZE + row * old_rb
+            dst = _HEADER_SIZE + row * new_rb
+            self._mm.move(dst, src, old_rb)
+            self._mm[dst + old_rb : dst + new_rb] = zeros
+        self.capacity = capacity
+        self.write_header()
+
+    def write_header(self) -> None:
+        """Записывает заголовок (горизонт, размер строк, last_seq)."""
+        _HEADER.pack_into(self._mm, 0, _MAGIC, self.days, self.capacity, self.low, self.last_seq)
+
+    def flush(self) -> None:
+        """Сбрасывает изменения карт в файл."""
+        if self._mm is not None and self._fd is not None:
+            self._mm.flush()
+
+    def close(self) -> None:
+        """Закрывает карты и освобождает файл."""
+        self.ready = False
+        if self._mm is not None:
+            self.flush()
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            os.close(self._fd)  # Закрытие снимает flock
+            self._fd = None
+
+    def covers(self, start: date, end: date) -> bool:
+        """Проверяет, что дни [start, end) лежат внутри достоверного горизонта."""
+        return self.low <= start.toordinal() and end.toordinal() <= self.high
+
+    def _offset(self, day: int) -> int:
+        return _HEADER_SIZE + (day % self.days) * self.row_bytes
+
+    def mark(self, equipment_id: int, start: date, end: date, busy: bool) -> None:
+        """
+        Отмечает дни [start, end) оборудования занятыми или свободными.
+
+        Дни вне горизонта игнорируются.
+
+        Аргументы:
+            equipment_id (int): Идентификатор оборудования.
+            start (date): Первый день.
+            end (date): День после последнего.
+            busy (bool): True - занять дни, False - освободить.
+        """
+        first = max(start.toordinal(), self.low)
+        last = min(end.toordinal(), self.low + self.days)
+        if first >= last:
+            return
+        if equipment_id >= self.capacity:
+            if not busy:
+                return  # Битов этого оборудования еще нет - освобождать нечего
+            self._grow(equipment_id)
+        mm, byte, bit = self._mm, equipment_id >> 3, 1 << (equipment_id & 7)
+        for day in range(first, last):
+            offset = self._offset(day) + byte
+            mm[offset] = mm[offset] | bit if busy else mm[offset] & ~bit & 0xFF
+
+    def mark_many(self, rentals) -> None:
+        """
+        Отмечает занятыми дни пачки аренд (быстрый путь загрузки из базы).
+
+        Аргументы:
+            rentals (Iterable[tuple[int, date, date]]): (equipment_id, начало, конец).
+        """
+        rentals = list(rentals)
+        top = max((equipment_id for equipment_id, _, _ in rentals), default=-1)
+        if top >= self.capacity:
+            self._grow(top)
+        low, high, rb, mm = self.low, self.low + self.days, self.row_bytes, self._mm
+        offsets = [self._offset(day) for day in range(low, high)]  # Строка каждого дня горизонта
+        for equipment_id, start, end in rentals:
+            first = max(start.toordinal(), low) - low
+            last = min(end.toordinal(), high) - low
+            byte, bit = equipment_id >> 3, 1 << (equipment_id & 7)
+            for offset in offsets[first:last] if first < last else ():
+                mm[offset + byte] |= bit
+
+    def clear_equipment(self, equipment_id: int) -> None:
+        """Освобождает все дни горизонта оборудования."""
+        self.mark(
+            equipment_id, date.fromordinal(self.low), date.fromordinal(self.low + self.days), False
+        )
+
+    def is_free(self, equipment_id: int, start: date, end: date) -> bool:
+        """
+        Проверяет, что оборудование свободно во все дни [start, end).
+
+        Аргументы:
+            equipment_id (int): Идентификатор оборудования.
+            start (date): Первый день.
+            end (date): День после последнего.
+
+        Возвращает:
+            bool: True, если ни один день не занят.
+        """
+        if equipment_id >= self.capacity:
+            return True
+        mm, byte, bit = self._mm, equipment_id >> 3, 1 << (equipment_id & 7)
+        return not any(
+            mm[self._offset(day) + byte] & bit for day in range(start.toordinal(), end.toordinal())
+        )
+
+    def busy_days(self, equipment_id: int, start: date, end: date) -> list[bool]:
+        """Возвращает занятость оборудования по дням [start, end)."""
+        if equipment_id >= self.capacity:
+            return [False] * (end - start).days
+        mm, byte, bit = self._mm, equipment_id >> 3, 1 << (equipment_id & 7)
+        return [
+            bool(mm[self._offset(day) + byte] & bit)
+            for day in range(start.toordinal(), end.toordinal())
+        ]
+
+    def busy_mask(self, start: date, end: date) -> int:
+        """
+        Возвращает маску оборудования, занятого хотя бы в один из дней [start, end).
+
+        Возвращает:
+            int: Бит i установлен, если оборудование с id=i занято.
+        """
+        mask = 0
+        rb = self.row_bytes
+        for day in range(start.toordinal(), end.toordinal()):
+            offset = self._offset(day)
+            mask |= int.from_bytes(self._mm[offset : offset + rb], "little")
+        return mask
+
+    def free_ids(self, busy: int, after_id: int, count: int, upto: int) -> list[int]:
+        """
+        Возвращает первые count id из (after_id, upto], свободные по маске busy.
+
+        Учитываются только id меньше capacity: оборудование с большим id
+        еще ни разу не бронировалось и свободно всегда.
+
+        Аргументы:
+            busy (int): Маска занятого оборудования (busy_mask).
+            after_id (int): Искать id строго больше указанного.
+            count (int): Сколько id вернуть.
+            upto (int): Наибольший id, который имеет смысл вернуть.
+
+        Возвращает:
+            list[int]: Свободные id по возрастанию.
+        """
+        base = after_id + 1
+        bits = min(self.capacity, upto + 1)
+        if base >= bits:
+            return []
+        free = (~busy & ((1 << bits) - 1)) >> base
+        ids = []
+        while free and len(ids) < count:
+            lowest = free & -free
+            shift = lowest.bit_length()
+            ids.append(base + shift - 1)
+            free >>= shift
+            base += shift
+        return ids
+
+    def roll(self, low: date) -> tuple[date, date] | None:
+        """
+        Сдвигает начало горизонта вперед до дня low.
+
+        Строки выпавших дней обнуляются и переходят к новым дням в конце
+        горизонта. До загрузки этих дней вызывающей стороной (и вызова
+        finish_roll) они не считаются достоверными: covers для них ложно.
+
+        Аргументы:
+            low (date): Новый первый день горизонта.
+
+        Возвращает:
+            tuple[date, date] | None: Дни, которые нужно загрузить из базы,
+            или None, если сдвигать не нужно.
+        """
+        new_low = low.toordinal()
+        if new_low <= self.low:
+            return None
+        old_high = self.low + self.days
+        zeros = bytes(self.row_bytes)
+        for day in range(self.low, min(new_low, old_high)):
+            offset = self._offset(day)
+            self._mm[offset : offset + self.row_bytes] = zeros
+        self.low = new_low
+        self.high = max(min(self.high, old_high), new_low)
+        return date.fromordinal(max(old_high, new_low)), date.fromordinal(new_low + self.days)
+
+    def finish_roll(self) -> None:
+        """Отмечает новые дни горизонта загруженными и сохраняет заголовок."""
+        self.high = self.low + self.days
+        self.write_header()
@@ -0,0 +1,149 @@
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger("api.timing")
+
+
+def route_template(scope: dict) -> str | None:
+    """
+    Возвращает шаблон пути сработавшего маршрута (например, /api/rental/{rent_id}).
+
+    Маршрут берется из scope["route"]. Маршруты вложенных роутеров в
+    зависимости от версии FastAPI хранят путь с префиксом или без него,
+    поэтому префикс восстанавливается из самого пути запроса: это его
+    начало, после которого остаток совпадает с шаблоном маршрута.
+
+    Аргументы:
+        scope (dict): ASGI scope запроса после маршрутизации.
+
+    Возвращает:
+        str | None: Шаблон пути или None, если маршрут не найден.
+    """
+    route = scope.get("route")
+    if route is None:
+        return None
+    path = scope["path"]
+    regex = getattr(route, "path_regex", None)
+    if regex is not None:
+        for idx, char in enumerate(path):
+            if char == "/" and regex.match(path[idx:]):
+                return path[:idx] + route.path  # Префикс роутеров + шаблон маршрута
+    return route.path
+
+
+class RequestStats:
+    """
+    Статистика SQL за время обработки одного HTTP-запроса.
+
+    Атрибуты:
+        queries (int): Количество выполненных выражений.
+        db_time (float): Суммарное время выполнения SQL, секунды.
+    """
+
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Подключает к движку подсчет выражений и времени SQL для текущего запроса.
+
+    Замер идет только если для запроса создан RequestStats, остальные
+    выражения проходят с одной проверкой ContextVar.
+
+    Аргументы:
+        engine (AsyncEngine): Инструментируемый движок.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if request_stats.get() is not None:
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = request_stats.get()
+        if stats is not None and conn.info.get("query_start"):
+            stats.db_time += time.perf_counter() - conn.info["query_start"].pop()
+            stats.queries += 1
+
+
+class SQLTimingMiddleware:
+    """
+    Замеряет время SQL и всего запроса для доли sample_rate запросов.
+
+    Чистый ASGI-middleware: тело ответа не буферизуется, а замер идет до
+    отправки последней части тела (http.response.body без more_body),
+    поэтому время потоковых ответов учитывается целиком. Заголовок
+    Server-Timing уходит вместе с началом ответа и содержит время до
+    этого момента; итоговые значения пишутся в лог api.timing одной
+    JSON-строкой. Невыбранные запросы проходят без замера.
+
+    Атрибуты:
+        sample_rate (float): Доля замеряемых запросов от 0 до 1.
+    """
+
+    def __init__(self, app, sample_rate: float):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (
+            self.sample_rate < 1.0 and random.random() >= self.sample_rate
+        ):
+            await self.app(scope, receive, send)  # Запрос не попал в выборку
+            return
+
+        stats = RequestStats()
+        started = time.perf_counter()
+        status = None
+        finished = None
+
+        async def send_timed(message):
+            nonlocal status, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                db_ms = stats.db_time * 1000
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    f'db;dur={db_ms:.2f};desc="{stats.queries} queries", '
+                    f"app;dur={total_ms - db_ms:.2f}, total;dur={total_ms:.2f}",
+                )
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = time.perf_counter()  # Последняя часть тела отправлена
+
+        token = request_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            request_stats.reset(token)
+        if finished is None:  # Ответ не был отправлен до конца
+            return
+        total_ms = (finished - started) * 1000
+        db_ms = stats.db_time * 1000
+        logger.info(
+            json.dumps(
+                {
+                    "method": scope["method"],
+                    "path": route_template(scope) or scope["path"],
+                    "status": status,
+                    "queries": stats.queries,
+                    "db_ms": round(db_ms, 2),
+                    "total_ms": round(total_ms, 2),
+                }
+            )
+        )
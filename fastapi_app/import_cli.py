@@ -0,0 +1,70 @@
+"""
+Массовый импорт пользователей и оборудования из CSV/NDJSON файла.
+
+Пример:
+    python import_cli.py equipment equipments.csv
+    python import_cli.py user users.ndjson --chunk-size 5000
+"""
+
+import argparse
+import asyncio
+
+from api.crud.import_cruds import import_rows
+from api.importing import iter_lines, iter_records
+from core import settings, db_helper
+from models import Equipment, User
+from schemas.equipment import EquipmentCreate
+from schemas.user import UserCreate
+
+TARGETS = {
+    "equipment": (Equipment, EquipmentCreate),
+    "user": (User, UserCreate),
+}
+
+
+async def read_file(path: str, block_size: int = 1 << 16):
+    """Читает файл блоками, не загружая его в память целиком."""
+    with open(path, "rb") as file:
+        while block := file.read(block_size):
+            yield block
+
+
+async def main(target: str, path: str, fmt: str, chunk_size: int) -> None:
+    """
+    Импортирует файл и печатает отчет.
+
+    Аргументы:
+        target (str): Что импортируем: "equipment" или "user".
+        path (str): Путь к файлу.
+        fmt (str): Формат файла: "csv" или "ndjson".
+        chunk_size (int): Количество строк в одной транзакции.
+    """
+    model, schema = TARGETS[target]
+    async with db_helper.session_factory() as session:
+        report = await import_rows(
+            session=session,
+            model=model,
+            schema=schema,
+            records=iter_records(iter_lines(read_file(path)), fmt),
+            chunk_size=chunk_size,
+        )
+    await db_helper.dispose()
+
+    for error in report.errors:
+        print(f"row {error.row}: {error.detail}")
+    print(
+        f"total={report.total} inserted={report.inserted} failed={report.failed} "
+        f"time={report.seconds}s speed={report.rows_per_sec} rows/sec"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Массовый импорт CSV/NDJSON")
+    parser.add_argument("target", choices=TARGETS)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--chunk-size", type=int, default=settings.import_chunk_size)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    asyncio.run(main(args.target, args.path, fmt, args.chunk_size))
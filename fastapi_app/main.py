@@ -1,8 +1,78 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import PlainTextResponse
 from api import router as api_router
+from api.crud.availability_cruds import (
+    occupancy,
+    roll_occupancy,
+    warm_availability_cache,
+    warm_occupancy,
+)
+from core import settings, db_helper
+from core.batching import group_commit
+from core.metrics import MetricsMiddleware, registry
+from core.timing import SQLTimingMiddleware, instrument_engine
 
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Действия при запуске и остановке приложения.
+
+    При включенном settings.availability_cache прогревает кэш занятости
+    оборудования из таблицы rentals. При включенном settings.occupancy_bitmaps
+    открывает карты занятости, раз в settings.occupancy_roll_interval
+    сдвигает их горизонт и при остановке сохраняет их в файл. При
+    остановке завершает задачу группового commit.
+    """
+    if settings.availability_cache:
+        async with db_helper.session_factory() as session:
+            await warm_availability_cache(session)
+    roller = None
+    if settings.occupancy_bitmaps:
+        async with db_helper.session_factory() as session:
+            await warm_occupancy(session)
+        roller = asyncio.create_task(roll_occupancy_periodically())
+    yield
+    await group_commit.stop()
+    if roller is not None:
+        roller.cancel()
+        with suppress(asyncio.CancelledError):
+            await roller
+        occupancy.close()
+
+
+async def roll_occupancy_periodically():
+    """Сдвигает горизонт карт занятости вслед за текущей датой."""
+    while True:
+        await asyncio.sleep(settings.occupancy_roll_interval)
+        try:
+            async with db_helper.session_factory() as session:
+                await roll_occupancy(session)
+        except Exception:  # Следующая попытка через интервал; до нее карты покрывают меньше дней
+            logger.exception("Occupancy roll failed")
+
+
+app = FastAPI(lifespan=lifespan)
+
+if settings.sql_timing_sample_rate > 0:  # При выключенном замере движки не инструментируются
+    for engine in [db_helper.engine, *db_helper.read_engines]:
+        instrument_engine(engine)
+    app.add_middleware(SQLTimingMiddleware, sample_rate=settings.sql_timing_sample_rate)
+
+if settings.metrics:
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Отдает метрики процесса в текстовом формате Prometheus."""
+        return PlainTextResponse(
+            registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
 
 app.include_router(api_router)
 
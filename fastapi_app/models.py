@@ -1,5 +1,5 @@
 from core import Base
-from sqlalchemy import String, Integer, ForeignKey, Date
+from sqlalchemy import DDL, JSON, String, Integer, ForeignKey, Date, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
@@ -55,6 +55,44 @@ class Equipment(Base):
         return self.name
 
 
+# Полнотекстовый индекс оборудования (SQLite FTS5) по name и discription.
+# Таблица хранит только индекс (content='equipments'), а триггеры
+# обновляют его при любой записи в equipments, включая массовый импорт.
+EQUIPMENT_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE equipments_fts USING fts5(
+        name, discription,
+        content='equipments', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER equipments_fts_ai AFTER INSERT ON equipments BEGIN
+        INSERT INTO equipments_fts(rowid, name, discription)
+        VALUES (new.id, new.name, new.discription);
+    END
+    """,
+    """
+    CREATE TRIGGER equipments_fts_ad AFTER DELETE ON equipments BEGIN
+        INSERT INTO equipments_fts(equipments_fts, rowid, name, discription)
+        VALUES ('delete', old.id, old.name, old.discription);
+    END
+    """,
+    """
+    CREATE TRIGGER equipments_fts_au AFTER UPDATE ON equipments BEGIN
+        INSERT INTO equipments_fts(equipments_fts, rowid, name, discription)
+        VALUES ('delete', old.id, old.name, old.discription);
+        INSERT INTO equipments_fts(rowid, name, discription)
+        VALUES (new.id, new.name, new.discription);
+    END
+    """,
+]
+for statement in EQUIPMENT_FTS_DDL:
+    event.listen(
+        Equipment.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+
+
 class Rental(Base):
     """
     Модель аренды.
@@ -66,6 +104,24 @@ class Rental(Base):
         end_date (str): Дата окончания аренды.
     """
 
+    __table_args__ = (
+        # Составной индекс для проверки пересечения аренд по оборудованию
+        Index(
+            "ix_rentals_equipment_id_start_date_end_date",
+            "equipment_id",
+            "start_date",
+            "end_date",
+        ),
+        # Индексы для фильтров списка аренд (пользователь и окно дат)
+        Index(
+            "ix_rentals_user_id_start_date_end_date",
+            "user_id",
+            "start_date",
+            "end_date",
+        ),
+        Index("ix_rentals_end_date_start_date", "end_date", "start_date"),
+    )
+
     equipment_id: Mapped[int] = mapped_column(Integer, ForeignKey("equipments.id"))
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
     start_date: Mapped[str] = mapped_column(Date)
@@ -73,3 +129,32 @@ class Rental(Base):
 
     equipment = relationship("Equipment")
     user = relationship("User")
+
+
+class Change(Base):
+    """
+    Запись журнала изменений для инкрементальной синхронизации.
+
+    Каждая запись в users, equipments и rentals через api/crud добавляет
+    сюда строку в той же транзакции. id служит номером изменения: он
+    только растет и не переиспользуется (AUTOINCREMENT).
+
+    Атрибуты:
+        entity (str): Имя таблицы измененной записи.
+        entity_id (int): Идентификатор измененной записи.
+        op (str): Операция: create, update или delete.
+        data (dict | None): Запись после изменения; None для удаления.
+    """
+
+    __table_args__ = (
+        # Последнее изменение таблицы (версия для ETag): max(id) по индексу
+        Index("ix_changes_entity", "entity"),
+        # История одной записи: сверка карт занятости (sync_occupancy)
+        Index("ix_changes_entity_id", "entity", "entity_id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    entity: Mapped[str] = mapped_column(String(20))
+    entity_id: Mapped[int] = mapped_column(Integer)
+    op: Mapped[str] = mapped_column(String(6))
+    data: Mapped[dict | None] = mapped_column(JSON, nullable=True)
@@ -0,0 +1,7 @@
+from datetime import date
+from pydantic import BaseModel
+
+
+class Interval(BaseModel):
+    start_date: date
+    end_date: date
@@ -0,0 +1,13 @@
+from typing import Any, Literal
+from pydantic import BaseModel
+
+
+class Change(BaseModel):
+    seq: int  # Номер изменения, передается как since следующего запроса
+    entity: Literal["users", "equipments", "rentals"]
+    entity_id: int
+    op: Literal["create", "update", "delete"]
+    data: dict[str, Any] | None = None  # Запись после изменения; None для удаления
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+
+class ImportRowError(BaseModel):
+    row: int
+    detail: str
+
+
+class ImportReport(BaseModel):
+    total: int = 0
+    inserted: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    rows_per_sec: float = 0.0
+    errors: list[ImportRowError] = []
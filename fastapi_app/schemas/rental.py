@@ -1,5 +1,7 @@
 from datetime import datetime
 from pydantic import BaseModel
+from .equipment import Equipment_id
+from .user import User_public
 
 
 class RentalBase(BaseModel):
@@ -18,3 +20,16 @@ class Rental_id(RentalBase):
 
     class Config:
         from_attributes = True
+
+
+class RentalExpanded(Rental_id):
+    # Связи заполняются только при ?expand=..., иначе опускаются в ответе
+    equipment: Equipment_id | None = None
+    user: User_public | None = None
+
+
+class RentalBulkResult(BaseModel):
+    index: int
+    accepted: bool
+    id: int | None = None
+    detail: str | None = None
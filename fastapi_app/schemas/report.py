@@ -0,0 +1,20 @@
+from datetime import date
+from pydantic import BaseModel
+
+
+class UtilizationBucket(BaseModel):
+    start_date: date
+    end_date: date
+    days: int
+
+
+class EquipmentUtilization(BaseModel):
+    equipment_id: int
+    occupied_days: list[int]  # По одному значению на период из buckets
+    utilization: list[float]  # Доля занятых дней в процентах
+
+
+class UtilizationReport(BaseModel):
+    bucket: str
+    buckets: list[UtilizationBucket]
+    items: list[EquipmentUtilization]
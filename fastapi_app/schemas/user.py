@@ -12,8 +12,12 @@ class UserCreate(UserBase):
     pass
 
 
-class User_id(UserBase):
+class User_public(BaseModel):
+    # Пользователь в ответах API и журнале изменений: пароль не выдается
     id: int
+    username: str
+    email: str
+    telephone_number: str
 
     class Config:
         from_attributes = True
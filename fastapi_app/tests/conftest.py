@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Настройки читаются при импорте core, поэтому окружение задается до него
+_tmp = tempfile.mkdtemp(prefix="fastapi_app_tests_")
+os.environ["DB_URL"] = f"sqlite+aiosqlite:///{_tmp}/test.sqlite3"
+os.environ["ENTITY_CACHE"] = "none"  # Каждое чтение идет в базу
+os.environ["METRICS"] = "false"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+import pytest
+from sqlalchemy import text
+from core import Base, db_helper
+import models  # noqa: F401 - регистрирует таблицы в Base.metadata
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """
+    Чистая база для теста.
+
+    Перед тестом таблицы очищаются, а счетчики id начинаются заново.
+    Соединения пулов закрываются после теста: каждый тест идет в своем
+    цикле событий, и соединения aiosqlite нельзя переносить между циклами.
+    """
+    async with db_helper.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+        await conn.execute(text("DELETE FROM sqlite_sequence"))
+    yield db_helper
+    for engine in [db_helper.engine, *db_helper.read_engines]:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def client(db):
+    """HTTP-клиент приложения поверх ASGI, без сетевого сервера."""
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
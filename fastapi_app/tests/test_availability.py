@@ -0,0 +1,53 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}
+EQUIPMENT = {"name": "drill", "discription": "d"}
+
+
+async def book(client, start: str, end: str) -> None:
+    rental = {"equipment_id": 1, "user_id": 1, "start_date": start, "end_date": end}
+    assert (await client.post("/api/rental", json=rental)).status_code == 200
+
+
+async def test_free_intervals(client):
+    assert (await client.post("/api/user", json=USER)).status_code == 200
+    assert (await client.post("/api/equipment", json=EQUIPMENT)).status_code == 200
+    await book(client, "2030-01-01", "2030-01-03")  # Начинается до окна
+    await book(client, "2030-01-03", "2030-01-05")  # Стык с предыдущей
+    await book(client, "2030-01-08", "2030-01-12")  # Заканчивается после окна
+
+    response = await client.get(
+        "/api/equipment/1/availability", params={"from": "2030-01-02", "to": "2030-01-10"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [{"start_date": "2030-01-05", "end_date": "2030-01-08"}]
+
+
+async def test_free_intervals_without_rentals(client):
+    assert (await client.post("/api/equipment", json=EQUIPMENT)).status_code == 200
+
+    response = await client.get(
+        "/api/equipment/1/availability", params={"from": "2030-01-01", "to": "2030-02-01"}
+    )
+
+    assert response.json() == [{"start_date": "2030-01-01", "end_date": "2030-02-01"}]
+
+
+@pytest.mark.parametrize(
+    "equipment_id, date_from, date_to, status",
+    [
+        (1, "2030-01-05", "2030-01-05", 400),  # Пустое окно
+        (99, "2030-01-01", "2030-01-05", 404),
+    ],
+)
+async def test_free_intervals_errors(client, equipment_id, date_from, date_to, status):
+    assert (await client.post("/api/equipment", json=EQUIPMENT)).status_code == 200
+
+    response = await client.get(
+        f"/api/equipment/{equipment_id}/availability", params={"from": date_from, "to": date_to}
+    )
+
+    assert response.status_code == status
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete, insert
+
+from api.crud.availability_cruds import availability_cache, warm_availability_cache
+from api.crud.change_cruds import record_changes, record_deletes
+from core import settings
+from models import Equipment, Rental, User
+from test_query_counts import count_sql
+
+pytestmark = pytest.mark.anyio
+
+START = date(2030, 1, 1)
+RENTAL = {
+    "equipment_id": 1,
+    "user_id": 1,
+    "start_date": START.isoformat(),
+    "end_date": (START + timedelta(days=2)).isoformat(),
+}
+
+
+@pytest.fixture
+async def cache(db, monkeypatch):
+    """Пользователь, оборудование и прогретый кэш занятости; кэш очищается после теста."""
+    monkeypatch.setattr(settings, "availability_cache", True)
+    async with db.session_factory() as session:
+        await session.execute(
+            insert(User),
+            [{"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}],
+        )
+        await session.execute(insert(Equipment), [{"name": "e", "discription": "d"}])
+        await session.commit()
+        await warm_availability_cache(session)
+    yield availability_cache
+    availability_cache.clear()
+
+
+async def test_cache_rejects_rentals_of_other_processes(db, client, cache):
+    async with db.session_factory() as session:  # Аренда другого воркера: мимо кэша этого процесса
+        rental = await session.scalar(
+            insert(Rental)
+            .values(equipment_id=1, user_id=1, start_date=START, end_date=START + timedelta(days=2))
+            .returning(Rental)
+        )
+        seq = await record_changes(session, Rental, "create", [rental])
+        await session.commit()
+
+    with count_sql(db) as executed:
+        response = await client.post("/api/rental", json=RENTAL)
+
+    assert response.status_code == 400
+    assert cache.last_seq == seq
+    assert not any("FROM rentals" in sql for sql in executed["statements"])  # Отказ дал кэш
+
+
+async def test_cache_follows_deletes_of_other_processes(db, client, cache):
+    assert (await client.post("/api/rental", json=RENTAL)).status_code == 200
+    assert (await client.post("/api/rental", json=RENTAL)).status_code == 400
+
+    async with db.session_factory() as session:  # Другой воркер отменил аренду
+        await session.execute(delete(Rental).where(Rental.id == 1))
+        await record_deletes(session, Rental, [1])
+        await session.commit()
+
+    assert (await client.post("/api/rental", json=RENTAL)).status_code == 200
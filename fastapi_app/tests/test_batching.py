@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from core import batching
+from core.batching import GroupCommitter
+
+pytestmark = pytest.mark.anyio
+
+
+async def echo(session, value=1):
+    return value
+
+
+async def test_batch_waits_for_more(db):
+    committer = GroupCommitter(db.session_factory, max_batch=8, max_wait=0.01)
+    try:
+        assert await asyncio.gather(*(committer.submit(echo) for _ in range(3))) == [1, 1, 1]
+    finally:
+        await committer.stop()
+
+
+async def test_collect_failure_fails_futures(db, monkeypatch):
+    async def broken_wait_for(awaitable, timeout):
+        awaitable.close()
+        raise RuntimeError("queue broken")
+
+    fake_asyncio = SimpleNamespace(**{**vars(asyncio), "wait_for": broken_wait_for})
+    monkeypatch.setattr(batching, "asyncio", fake_asyncio)
+    committer = GroupCommitter(db.session_factory, max_batch=8, max_wait=0.01)
+    try:
+        with pytest.raises(RuntimeError, match="queue broken"):
+            await asyncio.wait_for(committer.submit(echo), 1)
+    finally:
+        await committer.stop()
+
+
+async def test_stop_cancels_batch_in_flight(db):
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow(session):
+        started.set()
+        await release.wait()
+
+    committer = GroupCommitter(db.session_factory, max_batch=8, max_wait=0)
+    pending = asyncio.create_task(committer.submit(slow))
+    await started.wait()
+    await committer.stop()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(pending, 1)
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import random
+import subprocess
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert, text
+
+from api.crud.rental_cruds import create_rental, create_rentals_bulk
+from core import db_helper, settings
+from core.batching import group_commit
+from models import Equipment, User
+from schemas.rental import RentalCreate
+
+pytestmark = pytest.mark.anyio
+
+EQUIPMENT_COUNT = 3  # Мало оборудования - много пересечений
+DAYS = 30
+WORKERS = 4  # Процессы, бронирующие параллельно с тестом
+TASKS = 16  # Одновременные запросы в каждом процессе
+ROUNDS = 8  # Бронирований на запрос
+START = date(2030, 1, 1)
+
+# Пары аренд одного оборудования с пересекающимися датами
+OVERLAPS = text(
+    """
+    SELECT a.id, b.id FROM rentals a
+    JOIN rentals b ON a.equipment_id = b.equipment_id AND a.id < b.id
+    WHERE a.start_date < b.end_date AND b.start_date < a.end_date
+    """
+)
+
+
+def random_rental(rng: random.Random) -> RentalCreate:
+    start = START + timedelta(days=rng.randrange(DAYS))
+    return RentalCreate(
+        equipment_id=rng.randint(1, EQUIPMENT_COUNT),
+        user_id=1,
+        start_date=start,
+        end_date=start + timedelta(days=rng.randint(1, 3)),
+    )
+
+
+async def book(seed: int) -> None:
+    """Бронирует случайные даты: TASKS одновременных запросов, каждый пятый - пакетом."""
+
+    async def client(rng: random.Random):
+        for _ in range(ROUNDS):
+            async with db_helper.session_factory() as session:
+                if rng.random() < 0.2:
+                    await create_rentals_bulk(session, [random_rental(rng) for _ in range(5)])
+                else:
+                    await create_rental(session, random_rental(rng))
+
+    await asyncio.gather(*(client(random.Random(seed * 1000 + i)) for i in range(TASKS)))
+    await group_commit.stop()
+
+
+@pytest.mark.parametrize("grouped", [False, True], ids=["single", "group_commit"])
+async def test_no_double_booking(db, monkeypatch, grouped):
+    async with db.session_factory() as session:
+        await session.execute(
+            insert(User),
+            [{"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}],
+        )
+        await session.execute(
+            insert(Equipment),
+            [{"name": f"eq{i}", "discription": "d"} for i in range(EQUIPMENT_COUNT)],
+        )
+        await session.commit()
+    assert settings.sqlite_journal_mode == "WAL"
+
+    monkeypatch.setattr(settings, "group_commit", grouped)
+    env = dict(
+        os.environ,
+        GROUP_COMMIT=str(grouped).lower(),
+        PYTHONPATH=str(Path(__file__).resolve().parents[1]),
+    )
+    workers = [
+        subprocess.Popen([sys.executable, __file__, str(seed)], env=env)
+        for seed in range(1, WORKERS + 1)
+    ]
+    try:
+        await book(0)
+    finally:
+        codes = [await asyncio.to_thread(worker.wait) for worker in workers]
+    assert codes == [0] * WORKERS
+
+    async with db.session_factory() as session:
+        assert (await session.execute(OVERLAPS)).all() == []
+        booked = await session.scalar(text("SELECT count(*) FROM rentals"))
+    assert 0 < booked < (WORKERS + 1) * TASKS * ROUNDS  # Бронирования шли, и часть получила отказ
+
+
+if __name__ == "__main__":  # Процесс-воркер теста
+    asyncio.run(book(int(sys.argv[1])))
@@ -0,0 +1,49 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}
+EQUIPMENT = {"name": "drill", "discription": "d"}
+RENTAL = {"equipment_id": 1, "user_id": 1, "start_date": "2030-01-01T00:00:00", "end_date": "2030-01-05T00:00:00"}
+
+
+async def read_feed(client, since: int, limit: int) -> tuple[list[dict], list[int]]:
+    """Читает журнал с since, следуя X-Next-Cursor; возвращает изменения и размеры страниц."""
+    changes, pages = [], []
+    while True:
+        response = await client.get("/api/changes", params={"since": since, "limit": limit})
+        assert response.status_code == 200
+        page = response.json()
+        changes += page
+        pages.append(len(page))
+        if "x-next-cursor" not in response.headers:
+            return changes, pages
+        since = int(response.headers["x-next-cursor"])
+
+
+async def test_feed_since_cursor(client):
+    assert (await client.post("/api/user", json=USER)).status_code == 200
+    assert (await client.post("/api/equipment", json=EQUIPMENT)).status_code == 200
+    assert (await client.post("/api/rental", json=RENTAL)).status_code == 200
+    renamed = {"name": "saw", "discription": "d"}
+    assert (await client.put("/api/equipment/1", json=renamed)).status_code == 200
+    assert (await client.delete("/api/rental/1")).status_code == 200
+
+    changes, pages = await read_feed(client, since=0, limit=2)
+
+    assert pages == [2, 2, 1]
+    assert [change["seq"] for change in changes] == [1, 2, 3, 4, 5]
+    assert [(change["entity"], change["entity_id"], change["op"]) for change in changes] == [
+        ("users", 1, "create"),
+        ("equipments", 1, "create"),
+        ("rentals", 1, "create"),
+        ("equipments", 1, "update"),
+        ("rentals", 1, "delete"),
+    ]
+    assert changes[0]["data"] == {"id": 1, "username": "u", "email": "u@example.com", "telephone_number": "1"}
+    assert changes[2]["data"] == dict(RENTAL, id=1)
+    assert changes[3]["data"] == dict(renamed, id=1)
+    assert changes[4]["data"] is None
+
+    assert (await read_feed(client, since=3, limit=100))[0] == changes[3:]
+    assert (await read_feed(client, since=5, limit=100))[0] == []
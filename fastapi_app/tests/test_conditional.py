@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy import update
+from api.crud.change_cruds import record_changes
+from models import Equipment
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_etag_follows_writes_from_other_processes(client, db):
+    """ETag меняется при записи из другого процесса (воркер, import_cli.py)."""
+    await client.post("/api/equipment", json={"name": "drill", "discription": "d"})
+    first = await client.get("/api/equipment/1")
+    tag = first.headers["ETag"]
+
+    unchanged = await client.get("/api/equipment/1", headers={"If-None-Match": tag})
+    assert unchanged.status_code == 304
+
+    # Запись, как ее делает другой процесс: строка и журнал, без кода этого процесса
+    async with db.session_factory() as session:
+        stmt = update(Equipment).where(Equipment.id == 1).values(discription="new")
+        row = (await session.execute(stmt.returning(Equipment))).scalar_one()
+        await record_changes(session, Equipment, "update", [row])
+        await session.commit()
+
+    changed = await client.get("/api/equipment/1", headers={"If-None-Match": tag})
+    assert changed.status_code == 200
+    assert changed.json()["discription"] == "new"
+    assert changed.headers["ETag"] != tag
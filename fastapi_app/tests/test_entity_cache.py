@@ -0,0 +1,48 @@
+import pytest
+
+from core.cache import EntityCache, LRUCache
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Кэш сущностей в памяти вместо отключенного в тестах."""
+    from api.crud import usercruds
+
+    cache = EntityCache(LRUCache(max_size=100, ttl=60))
+    monkeypatch.setattr(usercruds, "entity_cache", cache)
+    return cache
+
+
+async def test_stale_fill_is_dropped(cache):
+    """Значение, загруженное до записи, не заменяет метку ее сброса."""
+
+    async def stale_load():
+        await cache.invalidate("user", 1, 5)  # Запись закончилась, пока шла загрузка
+        return {"id": 1, "username": "old"}, 4
+
+    async def fresh_load():
+        return {"id": 1, "username": "new"}, 5
+
+    assert await cache.get_or_load("user", 1, stale_load) == {"id": 1, "username": "old"}
+    assert await cache.get_or_load("user", 1, fresh_load) == {"id": 1, "username": "new"}
+    assert await cache.get_or_load("user", 1, stale_load) == {"id": 1, "username": "new"}
+    assert cache.stats() == {"user": {"hits": 1, "misses": 2}}
+
+
+async def test_user_cached_without_password(client, cache):
+    assert (await client.post("/api/user", json=USER)).status_code == 200
+
+    for _ in range(2):  # Промах, затем попадание
+        response = await client.get("/api/user/1")
+        assert response.status_code == 200
+        assert "password" not in response.json()
+    assert "password" not in (await cache.backend.get("user:1"))["data"]
+
+    updated = dict(USER, email="new@example.com")
+    assert (await client.put("/api/user/1", json=updated)).status_code == 200
+    assert (await client.get("/api/user/1")).json()["email"] == "new@example.com"
+    assert cache.stats() == {"user": {"hits": 1, "misses": 2}}
@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+
+from api.crud.availability_cruds import availability_events
+from core.metrics import availability_dropped
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}
+
+
+class Stream:
+    """
+    Поток SSE приложения, читаемый по частям.
+
+    httpx.ASGITransport дожидается конца ответа, а поток событий
+    бесконечен, поэтому приложение вызывается напрямую по ASGI. Если
+    paused, отправка тела ждет resume - так ведет себя клиент, который
+    не успевает читать.
+    """
+
+    def __init__(self, app, query: str, paused: bool = False):
+        self.chunks: asyncio.Queue = asyncio.Queue()
+        self.sending = asyncio.Event()
+        if not paused:
+            self.sending.set()
+        self.disconnected = asyncio.Event()
+        self.started = False
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/rental/availability/events",
+            "raw_path": b"/api/rental/availability/events",
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"test")],
+            "server": ("test", 80),
+            "client": ("127.0.0.1", 1),
+        }
+        self.task = asyncio.create_task(app(scope, self.receive, self.send))
+
+    async def receive(self):
+        if not self.started:
+            self.started = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            if self.chunks.qsize():  # Первая часть уже отдана, дальше клиент может тормозить
+                await self.sending.wait()
+            await self.chunks.put(message["body"].decode())
+
+    async def read(self) -> str:
+        return await asyncio.wait_for(self.chunks.get(), 5)
+
+    async def close(self):
+        self.disconnected.set()
+        self.sending.set()
+        await asyncio.wait_for(self.task, 5)
+
+
+async def test_events_delivered_and_slow_client_dropped(client, monkeypatch):
+    from main import app
+
+    monkeypatch.setattr(availability_events, "queue_size", 2)
+    assert (await client.post("/api/user", json=USER)).status_code == 200
+    for name in ("drill", "saw"):
+        assert (await client.post("/api/equipment", json={"name": name, "discription": "d"})).status_code == 200
+
+    fast = Stream(app, "equipment_id=1")
+    slow = Stream(app, "equipment_id=1&equipment_id=2", paused=True)
+    assert await fast.read() == ": subscribed\n\n"
+    while len(availability_events) < 2:  # Обе подписки оформлены
+        await asyncio.sleep(0.01)
+    dropped = availability_dropped._values.get((), 0)
+
+    for day in range(1, 5):  # Четыре события при очереди на два
+        rental = {
+            "equipment_id": 1,
+            "user_id": 1,
+            "start_date": f"2030-01-0{day}T00:00:00",
+            "end_date": f"2030-01-0{day + 1}T00:00:00",
+        }
+        assert (await client.post("/api/rental", json=rental)).status_code == 200
+        event = json.loads((await fast.read()).removeprefix("data: "))
+        assert event == {"op": "create", "rental": dict(rental, id=day)}
+
+    slow.sending.set()  # Клиент снова читает: поток сообщает об отключении и закрывается
+    assert await slow.read() == ": subscribed\n\n"
+    assert '"op":"create"' in await slow.read()  # Событие, отправка которого ждала клиента
+    assert await slow.read() == 'data: {"op":"dropped"}\n\n'
+    await asyncio.wait_for(slow.task, 5)
+    assert availability_dropped._values.get((), 0) == dropped + 1
+    assert len(availability_events) == 1  # Быстрый клиент остался подписан
+
+    await fast.close()
+    assert not availability_events.active
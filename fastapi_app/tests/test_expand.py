@@ -0,0 +1,35 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}
+EQUIPMENT = {"name": "drill", "discription": "d"}
+RENTAL = {"equipment_id": 1, "user_id": 1, "start_date": "2030-01-01T00:00:00", "end_date": "2030-01-05T00:00:00"}
+PUBLIC_USER = {"id": 1, "username": "u", "email": "u@example.com", "telephone_number": "1"}
+
+
+@pytest.fixture
+async def rental(client):
+    assert (await client.post("/api/user", json=USER)).status_code == 200
+    assert (await client.post("/api/equipment", json=EQUIPMENT)).status_code == 200
+    assert (await client.post("/api/rental", json=RENTAL)).status_code == 200
+
+
+@pytest.mark.parametrize(
+    "expand, extra",
+    [
+        (None, {}),
+        ("equipment", {"equipment": dict(EQUIPMENT, id=1)}),
+        ("equipment,user", {"equipment": dict(EQUIPMENT, id=1), "user": PUBLIC_USER}),
+    ],
+)
+async def test_expand(client, rental, expand, extra):
+    params = {} if expand is None else {"expand": expand}
+    expected = dict(RENTAL, id=1, **extra)
+
+    assert (await client.get("/api/rental", params=params)).json() == [expected]
+    assert (await client.get("/api/rental/1", params=params)).json() == expected
+
+
+async def test_unknown_expand_rejected(client, rental):
+    assert (await client.get("/api/rental", params={"expand": "password"})).status_code == 400
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from core import settings
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}
+
+
+async def test_ndjson_export(client, monkeypatch):
+    """Выгрузка отдает все строки по одной JSON-записи на строку, читая их пачками."""
+    monkeypatch.setattr(settings, "export_chunk_size", 2)  # Несколько пачек на 5 строк
+    assert (await client.post("/api/user", json=USER)).status_code == 200
+    for i in range(5):
+        equipment = {"name": f"e{i}", "discription": "d"}
+        assert (await client.post("/api/equipment", json=equipment)).status_code == 200
+        rental = {"equipment_id": i + 1, "user_id": 1, "start_date": "2030-01-01", "end_date": "2030-01-02"}
+        assert (await client.post("/api/rental", json=rental)).status_code == 200
+
+    equipment = await client.get("/api/equipment/export")
+    rentals = await client.get("/api/rental/export")
+
+    assert equipment.headers["content-type"] == "application/x-ndjson"
+    lines = equipment.text.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": i + 1, "name": f"e{i}", "discription": "d"} for i in range(5)
+    ]
+    assert [json.loads(line)["equipment_id"] for line in rentals.text.splitlines()] == [1, 2, 3, 4, 5]
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from core import settings
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}
+
+
+async def test_csv_import_reports_bad_rows(client, monkeypatch):
+    monkeypatch.setattr(settings, "import_chunk_size", 2)
+    assert (await client.post("/api/user", json=USER)).status_code == 200
+    body = (
+        "username,email,password,telephone_number\n"
+        "a,a@example.com,p,2\n"
+        "u,u@example.com,p,3\n"  # Уже есть в таблице
+        "b,b@example.com,p,4\n"
+        "a,a@example.com,p,5\n"  # Повтор строки из прошлой пачки
+        "c,c@example.com\n"  # Не хватает колонок
+    )
+
+    response = await client.post(
+        "/api/user/import", content=body, headers={"content-type": "text/csv"}
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["total"], report["inserted"], report["failed"]) == (5, 2, 3)
+    assert [error["row"] for error in report["errors"]] == [2, 4, 5]
+    users = (await client.get("/api/user")).json()
+    assert [user["username"] for user in users] == ["u", "a", "b"]
+
+
+async def test_ndjson_import_reports_bad_lines(client):
+    body = "\n".join(
+        [
+            json.dumps({"name": "drill", "discription": "d"}),
+            "{not json",
+            json.dumps({"name": "saw"}),  # Нет обязательного поля
+            json.dumps({"name": "saw", "discription": "d"}),
+        ]
+    )
+
+    response = await client.post(
+        "/api/equipment/import", content=body, headers={"content-type": "application/x-ndjson"}
+    )
+
+    report = response.json()
+    assert (report["total"], report["inserted"], report["failed"]) == (4, 2, 2)
+    assert report["errors"][0] == {"row": 2, "detail": "Не удалось разобрать строку"}
+    assert report["errors"][1]["row"] == 3 and "discription" in report["errors"][1]["detail"]
@@ -0,0 +1,35 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import StreamingResponse
+
+from core.metrics import MetricsMiddleware, http_request_duration, http_requests_in_flight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_streaming_request_duration():
+    router = APIRouter(prefix="/metrics-test")
+
+    @router.get("/slow/{parts}")
+    async def slow(parts: int):
+        async def body():
+            for _ in range(parts):
+                await asyncio.sleep(0.05)
+                yield b"x"
+
+        return StreamingResponse(body())
+
+    app = FastAPI()
+    app.include_router(router)
+    transport = httpx.ASGITransport(app=MetricsMiddleware(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/metrics-test/slow/3")).text == "xxx"
+        assert (await client.get("/metrics-test/missing")).status_code == 404
+
+    _, total, count = http_request_duration._values[("GET", "/metrics-test/slow/{parts}", 200)]
+    assert count == 1 and total >= 0.15  # Время отправки тела учтено
+    assert ("GET", "unmatched", 404) in http_request_duration._values
+    assert http_requests_in_flight._values.get((), 0) == 0
@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from api.crud.availability_cruds import get_free_intervals, occupancy, warm_occupancy
+from api.crud.change_cruds import record_changes
+from core import settings
+from core.occupancy import OccupancyBitmap
+from models import Equipment, Rental, User
+
+pytestmark = pytest.mark.anyio
+
+START = date.today() + timedelta(days=10)
+
+
+@pytest.fixture
+async def bitmaps(db, tmp_path, monkeypatch):
+    """Пользователь, оборудование и путь к файлу карт; карты закрываются после теста."""
+    path = str(tmp_path / "occupancy.bin")
+    monkeypatch.setattr(settings, "occupancy_path", path)
+    async with db.session_factory() as session:
+        await session.execute(
+            insert(User),
+            [{"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}],
+        )
+        await session.execute(insert(Equipment), [{"name": "e", "discription": "d"}])
+        await session.commit()
+    yield path
+    occupancy.close()
+
+
+async def book_elsewhere(db, start: date, end: date) -> int:
+    """Записывает аренду в обход процесса, как другой воркер, и возвращает ее номер в журнале."""
+    async with db.session_factory() as session:
+        rental = await session.scalar(
+            insert(Rental)
+            .values(equipment_id=1, user_id=1, start_date=start, end_date=end)
+            .returning(Rental)
+        )
+        seq = await record_changes(session, Rental, "create", [rental])
+        await session.commit()
+    return seq
+
+
+async def test_locked_file_disables_bitmaps(db, bitmaps):
+    owner = OccupancyBitmap(settings.occupancy_horizon_days)
+    owner.open(bitmaps)  # Файлом владеет другой воркер
+    try:
+        async with db.session_factory() as session:
+            await warm_occupancy(session)
+        assert not occupancy.ready
+    finally:
+        owner.close()
+
+
+async def test_bitmaps_follow_journal(db, bitmaps):
+    async with db.session_factory() as session:
+        await warm_occupancy(session)
+    assert occupancy.ready
+
+    seq = await book_elsewhere(db, START, START + timedelta(days=2))
+    async with db.session_factory() as session:
+        free = await get_free_intervals(session, 1, START, START + timedelta(days=5))
+
+    assert free == [(START + timedelta(days=2), START + timedelta(days=5))]
+    assert occupancy.last_seq == seq
+    occupancy.close()
+    reopened = OccupancyBitmap(settings.occupancy_horizon_days)
+    assert reopened.open(bitmaps)  # Номер сверки сохранен в заголовке файла
+    assert reopened.last_seq == seq
+    assert not reopened.is_free(1, START, START + timedelta(days=1))
+    reopened.close()
@@ -0,0 +1,35 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def user(i: int) -> dict:
+    return {"username": f"u{i}", "email": f"u{i}@example.com", "password": "p", "telephone_number": str(i)}
+
+
+def equipment(i: int) -> dict:
+    return {"name": f"e{i}", "discription": "d"}
+
+
+@pytest.mark.parametrize("url, make", [("/api/equipment", equipment), ("/api/user", user)])
+async def test_keyset_pages(client, url, make):
+    """Страницы идут по id после курсора; у последней, неполной страницы курсора нет."""
+    for i in range(5):
+        assert (await client.post(url, json=make(i))).status_code == 200
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "after_id": cursor}
+        response = await client.get(url, params=params)
+        assert response.status_code == 200
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert pages == [[1, 2], [3, 4], [5]]
+
+
+async def test_page_limit_is_bounded(client):
+    response = await client.get("/api/equipment", params={"limit": 100000})
+    assert response.status_code == 422
@@ -0,0 +1,80 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}
+EQUIPMENT = {"name": "drill", "discription": "d"}
+RENTAL = {"equipment_id": 1, "user_id": 1, "start_date": "2030-01-01", "end_date": "2030-01-05"}
+JOURNAL = "INSERT INTO changes"  # Запись в журнал изменений (/api/changes) в той же транзакции
+
+
+@contextmanager
+def count_sql(db):
+    """
+    Собирает выражения и commit всех движков приложения за время блока with.
+
+    Выражения перехватываются событием before_cursor_execute, как в
+    core/timing.py.
+    """
+    executed = {"statements": [], "commits": 0}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        executed["statements"].append(" ".join(statement.split()))
+
+    def on_commit(conn):
+        executed["commits"] += 1
+
+    engines = [engine.sync_engine for engine in [db.engine, *db.read_engines]]
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", on_execute)
+        event.listen(engine, "commit", on_commit)
+    try:
+        yield executed
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", on_execute)
+            event.remove(engine, "commit", on_commit)
+
+
+@pytest.mark.parametrize(
+    "method, url, body, expected",
+    [
+        (
+            "POST",
+            "/api/user",
+            dict(USER, username="v", email="v@example.com", telephone_number="2"),
+            ["INSERT INTO users", JOURNAL],
+        ),
+        ("PUT", "/api/user/1", dict(USER, email="new@example.com"), ["UPDATE users", JOURNAL]),
+        ("DELETE", "/api/user/1", None, ["DELETE FROM users", JOURNAL]),
+        ("POST", "/api/equipment", dict(EQUIPMENT, name="saw"), ["INSERT INTO equipments", JOURNAL]),
+        ("PUT", "/api/equipment/1", dict(EQUIPMENT, discription="new"), ["UPDATE equipments", JOURNAL]),
+        ("DELETE", "/api/equipment/1", None, ["DELETE FROM equipments", JOURNAL]),
+        (
+            "POST",
+            "/api/rental",
+            dict(RENTAL, start_date="2030-02-01", end_date="2030-02-03"),
+            ["SELECT EXISTS", "INSERT INTO rentals", JOURNAL],  # Проверка, условная вставка
+        ),
+        ("PUT", "/api/rental/1", dict(RENTAL, end_date="2030-01-07"), ["UPDATE rentals", JOURNAL]),
+        ("DELETE", "/api/rental/1", None, ["DELETE FROM rentals", JOURNAL]),
+    ],
+)
+async def test_write_statements(client, db, method, url, body, expected):
+    """Каждая запись - одно выражение с RETURNING и запись журнала, один commit."""
+    for path, data in [("/api/user", USER), ("/api/equipment", EQUIPMENT), ("/api/rental", RENTAL)]:
+        assert (await client.post(path, json=data)).status_code == 200
+
+    with count_sql(db) as executed:
+        response = await client.request(method, url, json=body)
+
+    assert response.status_code == 200, response.text
+    statements = executed["statements"]
+    assert len(statements) == len(expected), statements
+    for statement, prefix in zip(statements, expected):
+        assert statement.startswith(prefix), statements
+    assert "RETURNING" in statements[-2], statements  # Без повторного чтения после записи
+    assert executed["commits"] == 1
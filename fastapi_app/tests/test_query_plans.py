@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from api.crud.rental_cruds import get_all_rental
+
+pytestmark = pytest.mark.anyio
+
+
+async def query_plan(db, **filters) -> str:
+    """Выполняет get_all_rental и возвращает EXPLAIN QUERY PLAN его выражения."""
+    executed = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    engine = db.engine.sync_engine
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        async with db.session_factory() as session:
+            await get_all_rental(session, limit=50, **filters)
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    [(statement, parameters)] = executed
+    async with db.engine.connect() as conn:
+        rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return "\n".join(row.detail for row in rows)
+
+
+@pytest.mark.parametrize(
+    "filters, index",
+    [
+        ({"active_on": date(2030, 1, 1)}, "ix_rentals_end_date_start_date"),
+        ({"date_from": date(2030, 1, 1)}, "ix_rentals_end_date_start_date"),
+        ({"active_on": date(2030, 1, 1), "after_id": 100}, "ix_rentals_end_date_start_date"),
+        (
+            {"date_from": date(2030, 1, 1), "date_to": date(2030, 2, 1)},
+            "ix_rentals_end_date_start_date",
+        ),
+        ({"user_id": 1, "active_on": date(2030, 1, 1)}, "ix_rentals_user_id_start_date_end_date"),
+        (
+            {"equipment_id": 1, "date_from": date(2030, 1, 1)},
+            "ix_rentals_equipment_id_start_date_end_date",
+        ),
+    ],
+)
+async def test_rental_filters_use_index(db, filters, index):
+    plan = await query_plan(db, **filters)
+
+    assert f"SEARCH rentals USING INDEX {index}" in plan, plan
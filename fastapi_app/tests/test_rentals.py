@@ -0,0 +1,50 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}
+
+def rental(equipment_id: int, start: str, end: str) -> dict:
+    return {"equipment_id": equipment_id, "user_id": 1, "start_date": start, "end_date": end}
+
+
+@pytest.fixture
+async def equipment(client):
+    """Пользователь и два оборудования."""
+    assert (await client.post("/api/user", json=USER)).status_code == 200
+    for name in ("drill", "saw"):
+        response = await client.post("/api/equipment", json={"name": name, "discription": "d"})
+        assert response.status_code == 200
+
+
+async def test_unknown_equipment_rejected(client, equipment):
+    response = await client.post("/api/rental", json=rental(99, "2030-01-01", "2030-01-05"))
+
+    assert response.status_code == 400
+    assert (await client.get("/api/rental")).json() == []
+
+
+async def test_bulk_results_per_item(client, equipment):
+    assert (await client.post("/api/rental", json=rental(1, "2030-01-01", "2030-01-05"))).status_code == 200
+
+    response = await client.post(
+        "/api/rental/bulk",
+        json=[
+            rental(1, "2030-01-03", "2030-01-04"),  # Пересекается с арендой в базе
+            rental(2, "2030-01-01", "2030-01-05"),
+            rental(2, "2030-01-04", "2030-01-06"),  # Пересекается с предыдущим элементом
+            rental(2, "2030-01-05", "2030-01-07"),  # Стык с принятым элементом
+            rental(99, "2030-01-01", "2030-01-05"),
+        ],
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"index": 0, "accepted": False, "id": None, "detail": "Оборудование занято на эти даты"},
+        {"index": 1, "accepted": True, "id": 2, "detail": None},
+        {"index": 2, "accepted": False, "id": None, "detail": "Пересечение с другой арендой в пакете"},
+        {"index": 3, "accepted": True, "id": 3, "detail": None},
+        {"index": 4, "accepted": False, "id": None, "detail": "Нет оборудования с таким id"},
+    ]
+    rentals = (await client.get("/api/rental")).json()
+    assert [(r["id"], r["equipment_id"]) for r in rentals] == [(1, 1), (2, 2), (3, 2)]
@@ -0,0 +1,78 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+
+from core import settings
+from models import Equipment, Rental, User
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize(
+    "date_from, date_to, bucket, status",
+    [
+        ("2030-01-01", "2032-01-01", "week", 200),  # 730 дней, 105 недель
+        ("2030-01-01", "2032-01-03", "week", 400),  # 732 дня
+        ("1000-01-01", "9999-01-01", "month", 400),
+    ],
+)
+async def test_utilization_window_limit(client, date_from, date_to, bucket, status):
+    """Длина окна и число периодов отчета ограничены настройками."""
+    assert (await client.post("/api/equipment", json={"name": "e", "discription": "d"})).status_code == 200
+
+    response = await client.get(
+        "/api/reports/utilization", params={"from": date_from, "to": date_to, "bucket": bucket}
+    )
+
+    assert response.status_code == status, response.text
+
+
+@pytest.mark.parametrize("bucket, status", [("week", 400), ("month", 200)])
+async def test_utilization_bucket_limit(client, monkeypatch, bucket, status):
+    monkeypatch.setattr(settings, "report_max_buckets", 12)
+
+    response = await client.get(
+        "/api/reports/utilization", params={"from": "2030-01-01", "to": "2030-07-01", "bucket": bucket}
+    )
+
+    assert response.status_code == status, response.text
+
+
+async def test_utilization_counts_days(db, client):
+    """Пересекающиеся аренды, обрезка по краям окна, конец аренды не включается."""
+    async with db.session_factory() as session:  # Пересечения пишутся в обход проверки бронирования
+        await session.execute(
+            insert(User),
+            [{"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}],
+        )
+        await session.execute(
+            insert(Equipment), [{"name": "e1", "discription": "d"}, {"name": "e2", "discription": "d"}]
+        )
+        await session.execute(
+            insert(Rental),
+            [
+                {"equipment_id": 1, "user_id": 1, "start_date": start, "end_date": end}
+                for start, end in [
+                    (date(2030, 1, 1), date(2030, 1, 9)),  # Начало до окна: 7 и 8 января
+                    (date(2030, 1, 8), date(2030, 1, 10)),  # Пересечение: добавляет 9 января
+                    (date(2030, 1, 13), date(2030, 1, 14)),  # Один день
+                    (date(2030, 1, 20), date(2030, 2, 1)),  # Конец после окна: 20 января
+                    (date(2030, 1, 21), date(2030, 1, 25)),  # Начинается в конце окна
+                    (date(2029, 12, 30), date(2030, 1, 7)),  # Заканчивается в начале окна
+                ]
+            ],
+        )
+        await session.commit()
+
+    response = await client.get(
+        "/api/reports/utilization", params={"from": "2030-01-07", "to": "2030-01-21", "bucket": "week"}
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert [bucket["days"] for bucket in report["buckets"]] == [7, 7]
+    assert report["items"] == [
+        {"equipment_id": 1, "occupied_days": [4, 1], "utilization": [57.14, 14.29]},
+        {"equipment_id": 2, "occupied_days": [0, 0], "utilization": [0.0, 0.0]},
+    ]
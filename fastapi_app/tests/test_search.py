@@ -0,0 +1,36 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def search(client, q: str) -> list[int]:
+    response = await client.get("/api/equipment/search", params={"q": q})
+    assert response.status_code == 200
+    return [item["id"] for item in response.json()]
+
+
+async def test_index_follows_writes(client):
+    for name, discription in [("Дрель ударная", "для бетона"), ("Перфоратор", "дрель-перфоратор")]:
+        response = await client.post("/api/equipment", json={"name": name, "discription": discription})
+        assert response.status_code == 200
+
+    assert await search(client, "дрель") == [1, 2]  # Совпадение в названии выше
+    assert await search(client, "бет") == [1]  # Префикс слова
+
+    response = await client.put("/api/equipment/1", json={"name": "Пила", "discription": "цепная"})
+    assert response.status_code == 200
+    assert await search(client, "дрель") == [2]
+    assert await search(client, "цепная пила") == [1]
+
+    assert (await client.delete("/api/equipment/1")).status_code == 200
+    assert await search(client, "пила") == []
+
+
+async def test_imported_rows_searchable(client):
+    body = "name,discription\nКомпрессор,воздушный\n"
+    response = await client.post(
+        "/api/equipment/import", content=body, headers={"content-type": "text/csv"}
+    )
+    assert response.json()["inserted"] == 1
+
+    assert await search(client, "воздушн") == [1]
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from core.timing import SQLTimingMiddleware, instrument_engine
+
+pytestmark = pytest.mark.anyio
+
+
+def timed_client(app) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=SQLTimingMiddleware(app, sample_rate=1.0))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+def logged(caplog) -> list[dict]:
+    return [json.loads(record.message) for record in caplog.records if record.name == "api.timing"]
+
+
+async def test_streaming_measured_to_last_chunk(caplog):
+    app = FastAPI()
+
+    @app.get("/slow/{parts}")
+    async def slow(parts: int):
+        async def body():
+            for _ in range(parts):
+                await asyncio.sleep(0.05)
+                yield b"x"
+
+        return StreamingResponse(body())
+
+    caplog.set_level(logging.INFO, logger="api.timing")
+    async with timed_client(app) as client:
+        response = await client.get("/slow/3")
+
+    assert response.text == "xxx"
+    assert "total;dur=" in response.headers["server-timing"]
+    [entry] = logged(caplog)
+    assert entry["path"] == "/slow/{parts}" and entry["status"] == 200
+    assert entry["total_ms"] >= 150  # Время отправки тела учтено
+
+
+async def test_sql_counted(db, caplog):
+    from main import app
+
+    for engine in [db.engine, *db.read_engines]:
+        instrument_engine(engine)
+    caplog.set_level(logging.INFO, logger="api.timing")
+    async with timed_client(app) as client:
+        assert (await client.post("/api/equipment", json={"name": "e", "discription": "d"})).status_code == 200
+        response = await client.get("/api/equipment/1")
+
+    assert 'desc="' in response.headers["server-timing"]
+    entries = logged(caplog)
+    assert [entry["path"] for entry in entries] == ["/api/equipment", "/api/equipment/{equipment_id}"]
+    assert all(entry["queries"] > 0 for entry in entries)
@@ -0,0 +1,20 @@
+import json
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "u", "email": "u@example.com", "password": "p", "telephone_number": "1"}
+PUBLIC = {"id": 1, "username": "u", "email": "u@example.com", "telephone_number": "1"}
+
+
+async def test_password_not_returned(client):
+    created = await client.post("/api/user", json=USER)
+    updated = await client.put("/api/user/1", json=dict(USER, password="new"))
+    exported = await client.get("/api/user/export")
+
+    assert created.json() == PUBLIC
+    assert updated.json() == PUBLIC
+    assert (await client.get("/api/user")).json() == [PUBLIC]
+    assert (await client.get("/api/user/1")).json() == PUBLIC
+    assert [json.loads(line) for line in exported.text.splitlines()] == [PUBLIC]